@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: compute_layout (escalar) frente a compute_layouts_batch (columnas).
+
+Uso:
+    python benchmarks/bench_calc.py [--n 50000] [--repeat 5]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from presupuestos_dtf.calc import compute_layout, compute_layouts_batch  # noqa: E402
+from presupuestos_dtf.models import CalcInput  # noqa: E402
+
+ROLLS = (30.0, 57.0, 60.0)
+
+def make_inputs(n: int, seed: int = 1234) -> list[CalcInput]:
+    rnd = random.Random(seed)
+    return [
+        CalcInput(
+            roll_width_cm=rnd.choice(ROLLS),
+            price_per_meter=round(rnd.uniform(6.0, 15.0), 2),
+            image_width_cm=round(rnd.uniform(2.0, 50.0), 1),
+            image_height_cm=round(rnd.uniform(2.0, 70.0), 1),
+            margin_top_cm=0.5,
+            margin_right_cm=0.5,
+            num_copies=rnd.randint(1, 2000),
+            orientation_deg=rnd.choice((0, 90)),
+        )
+        for _ in range(n)
+    ]
+
+def to_columns(inputs: list[CalcInput]) -> dict:
+    return {
+        "roll_width_cm": [i.roll_width_cm for i in inputs],
+        "price_per_meter": [i.price_per_meter for i in inputs],
+        "image_width_cm": [i.image_width_cm for i in inputs],
+        "image_height_cm": [i.image_height_cm for i in inputs],
+        "margin_top_cm": [i.margin_top_cm for i in inputs],
+        "margin_right_cm": [i.margin_right_cm for i in inputs],
+        "num_copies": [i.num_copies for i in inputs],
+        "orientation_deg": [i.orientation_deg for i in inputs],
+    }
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=50_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    inputs = make_inputs(args.n)
+    cols = to_columns(inputs)
+
+    scalar = [compute_layout(i) for i in inputs]
+    batch = compute_layouts_batch(**cols)
+    mismatches = sum(1 for k, r in enumerate(scalar) if batch.row(k) != r)
+
+    t_scalar = best_of(lambda: [compute_layout(i) for i in inputs], args.repeat)
+    t_batch = best_of(lambda: compute_layouts_batch(**cols), args.repeat)
+
+    print(f"layouts: {args.n}  (mejor de {args.repeat})")
+    print(f"  escalar : {t_scalar * 1e3:9.2f} ms  {args.n / t_scalar:12,.0f} layouts/s")
+    print(f"  lote    : {t_batch * 1e3:9.2f} ms  {args.n / t_batch:12,.0f} layouts/s")
+    print(f"  speedup : x{t_scalar / t_batch:.2f}")
+    print(f"  diferencias con la versión escalar: {mismatches}")
+    if mismatches:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de la exportación de gang sheets a PNG.
+
+Exporta un mismo trabajo con longitudes crecientes y mide tiempo, Mpx/s y
+memoria pico de Python (tracemalloc): la memoria no debe crecer con la
+longitud del rollo. El diseño de prueba se genera en una carpeta temporal.
+
+Uso:
+    python benchmarks/bench_export.py [--dpi 300] [--meters 1 2 4] [--level 6]
+"""
+import argparse
+import math
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from presupuestos_dtf.calc import compute_layout  # noqa: E402
+from presupuestos_dtf.export import cm_to_px, export_gang_sheet  # noqa: E402
+from presupuestos_dtf.geometry import layout_from_result  # noqa: E402
+from presupuestos_dtf.models import CalcInput  # noqa: E402
+from presupuestos_dtf.raster import Image, PngWriter  # noqa: E402
+
+def make_design(path: Path, w: int, h: int) -> None:
+    # Círculo opaco sobre fondo transparente, como un diseño DTF típico
+    r2 = (min(w, h) / 2) ** 2
+    with open(path, "wb") as f:
+        png = PngWriter(f, w, h)
+        for y in range(h):
+            row = bytearray(w * 4)
+            dy = (y - h / 2) ** 2
+            for x in range(w):
+                if (x - w / 2) ** 2 + dy <= r2:
+                    row[4 * x:4 * x + 4] = bytes((200, (x * 255) // w, (y * 255) // h, 255))
+            png.write_row(row)
+        png.close()
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--dpi", type=float, default=300)
+    ap.add_argument("--meters", type=float, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--level", type=int, default=6, help="Nivel de zlib (1 rápido … 9 pequeño)")
+    args = ap.parse_args()
+
+    w_cm, h_cm = 10.0, 10.0
+    print(f"Pillow: {'sí' if Image is not None else 'no (PNG propio, vecino más próximo)'}")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        design = tmp / "design.png"
+        make_design(design, 600, 600)
+
+        print(f"{'metros':>7} {'copias':>7} {'píxeles':>17} {'s':>7} {'Mpx/s':>7} {'pico MB':>8} {'PNG MB':>8}")
+        for meters in args.meters:
+            base = CalcInput(57.0, 11.0, w_cm, h_cm, 0.5, 0.5, 1, 0)
+            per_row = compute_layout(base).designs_per_row
+            rows = max(1, math.floor((meters * 100 + 0.5) / (h_cm + 0.5)))
+            data = CalcInput(57.0, 11.0, w_cm, h_cm, 0.5, 0.5, rows * per_row, 0)
+            layout = layout_from_result(data, compute_layout(data))
+
+            out = tmp / f"sheet_{meters:g}m.png"
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            res = export_gang_sheet(layout, [design], out, args.dpi, level=args.level)
+            dt = time.perf_counter() - t0
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            mpx = res.width_px * res.height_px / 1e6
+            print(f"{meters:>7g} {res.copies:>7} {res.width_px:>8}×{res.height_px:<8} {dt:>7.2f} "
+                  f"{mpx / dt:>7.1f} {peak / 1e6:>8.1f} {out.stat().st_size / 1e6:>8.1f}")
+            out.unlink()
+        print(f"Huella de un diseño: {cm_to_px(w_cm, args.dpi)}×{cm_to_px(h_cm, args.dpi)} px")
+
+if __name__ == "__main__":
+    main()
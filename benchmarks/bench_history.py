@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark del historial SQLite con muchos presupuestos (500k por defecto).
+
+Mide el coste de add() en el hilo que llama (lo que vería el bucle de Tk), el
+ritmo de escritura del hilo escritor y la latencia de las consultas de página
+y búsqueda, tanto de un cliente concreto como de un prefijo corto que
+coincide con todo el historial ("C"). Usa una base temporal.
+
+Uso:
+    python benchmarks/bench_history.py [--rows 500000]
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from presupuestos_dtf.history import COUNT_LIMIT, HistoryStore, QuoteRecord  # noqa: E402
+
+CUSTOMERS = [f"Cliente {i:04d}" for i in range(2000)]
+
+def make_record(rnd: random.Random, t: float) -> QuoteRecord:
+    w, h = rnd.choice((8.0, 10.0, 12.0, 25.0, 30.0)), rnd.choice((8.0, 12.0, 15.0, 35.0, 40.0))
+    return QuoteRecord(
+        customer=rnd.choice(CUSTOMERS), image_width_cm=w, image_height_cm=h,
+        num_copies=rnd.randint(1, 500), roll_width_cm=57.0, price_per_meter=11.0,
+        margin_top_cm=0.5, margin_right_cm=0.5,
+        length_0_cm=100.0, cost_0=11.0, length_90_cm=120.0, cost_90=13.2,
+        chosen_orientation=0, chosen_length_cm=100.0, chosen_cost=11.0, created_at=t,
+    )
+
+def timed(label: str, fn, repeat: int = 20) -> None:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    times.sort()
+    print(f"  {label:<38} mediana {times[len(times) // 2] * 1e3:7.2f} ms   peor {times[-1] * 1e3:7.2f} ms")
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=500_000)
+    args = ap.parse_args()
+
+    rnd = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(Path(tmp) / "history.sqlite3")
+        t_start = time.time() - args.rows
+        records = [make_record(rnd, t_start + i) for i in range(args.rows)]
+
+        t0 = time.perf_counter()
+        worst_add = 0.0
+        for rec in records:
+            a = time.perf_counter()
+            store.add(rec)
+            worst_add = max(worst_add, time.perf_counter() - a)
+        t_enqueue = time.perf_counter() - t0
+        store.flush()
+        t_total = time.perf_counter() - t0
+        del records
+
+        print(f"filas: {args.rows}")
+        print(f"  add() por llamada (media)              {t_enqueue / args.rows * 1e6:7.2f} µs   peor {worst_add * 1e3:.2f} ms")
+        print(f"  escritura en disco                     {args.rows / t_total:10,.0f} filas/s")
+
+        first = store.page()
+        timed("count()", lambda: store.count())
+        timed("primera página", lambda: store.page())
+        timed("página siguiente (keyset)", lambda: store.page(after=first[-1]))
+        timed("última página", lambda: store.page(last=True))
+        mid = store.page(after=replace(first[0], created_at=t_start + args.rows // 2, id=0))
+        timed("página a mitad del historial", lambda: store.page(after=mid[0]))
+        timed("búsqueda por cliente", lambda: store.page("Cliente 0042"))
+        timed("count() por cliente", lambda: store.count("Cliente 0042", COUNT_LIMIT))
+        timed("búsqueda por prefijo corto \"C\"", lambda: store.page("C"))
+        deep = store.page("C", last=True)[0]
+        timed("prefijo \"C\", página del final", lambda: store.page("C", before=deep))
+        timed("count() prefijo \"C\" (hasta el tope)", lambda: store.count("C", COUNT_LIMIT))
+        timed("búsqueda por medidas 10x15", lambda: store.page("10x15"))
+        timed("count() medidas 10x15", lambda: store.count("10x15"))
+        store.close()
+
+if __name__ == "__main__":
+    main()
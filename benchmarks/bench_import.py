@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de la importación masiva: cabeceras de 10.000 imágenes.
+
+Genera una carpeta temporal con PNG, JPEG y TIFF a partes iguales (cabeceras
+reales y `--payload-kb` de datos de imagen que no se deberían leer) y mide
+scan_images con distinto número de hilos. Si Pillow está instalado se compara
+con Image.open, que también lee solo la cabecera.
+
+Con la caché del sistema caliente leer una cabecera cuesta microsegundos y
+los hilos apenas ganan; donde se nota el pool es en carpetas de red o disco
+frío, donde cada apertura espera milisegundos.
+
+Uso:
+    python benchmarks/bench_import.py [--files 10000] [--payload-kb 16] [--workers 1 4 8 16]
+"""
+import argparse
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from presupuestos_dtf.imageinfo import iter_image_files, scan_images, to_nest_items  # noqa: E402
+from presupuestos_dtf.raster import Image, _chunk  # noqa: E402
+
+def png_bytes(w: int, h: int, dpi: int, payload: bytes) -> bytes:
+    ppm = round(dpi / 0.0254)
+    return (b"\x89PNG\r\n\x1a\n"
+            + _chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 6, 0, 0, 0))
+            + _chunk(b"pHYs", struct.pack(">IIB", ppm, ppm, 1))
+            + _chunk(b"IDAT", payload) + _chunk(b"IEND", b""))
+
+def jpeg_bytes(w: int, h: int, dpi: int, payload: bytes) -> bytes:
+    def seg(marker: int, body: bytes) -> bytes:
+        return struct.pack(">BBH", 0xFF, marker, len(body) + 2) + body
+    return (b"\xff\xd8"
+            + seg(0xE0, b"JFIF\0\x01\x01" + struct.pack(">BHHBB", 1, dpi, dpi, 0, 0))
+            + seg(0xE2, b"ICC_PROFILE\0" + bytes(3000))   # perfil de color típico
+            + seg(0xC0, struct.pack(">BHHB", 8, h, w, 3) + bytes((1, 0x11, 0, 2, 0x11, 0, 3, 0x11, 0)))
+            + seg(0xDA, bytes((3, 1, 0, 2, 0, 3, 0, 0, 63, 0)))
+            + payload + b"\xff\xd9")
+
+def tiff_bytes(w: int, h: int, dpi: int, payload: bytes) -> bytes:
+    # Datos de imagen primero y la IFD al final, como escriben muchos programas
+    ifd_off = 8 + len(payload)
+    n = 12
+    res_off = ifd_off + 2 + n * 12 + 4
+    entries = [(256, 4, 1, w), (257, 4, 1, h), (258, 3, 1, 8), (259, 3, 1, 1), (262, 3, 1, 1),
+               (273, 4, 1, 8), (277, 3, 1, 1), (278, 4, 1, h), (279, 4, 1, len(payload)),
+               (282, 5, 1, res_off), (283, 5, 1, res_off), (296, 3, 1, 2)]
+    ifd = struct.pack("<H", n) + b"".join(struct.pack("<HHII", *e) for e in entries)
+    return b"II*\0" + struct.pack("<I", ifd_off) + payload + ifd + b"\0\0\0\0" + struct.pack("<II", dpi, 1)
+
+def make_folder(folder: Path, n: int, payload_kb: int, seed: int = 7) -> None:
+    rnd = random.Random(seed)
+    payload = os.urandom(payload_kb * 1024)
+    makers = ((png_bytes, "png"), (jpeg_bytes, "jpg"), (tiff_bytes, "tif"))
+    for i in range(n):
+        make, ext = makers[i % 3]
+        w, h = rnd.randint(300, 6000), rnd.randint(300, 6000)
+        dpi = rnd.choice((150, 200, 300, 300, 300, 600))
+        (folder / f"diseño_{i:05d}.{ext}").write_bytes(make(w, h, dpi, payload))
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--files", type=int, default=10_000)
+    ap.add_argument("--payload-kb", type=int, default=16, help="Datos de imagen por fichero (no se leen)")
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        t0 = time.perf_counter()
+        make_folder(folder, args.files, args.payload_kb)
+        print(f"Generados {args.files} ficheros ({args.files * args.payload_kb / 1024:.0f} MB) "
+              f"en {time.perf_counter() - t0:.1f} s\n")
+
+        t0 = time.perf_counter()
+        paths = list(iter_image_files(folder))
+        print(f"{'listar carpeta':<22} {time.perf_counter() - t0:>8.3f} s")
+
+        for workers in args.workers:
+            t0 = time.perf_counter()
+            results = scan_images(paths, workers)
+            dt = time.perf_counter() - t0
+            bad = sum(1 for r in results if r.error)
+            print(f"{f'scan_images ({workers} hilos)':<22} {dt:>8.3f} s {len(paths) / dt:>10.0f} ficheros/s"
+                  f"{f'  ({bad} errores)' if bad else ''}")
+
+        t0 = time.perf_counter()
+        items = to_nest_items(results, 300)
+        print(f"{'to_nest_items':<22} {time.perf_counter() - t0:>8.3f} s  ({len(items)} líneas)")
+
+        if Image is not None:
+            t0 = time.perf_counter()
+            for p in paths:
+                with Image.open(p) as im:
+                    im.size, im.info.get("dpi")
+            dt = time.perf_counter() - t0
+            print(f"{'Pillow Image.open':<22} {dt:>8.3f} s {len(paths) / dt:>10.0f} ficheros/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: optimize_mixed_layout hasta 100k copias.
+
+El optimizador debe mantenerse interactivo (< 50 ms por cálculo) en el peor
+caso medido sobre diseños aleatorios, incluidos tamaños mínimos (0,10 cm).
+
+Uso:
+    python benchmarks/bench_optimizer.py [--designs 200] [--limit-ms 50]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from presupuestos_dtf.calc import optimize_mixed_layout  # noqa: E402
+from presupuestos_dtf.models import CalcInput  # noqa: E402
+
+COPIES = (1, 10, 100, 1_000, 10_000, 100_000)
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--designs", type=int, default=200)
+    ap.add_argument("--limit-ms", type=float, default=50.0)
+    args = ap.parse_args()
+
+    rnd = random.Random(42)
+    sizes = [(0.1, 0.1), (0.1, 57.0), (57.0, 0.1)]
+    sizes += [(round(rnd.uniform(0.1, 60.0), 1), round(rnd.uniform(0.1, 60.0), 1)) for _ in range(args.designs)]
+
+    worst_all = 0.0
+    print(f"{'copias':>8}  {'media ms':>9}  {'peor ms':>9}")
+    for copies in COPIES:
+        times = []
+        for w, h in sizes:
+            data = CalcInput(57.0, 11.0, w, h, 0.5, 0.5, copies, 0)
+            t0 = time.perf_counter()
+            optimize_mixed_layout(data)
+            times.append(time.perf_counter() - t0)
+        worst = max(times) * 1e3
+        worst_all = max(worst_all, worst)
+        print(f"{copies:>8}  {sum(times) / len(times) * 1e3:9.3f}  {worst:9.3f}")
+
+    print(f"peor caso global: {worst_all:.3f} ms (límite {args.limit_ms:g} ms)")
+    if worst_all > args.limit_ms:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark del catálogo de presets con 50.000 entradas.
+
+Genera un presets.csv temporal (clientes × prendas × medidas), mide la
+primera carga (lectura + índice), la memoria del índice y la latencia de
+búsqueda de consultas típicas mientras se escribe, letra a letra.
+
+Uso:
+    python benchmarks/bench_presets.py [--presets 50000] [--limit 200]
+"""
+import argparse
+import csv
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from presupuestos_dtf.presets import load_catalog  # noqa: E402
+
+GARMENTS = ("Logo pecho", "Logo manga", "Espalda", "Frontal", "Etiqueta cuello", "Gorra frontal",
+            "Bolsa tote", "Parche", "Oversized", "Pierna lateral", "Dorsal", "Nombre espalda")
+CLIENTS = [f"{a} {b}" for a in ("Club", "Textil", "Eventos", "Academia", "Taller", "Peña")
+           for b in ("Norte", "Sur", "Levante", "Ribera", "Montaña", "Costa", "Centro", "Valle")]
+
+# Consultas tecleadas letra a letra: se mide cada prefijo
+QUERIES = ("logo pecho 10", "espalda 30x40", "club norte", "etiq", "peña costa dorsal", "10x15", "zzz")
+
+def make_catalog(path: Path, n: int, seed: int = 3) -> None:
+    rnd = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["name", "width_cm", "height_cm", "group", "client"])
+        for i in range(n):
+            client = rnd.choice(CLIENTS)
+            garment = rnd.choice(GARMENTS)
+            wc, hc = rnd.randint(3, 50), rnd.randint(3, 60)
+            w.writerow([f"{garment} {wc}×{hc} #{i}", wc, hc, garment.split()[0], client])
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--presets", type=int, default=50_000)
+    ap.add_argument("--limit", type=int, default=200, help="Entradas del desplegable")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "presets.csv"
+        make_catalog(path, args.presets)
+
+        t0 = time.perf_counter()
+        cat = load_catalog(path)
+        load_s = time.perf_counter() - t0
+        # Memoria en una segunda carga: tracemalloc distorsiona el tiempo
+        tracemalloc.start()
+        again = load_catalog(path)
+        mem = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del again
+        print(f"Carga + índice de {len(cat)} presets: {load_s * 1e3:.0f} ms, {mem / 1e6:.1f} MB")
+
+        print(f"\n{'consulta':<22} {'p50 µs':>8} {'máx µs':>8} {'resultados':>10}")
+        for q in QUERIES:
+            times, shown = [], 0
+            for k in range(1, len(q) + 1):
+                prefix = q[:k]
+                runs = []
+                for _ in range(20):
+                    t0 = time.perf_counter()
+                    res, more = cat.search(prefix, args.limit)
+                    runs.append(time.perf_counter() - t0)
+                times.append(min(runs))
+                shown = len(res)
+            print(f"{q!r:<22} {statistics.median(times) * 1e6:>8.0f} {max(times) * 1e6:>8.0f} "
+                  f"{shown:>9}{'+' if more else ' '}")
+
+if __name__ == "__main__":
+    main()
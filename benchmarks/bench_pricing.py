@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: tarifa por tramos frente a precio plano.
+
+Mide lo que añade la tarifa compilada (tramos con bisect, arranque, mínimo y
+recargo) a cada presupuesto: por resultado (PriceTable.price_geometry tras
+compute_geometry, frente a compute_layout con precio plano), en bloque sobre
+una columna de longitudes (cost_many) y sobre la salida de
+compute_layouts_batch (price_batch).
+
+Uso:
+    python benchmarks/bench_pricing.py [--n 200000] [--tiers 4] [--repeat 5]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_calc import best_of, make_inputs, to_columns  # noqa: E402
+from presupuestos_dtf.calc import compute_geometry, compute_layout, compute_layouts_batch  # noqa: E402
+from presupuestos_dtf.pricing import parse_pricing  # noqa: E402
+
+def make_rules(n_tiers: int):
+    return parse_pricing({
+        "mode": "graduated",
+        "tiers": [{"from_m": 5 * 2 ** k, "price_per_meter": 10.0 - k} for k in range(n_tiers)],
+        "setup_fee": 3.0,
+        "minimum_charge": 5.0,
+        "markups": {"Club Norte": 10},
+    })
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=200_000)
+    ap.add_argument("--tiers", type=int, default=4, help="Tramos además del precio base")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    inputs = make_inputs(args.n)
+    rules = make_rules(args.tiers)
+    table = rules.table(11.0, "Club Norte")
+    flat = parse_pricing({}).table(11.0)
+    cols = to_columns(inputs)
+    lengths = [compute_geometry(i).total_height_m for i in inputs]
+    print(f"{args.n} presupuestos, {args.tiers + 1} tramos ({rules.describe()})\n")
+
+    t_layout = best_of(lambda: [compute_layout(i) for i in inputs], args.repeat)
+    t_tiered = best_of(lambda: [table.price_geometry(compute_geometry(i)) for i in inputs], args.repeat)
+    t_cost = best_of(lambda: [table.cost(m) for m in lengths], args.repeat)
+    t_many_flat = best_of(lambda: flat.cost_many(lengths), args.repeat)
+    t_many = best_of(lambda: table.cost_many(lengths), args.repeat)
+    t_batch = best_of(lambda: compute_layouts_batch(**cols), args.repeat)
+    t_tbatch = best_of(lambda: table.price_batch(compute_layouts_batch(**cols)), args.repeat)
+
+    def line(label: str, seconds: float, ref: float | None = None) -> None:
+        extra = f"   {seconds / ref - 1:+7.1%}" if ref else ""
+        print(f"  {label:<44} {seconds / args.n * 1e9:>7.0f} ns/presupuesto{extra}")
+
+    print("Por presupuesto (geometría + precio):")
+    line("compute_layout, precio plano", t_layout)
+    line("compute_geometry + price_geometry, tramos", t_tiered, t_layout)
+    line("solo PriceTable.cost", t_cost)
+    print("En bloque:")
+    line("cost_many, precio plano", t_many_flat)
+    line("cost_many, tramos", t_many)
+    line("compute_layouts_batch, precio plano", t_batch)
+    line("compute_layouts_batch + price_batch, tramos", t_tbatch, t_batch)
+
+if __name__ == "__main__":
+    main()
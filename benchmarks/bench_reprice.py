@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: cambiar el precio por metro sin recalcular la geometría.
+
+Compara, para los mismos presupuestos, el recálculo completo con el nuevo
+precio (compute_layout / compute_layouts_batch) frente a aplicarlo sobre la
+geometría ya calculada (caché de geometrías, reprice_batch, price_sweep), y
+mide cuánto tarda HistoryStore.reprice en actualizar un historial entero.
+
+Uso:
+    python benchmarks/bench_reprice.py [--n 100000] [--history 100000] [--sweep 1000]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from dataclasses import asdict, replace
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_calc import best_of, make_inputs, to_columns  # noqa: E402
+from presupuestos_dtf.cache import LayoutCache  # noqa: E402
+from presupuestos_dtf.calc import (  # noqa: E402
+    compute_geometry, compute_layout, compute_layouts_batch, price_layout, price_sweep, reprice_batch,
+)
+from presupuestos_dtf.history import HistoryStore, QuoteRecord  # noqa: E402
+from presupuestos_dtf.models import CalcInput  # noqa: E402
+
+NEW_PRICE = 12.5
+
+def row(label: str, seconds: float, n: int, ref: float | None = None) -> None:
+    speedup = f"{ref / seconds:>7.1f}×" if ref else ""
+    print(f"  {label:<38} {seconds * 1e3:>9.1f} ms {n / seconds:>12,.0f} /s {speedup}")
+
+def make_record(data: CalcInput, t: float) -> QuoteRecord:
+    r0 = compute_layout(replace(data, orientation_deg=0))
+    r90 = compute_layout(replace(data, orientation_deg=90))
+    best = min(r0, r90, key=lambda r: r.cost)
+    return QuoteRecord(
+        customer=f"Cliente {int(t) % 2000:04d}", image_width_cm=data.image_width_cm,
+        image_height_cm=data.image_height_cm,
+        num_copies=data.num_copies, roll_width_cm=data.roll_width_cm, price_per_meter=data.price_per_meter,
+        margin_top_cm=data.margin_top_cm, margin_right_cm=data.margin_right_cm,
+        length_0_cm=r0.total_height_cm, cost_0=r0.cost, length_90_cm=r90.total_height_cm, cost_90=r90.cost,
+        chosen_orientation=best.orientation_deg, chosen_length_cm=best.total_height_cm, chosen_cost=best.cost,
+        details={"0": asdict(r0), "90": asdict(r90)}, created_at=t,
+    )
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=100_000, help="Presupuestos abiertos a recalcular")
+    ap.add_argument("--history", type=int, default=100_000, help="Filas del historial (0 = omitir)")
+    ap.add_argument("--sweep", type=int, default=1_000, help="Precios del barrido \"¿y si…?\"")
+    args = ap.parse_args()
+
+    inputs = make_inputs(args.n)
+    cols = to_columns(inputs)
+    repriced = [replace(i, price_per_meter=NEW_PRICE) for i in inputs]
+
+    print(f"Nuevo precio sobre {args.n} presupuestos:")
+    t_full = best_of(lambda: [compute_layout(i) for i in repriced], 3)
+    row("compute_layout (todo de nuevo)", t_full, args.n)
+    cache = LayoutCache(maxsize=args.n)
+    for i in inputs:
+        cache.geometry(i)
+    t_cache = best_of(lambda: [cache.get(i) for i in repriced], 3)
+    row("LayoutCache.get (geometría en caché)", t_cache, args.n, t_full)
+    geoms = [compute_geometry(i) for i in inputs]
+    t_price = best_of(lambda: [price_layout(g, NEW_PRICE) for g in geoms], 3)
+    row("price_layout sobre geometrías", t_price, args.n, t_full)
+
+    batch = compute_layouts_batch(**cols)
+    t_batch = best_of(lambda: compute_layouts_batch(**dict(cols, price_per_meter=NEW_PRICE)), 3)
+    row("compute_layouts_batch (todo de nuevo)", t_batch, args.n)
+    t_rb = best_of(lambda: reprice_batch(batch, NEW_PRICE), 3)
+    row("reprice_batch (solo columna de coste)", t_rb, args.n, t_batch)
+    assert reprice_batch(batch, NEW_PRICE).row(0) == compute_layout(repriced[0])
+
+    prices = [5.0 + k * 0.01 for k in range(args.sweep)]
+    t_sweep = best_of(lambda: price_sweep(geoms[0], prices), 20)
+    row(f"price_sweep ({args.sweep} precios)", t_sweep, args.sweep)
+
+    if args.history:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = HistoryStore(Path(tmp) / "history.sqlite3")
+            t_start = time.time() - args.history
+            for k, data in enumerate(make_inputs(args.history, seed=5)):
+                store.add(make_record(data, t_start + k))
+            store.flush()
+            print(f"\nHistorial de {args.history} presupuestos (una UPDATE, costes de `details` incluidos):")
+            for price in (NEW_PRICE, NEW_PRICE + 1):
+                t0 = time.perf_counter()
+                n = store.reprice(price)
+                row(f"HistoryStore.reprice({price:g}) → {n} filas", time.perf_counter() - t0, args.history)
+            store.close()
+
+if __name__ == "__main__":
+    main()
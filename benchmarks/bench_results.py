@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de memoria: 1M resultados en memoria según cómo se guarden.
+
+Compara una lista de CalcResult como dataclass sin __slots__ (lo que había
+antes), una lista de CalcResult con __slots__ y una CalcResultTable
+(columnas tipadas): memoria retenida (tracemalloc, en una pasada aparte para
+no distorsionar los tiempos), tiempo de construcción, recorrido (suma de
+costes por objetos, por vistas y por la columna) y la conversión de ida y
+vuelta, que tiene que ser exacta.
+
+Uso:
+    python benchmarks/bench_results.py [--n 1000000]
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from dataclasses import astuple, fields, make_dataclass
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_calc import make_inputs, to_columns  # noqa: E402
+from presupuestos_dtf.calc import compute_layouts_batch  # noqa: E402
+from presupuestos_dtf.models import CalcResult, CalcResultTable  # noqa: E402
+
+# CalcResult tal como era: dataclass congelada con __dict__ por instancia
+DictCalcResult = make_dataclass("DictCalcResult", [(f.name, f.type) for f in fields(CalcResult)], frozen=True)
+
+def measure(build):
+    """(objeto, segundos, bytes retenidos): el tiempo sin tracemalloc, la memoria con él."""
+    gc.collect()
+    t0 = time.perf_counter()
+    obj = build()
+    seconds = time.perf_counter() - t0
+    del obj
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, seconds, size
+
+def timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=1_000_000)
+    args = ap.parse_args()
+
+    # Resultados de partida: 20k entradas distintas repetidas hasta n
+    base = compute_layouts_batch(**to_columns(make_inputs(20_000)))
+    reps = -(-args.n // len(base))
+    source = CalcResultTable(*(getattr(base, f.name) * reps for f in fields(CalcResultTable)))
+    source = CalcResultTable(*(getattr(source, f.name)[:args.n] for f in fields(CalcResultTable)))
+    print(f"{len(source):,} resultados\n")
+
+    cases = {
+        "list[CalcResult] con __dict__": lambda: [DictCalcResult(*v) for v in zip(*astuple(source))],
+        "list[CalcResult] con __slots__": source.to_results,
+        "CalcResultTable (columnas)": lambda: CalcResultTable(*(c[:] for c in astuple(source))),
+    }
+    print(f"  {'':<32} {'MB':>8} {'B/resultado':>12} {'construir s':>12} {'sumar costes s':>15}")
+    built = {}
+    for label, build in cases.items():
+        obj, seconds, size = measure(build)
+        built[label] = obj
+        if isinstance(obj, CalcResultTable):
+            walk = timed(lambda obj=obj: sum(obj.cost))
+        else:
+            walk = timed(lambda obj=obj: sum(r.cost for r in obj))
+        print(f"  {label:<32} {size / 1e6:>8.1f} {size / len(source):>12.1f} {seconds:>12.2f} {walk:>15.3f}")
+
+    table = built["CalcResultTable (columnas)"]
+    print(f"\n  datos de las columnas (nbytes): {table.nbytes / 1e6:.1f} MB")
+    print(f"  recorrer la tabla con vistas:  {timed(lambda: sum(v.cost for v in table)):.3f} s")
+    results = built["list[CalcResult] con __slots__"]
+    t_from = timed(lambda: CalcResultTable.from_results(results))
+    t_to = timed(table.to_results)
+    assert CalcResultTable.from_results(results) == table and table.to_results() == results
+    print(f"  from_results: {t_from:.2f} s · to_results: {t_to:.2f} s (ida y vuelta exacta)")
+
+if __name__ == "__main__":
+    main()
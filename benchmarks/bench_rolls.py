@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: comparar un presupuesto con todo el catálogo de rollos.
+
+Genera decenas de perfiles (proveedores × anchos, algunos con tarifa propia)
+y mide la latencia por presupuesto de rank_rolls (las dos orientaciones de
+todos los rollos en una sola pasada de compute_layouts_batch, más la mezcla
+óptima) frente al bucle ingenuo de compute_layout + tarifa perfil a perfil.
+
+Uso:
+    python benchmarks/bench_rolls.py [--profiles 48] [--n 500]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_calc import make_inputs  # noqa: E402
+from presupuestos_dtf.calc import compute_layout, optimize_mixed_layout  # noqa: E402
+from presupuestos_dtf.models import CalcInput  # noqa: E402
+from presupuestos_dtf.pricing import parse_pricing  # noqa: E402
+from presupuestos_dtf.rolls import best_per_profile, parse_rolls, rank_rolls  # noqa: E402
+
+WIDTHS = (30, 33, 40, 45, 57, 58, 60, 61, 75, 100, 110, 120)
+
+def make_profiles(n: int):
+    general = parse_pricing({"setup_fee": 2, "minimum_charge": 5, "markups": {"Club Norte": 10}})
+    rolls = []
+    for k in range(n):
+        width = WIDTHS[k % len(WIDTHS)]
+        roll = {"name": f"Rollo {width} #{k}", "supplier": f"Proveedor {k // len(WIDTHS) + 1}",
+                "width_cm": width, "price_per_meter": round(width * 0.2 + (k % 5) * 0.3, 2)}
+        if k % 3 == 0:
+            roll["pricing"] = {"tiers": [{"from_m": 10, "price_per_meter": width * 0.17},
+                                         {"from_m": 50, "price_per_meter": width * 0.15}]}
+        rolls.append(roll)
+    return parse_rolls(rolls, general)
+
+def naive(profiles, d: CalcInput, customer: str):
+    """Un compute_layout por perfil y orientación, más la mezcla de cada perfil."""
+    options = []
+    for p in profiles:
+        table = p.rules.table(p.price_per_meter, customer)
+        for o, w in ((0, d.image_width_cm), (90, d.image_height_cm)):
+            if w <= p.width_cm:
+                r = compute_layout(CalcInput(p.width_cm, 0.0, d.image_width_cm, d.image_height_cm,
+                                             d.margin_top_cm, d.margin_right_cm, d.num_copies, o))
+                options.append((table.cost(r.total_height_m), p, o))
+        if min(d.image_width_cm, d.image_height_cm) <= p.width_cm:
+            opt = optimize_mixed_layout(CalcInput(p.width_cm, 0.0, d.image_width_cm, d.image_height_cm,
+                                                  d.margin_top_cm, d.margin_right_cm, d.num_copies, 0))
+            # optimize_mixed_layout pone al menos un diseño por fila aunque no quepa
+            if not ((opt.rows_0 and d.image_width_cm > p.width_cm)
+                    or (opt.rows_90 and d.image_height_cm > p.width_cm)):
+                options.append((table.cost(opt.total_height_m), p, -1))
+    options.sort(key=lambda t: t[0])
+    return options
+
+def latencies(fn, inputs) -> list[float]:
+    out = []
+    for d in inputs:
+        t0 = time.perf_counter()
+        fn(d)
+        out.append(time.perf_counter() - t0)
+    return out
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--profiles", type=int, default=48)
+    ap.add_argument("--n", type=int, default=500, help="Presupuestos distintos")
+    args = ap.parse_args()
+
+    profiles = make_profiles(args.profiles)
+    inputs = make_inputs(args.n)
+    customer = "Club Norte"
+    print(f"{len(profiles)} perfiles de rollo, {args.n} presupuestos\n")
+
+    # Mismo ganador por los dos caminos (a igual coste puede cambiar el perfil)
+    for d in inputs[:50]:
+        best = rank_rolls(profiles, d.image_width_cm, d.image_height_cm, d.num_copies,
+                          d.margin_top_cm, d.margin_right_cm, customer)
+        ref = naive(profiles, d, customer)
+        assert (not best and not ref) or abs(best[0].cost - ref[0][0]) < 1e-9
+
+    cases = {
+        "bucle perfil a perfil": lambda d: naive(profiles, d, customer),
+        "rank_rolls": lambda d: best_per_profile(rank_rolls(
+            profiles, d.image_width_cm, d.image_height_cm, d.num_copies,
+            d.margin_top_cm, d.margin_right_cm, customer)),
+        "rank_rolls sin mezcla": lambda d: best_per_profile(rank_rolls(
+            profiles, d.image_width_cm, d.image_height_cm, d.num_copies,
+            d.margin_top_cm, d.margin_right_cm, customer, mixed=False)),
+    }
+    print(f"  {'':<24} {'p50 ms':>8} {'p99 ms':>8} {'máx ms':>8}")
+    for label, fn in cases.items():
+        lat = sorted(latencies(fn, inputs))
+        p99 = lat[min(len(lat) - 1, int(len(lat) * 0.99))]
+        print(f"  {label:<24} {statistics.median(lat) * 1e3:>8.3f} {p99 * 1e3:>8.3f} {lat[-1] * 1e3:>8.3f}")
+
+if __name__ == "__main__":
+    main()
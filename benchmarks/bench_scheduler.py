@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark del planificador de producción con 1.000–10.000 pedidos sintéticos.
+
+Para cada tamaño mide el reparto inicial (sin búsqueda) y el plan con
+búsqueda local en 1 y en --jobs procesos con el mismo presupuesto de tiempo:
+tiempo total, tiradas, metros de film frente a imprimir cada pedido por
+separado y metros ahorrados.
+
+Uso:
+    python benchmarks/bench_scheduler.py [--orders 1000 5000 10000] [--budget 1.0] [--jobs 4]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from presupuestos_dtf.models import NestItem  # noqa: E402
+from presupuestos_dtf.scheduler import schedule_orders  # noqa: E402
+
+ROLL_WIDTH_CM = 57.0
+MARGIN_CM = 0.5
+
+# Medidas habituales (logo pecho, manga, frontal, espalda…) y tiradas cortas
+SIZES = ((8, 8), (10, 10), (7, 30), (10, 15), (28, 12), (25, 30), (30, 40), (20, 28), (5, 5), (12, 6))
+COPIES = (1, 2, 3, 5, 8, 10, 12, 15, 20, 25, 30, 50, 75, 100, 150)
+
+def make_orders(n: int, seed: int = 7) -> list[NestItem]:
+    rnd = random.Random(seed)
+    orders = []
+    for k in range(n):
+        w, h = rnd.choice(SIZES)
+        scale = rnd.choice((0.8, 1.0, 1.0, 1.2))
+        orders.append(NestItem(round(w * scale, 1), round(h * scale, 1), rnd.choice(COPIES),
+                               rotatable=rnd.random() < 0.85, name=f"P{k:05d}"))
+    return orders
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--orders", type=int, nargs="+", default=[1_000, 5_000, 10_000])
+    ap.add_argument("--budget", type=float, default=1.0, help="Segundos de búsqueda por bloque")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--run-length-m", type=float, default=100.0)
+    args = ap.parse_args()
+
+    print(f"Rollo de {ROLL_WIDTH_CM:g} cm, tiradas de hasta {args.run_length_m:g} m, "
+          f"{os.cpu_count()} CPU\n")
+    print(f"{'pedidos':>8} {'variante':<22} {'s':>6} {'tiradas':>8} {'por separado m':>15} "
+          f"{'plan m':>9} {'ahorro m':>9} {'ahorro':>7}")
+    for n in args.orders:
+        orders = make_orders(n)
+        variants = [("reparto inicial", 0.0, 1), ("búsqueda, 1 proceso", args.budget, 1)]
+        if args.jobs > 1:
+            variants.append((f"búsqueda, {args.jobs} procesos", args.budget, args.jobs))
+        for label, budget, jobs in variants:
+            t0 = time.perf_counter()
+            plan = schedule_orders(orders, ROLL_WIDTH_CM, MARGIN_CM, MARGIN_CM,
+                                   run_length_m=args.run_length_m, time_budget_s=budget, jobs=jobs)
+            dt = time.perf_counter() - t0
+            print(f"{n:>8} {label:<22} {dt:>6.2f} {len(plan.runs):>8} {plan.separate_height_m:>15.2f} "
+                  f"{plan.total_height_m:>9.2f} {plan.saved_m:>9.2f} "
+                  f"{plan.saved_m / plan.separate_height_m:>7.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Prueba de carga del servicio HTTP de presupuestos en localhost.
+
+Abre `--connections` conexiones keep-alive y lanza `--requests` peticiones
+repartidas entre ellas. Informa de p50/p99 de latencia y peticiones/s.
+Sin --port arranca su propio servidor en un subproceso.
+
+Uso:
+    python benchmarks/loadtest_server.py [--requests 20000] [--connections 32] [--batch 0]
+    python benchmarks/loadtest_server.py --port 8765   # contra un servidor ya en marcha
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _payload(rnd: random.Random, batch: int) -> tuple[str, bytes]:
+    def item():
+        return {"width_cm": round(rnd.uniform(2, 50), 1), "height_cm": round(rnd.uniform(2, 60), 1),
+                "copies": rnd.randint(1, 500)}
+    if batch:
+        return "/quote/batch", json.dumps({"items": [item() for _ in range(batch)]}).encode()
+    return "/quote", json.dumps(item()).encode()
+
+async def _client(host: str, port: int, n: int, batch: int, latencies: list, seed: int) -> None:
+    rnd = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(n):
+            path, body = _payload(rnd, batch)
+            req = (f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                   f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+            t0 = time.perf_counter()
+            writer.write(req)
+            await writer.drain()
+            status = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                k, _, v = line.decode().partition(":")
+                if k.lower() == "content-length":
+                    length = int(v)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - t0)
+            if b" 200 " not in status:
+                raise RuntimeError(f"Respuesta inesperada: {status!r}")
+    finally:
+        writer.close()
+
+def _pct(sorted_vals: list[float], p: float) -> float:
+    return sorted_vals[min(len(sorted_vals) - 1, int(round(p / 100.0 * (len(sorted_vals) - 1))))]
+
+async def _wait_port(host: str, port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, w = await asyncio.open_connection(host, port)
+            w.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+async def main_async(args) -> None:
+    host = "127.0.0.1"
+    port = args.port or _free_port()
+    proc = None
+    if not args.port:
+        proc = subprocess.Popen([sys.executable, "-m", "presupuestos_dtf", "serve", "--port", str(port)],
+                                cwd=str(ROOT), stdout=subprocess.DEVNULL)
+    try:
+        await _wait_port(host, port)
+        per_conn = max(1, args.requests // args.connections)
+        latencies: list[float] = []
+        t0 = time.perf_counter()
+        await asyncio.gather(*(_client(host, port, per_conn, args.batch, latencies, i)
+                               for i in range(args.connections)))
+        elapsed = time.perf_counter() - t0
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+    lat = sorted(latencies)
+    kind = f"lote de {args.batch}" if args.batch else "pedido único"
+    print(f"peticiones: {len(lat)} ({kind}), conexiones: {args.connections}")
+    print(f"  p50     : {_pct(lat, 50) * 1e3:8.2f} ms")
+    print(f"  p99     : {_pct(lat, 99) * 1e3:8.2f} ms")
+    print(f"  máx     : {lat[-1] * 1e3:8.2f} ms")
+    print(f"  req/s   : {len(lat) / elapsed:10,.0f}")
+    if args.batch:
+        print(f"  quotes/s: {len(lat) * args.batch / elapsed:10,.0f}")
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--requests", type=int, default=20_000)
+    ap.add_argument("--connections", type=int, default=32)
+    ap.add_argument("--batch", type=int, default=0, help="Pedidos por petición (0 = /quote)")
+    ap.add_argument("--port", type=int, default=0, help="Usar un servidor ya arrancado")
+    asyncio.run(main_async(ap.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+Suite de benchmarks: núcleo de cálculo, configuración, UI y arranque.
+
+Casos:
+    calc.compute_layout        layouts/s con compute_layout (sin caché)
+    calc.compute_layouts_batch layouts/s con la versión por lotes
+    config.load_config         ms por llamada (mediana)
+    config.save_config         ms por llamada (mediana)
+    ui.on_calcular             ms de on_calcular hasta el resultado pintado (mediana)
+    startup.first_paint        ms desde el primer import hasta el primer pintado
+
+Los casos de UI y arranque necesitan pantalla. En Linux sin DISPLAY se lanza
+Xvfb si está instalado; si no, se marcan como omitidos. La configuración y el
+historial se escriben en una carpeta temporal, nunca en los del usuario.
+
+Uso:
+    python benchmarks/run_suite.py                       # resultados en benchmarks/results.json
+    python benchmarks/run_suite.py --save-baseline       # fija la referencia
+    python benchmarks/run_suite.py --fail-on-regression  # código 1 si algo empeora > tolerancia
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+sys.path.insert(0, str(ROOT))
+
+DEFAULT_RESULTS = HERE / "results.json"
+DEFAULT_BASELINE = HERE / "baseline.json"
+DEFAULT_TOLERANCE = 0.20
+
+# -------- Utilidades -------- #
+def _median_ms(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1e3
+
+def _metric(value: float, unit: str, better: str) -> dict:
+    return {"value": round(value, 4), "unit": unit, "better": better}
+
+def _sandbox_env(home: Path) -> dict:
+    """Entorno con la carpeta de configuración apuntando a `home`."""
+    env = dict(os.environ)
+    env["HOME"] = env["USERPROFILE"] = env["APPDATA"] = str(home)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+# -------- Casos en proceso -------- #
+def bench_calc(quick: bool) -> dict:
+    from bench_calc import make_inputs, to_columns
+    from presupuestos_dtf.calc import compute_layout, compute_layouts_batch
+
+    n = 5_000 if quick else 50_000
+    inputs = make_inputs(n)
+    cols = to_columns(inputs)
+    t_scalar = min(_median_ms(lambda: [compute_layout(i) for i in inputs], 1) for _ in range(3))
+    t_batch = min(_median_ms(lambda: compute_layouts_batch(**cols), 1) for _ in range(3))
+    return {
+        "calc.compute_layout": _metric(n / (t_scalar / 1e3), "layouts/s", "higher"),
+        "calc.compute_layouts_batch": _metric(n / (t_batch / 1e3), "layouts/s", "higher"),
+    }
+
+def bench_config(quick: bool) -> dict:
+    from presupuestos_dtf import config
+
+    repeat = 50 if quick else 300
+    values = iter(range(10**9))
+    config.save_config(57.0, 11.0, 0.5, 0.5)
+    # Cada guardado cambia un valor: así se mide también el aviso a los listeners
+    t_load = _median_ms(config.load_config, repeat)
+    t_save = _median_ms(lambda: config.save_config(57.0, 11.0 + next(values) % 2, 0.5, 0.5), repeat)
+    return {
+        "config.load_config": _metric(t_load, "ms", "lower"),
+        "config.save_config": _metric(t_save, "ms", "lower"),
+    }
+
+# -------- Casos en subproceso (necesitan pantalla) -------- #
+_UI_WORKER = r"""
+import json, statistics, sys, time
+import tkinter as tk
+from presupuestos_dtf.ui import PresupuestoApp
+
+repeat = int(sys.argv[1])
+root = tk.Tk()
+app = PresupuestoApp(root)
+root.update()
+times = []
+for k in range(repeat):
+    # Medidas distintas en cada vuelta: sin aciertos de caché
+    app.image_width_cm.set(5 + (k % 40) * 0.5)
+    app.image_height_cm.set(7 + (k % 37) * 0.5)
+    app.num_copies.set(50 + k)
+    t0 = time.perf_counter()
+    app.on_calcular()
+    while app.jobs.busy():  # el cálculo va al pool; se espera a que se pinte
+        root.update()
+    root.update_idletasks()
+    times.append(time.perf_counter() - t0)
+if app._history is not None:
+    app._history.close()
+root.destroy()
+print(json.dumps({"ms": statistics.median(times) * 1e3}))
+"""
+
+_STARTUP_WORKER = r"""
+import presupuestos_dtf.startup as startup
+import json, os, sys
+
+def _dump(self):
+    # Primer pintado alcanzado: se informa y se sale sin esperar al updater
+    print(json.dumps({m[0]: m[2] * 1e3 for m in self.marks}), flush=True)
+    os._exit(0)
+
+startup.StartupProfile.dump = _dump
+from presupuestos_dtf.app import run
+run(startup_profile=True)
+"""
+
+def _run_worker(code: str, args: list[str], env: dict, timeout: float = 120.0) -> dict:
+    out = subprocess.run([sys.executable, "-c", code, *args], env=env, cwd=str(ROOT),
+                         capture_output=True, text=True, timeout=timeout)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else f"código {out.returncode}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def bench_ui(quick: bool, env: dict) -> dict:
+    data = _run_worker(_UI_WORKER, [str(20 if quick else 100)], env)
+    return {"ui.on_calcular": _metric(data["ms"], "ms", "lower")}
+
+def bench_startup(quick: bool, env: dict) -> dict:
+    runs = [_run_worker(_STARTUP_WORKER, [], env) for _ in range(2 if quick else 5)]
+    first_paint = statistics.median(r["primer pintado"] for r in runs)
+    return {"startup.first_paint": _metric(first_paint, "ms", "lower")}
+
+class _Display:
+    """DISPLAY disponible para los subprocesos; arranca Xvfb si hace falta."""
+    def __init__(self) -> None:
+        self.proc = None
+        self.display = None
+        self.reason = ""
+
+    def __enter__(self) -> "_Display":
+        if not sys.platform.startswith("linux") or os.environ.get("DISPLAY"):
+            self.display = os.environ.get("DISPLAY", "")
+            return self
+        xvfb = shutil.which("Xvfb")
+        if not xvfb:
+            self.reason = "sin DISPLAY ni Xvfb"
+            return self
+        r, w = os.pipe()
+        self.proc = subprocess.Popen([xvfb, "-displayfd", str(w), "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                                     pass_fds=(w,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        os.close(w)
+        with os.fdopen(r) as f:
+            num = f.readline().strip()
+        if num:
+            self.display = f":{num}"
+        else:
+            self.reason = "Xvfb no arrancó"
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.proc is not None:
+            self.proc.terminate()
+            self.proc.wait(timeout=10)
+
+# -------- Comparación -------- #
+def compare(results: dict, baseline: dict, tolerance: float) -> tuple[list[str], int]:
+    lines = [f"{'caso':<28} {'referencia':>14} {'actual':>14} {'cambio':>9}  estado"]
+    regressions = 0
+    for name, cur in results.items():
+        if "value" not in cur:
+            lines.append(f"{name:<28} {'':>14} {'':>14} {'':>9}  omitido ({cur.get('skipped', '')})")
+            continue
+        ref = baseline.get(name, {})
+        if "value" not in ref or not ref["value"]:
+            lines.append(f"{name:<28} {'—':>14} {cur['value']:>14,.3f} {'':>9}  nuevo")
+            continue
+        change = (cur["value"] - ref["value"]) / ref["value"]
+        worse = -change if cur["better"] == "higher" else change
+        if worse > tolerance:
+            status = "REGRESIÓN"
+            regressions += 1
+        elif worse < -tolerance:
+            status = "mejora"
+        else:
+            status = "ok"
+        lines.append(f"{name:<28} {ref['value']:>14,.3f} {cur['value']:>14,.3f} {change * 100:>+8.1f}%  {status}")
+    return lines, regressions
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-o", "--output", type=Path, default=DEFAULT_RESULTS)
+    ap.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    ap.add_argument("--save-baseline", action="store_true", help="Guardar los resultados como referencia")
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                    help="Empeoramiento relativo admitido (0.20 = 20%%)")
+    ap.add_argument("--fail-on-regression", action="store_true")
+    ap.add_argument("--quick", action="store_true", help="Menos repeticiones (para probar la suite)")
+    ap.add_argument("--no-ui", action="store_true", help="Omitir los casos de UI y arranque")
+    args = ap.parse_args()
+
+    from presupuestos_dtf import __version__
+
+    results: dict = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        env = _sandbox_env(home)
+        os.environ.update({k: env[k] for k in ("HOME", "USERPROFILE", "APPDATA")})
+
+        results.update(bench_calc(args.quick))
+        results.update(bench_config(args.quick))
+
+        ui_cases = (("ui.on_calcular", bench_ui), ("startup.first_paint", bench_startup))
+        if args.no_ui:
+            results.update({name: {"skipped": "--no-ui"} for name, _ in ui_cases})
+        else:
+            with _Display() as disp:
+                if disp.display:
+                    env["DISPLAY"] = disp.display
+                for name, fn in ui_cases:
+                    if disp.display is None:
+                        results[name] = {"skipped": disp.reason}
+                        continue
+                    try:
+                        results.update(fn(args.quick, env))
+                    except Exception as e:
+                        results[name] = {"skipped": f"error: {e}"}
+
+    report = {
+        "meta": {
+            "version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "quick": args.quick,
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    baseline = {}
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8")).get("results", {})
+    lines, regressions = compare(results, baseline, args.tolerance)
+    print("\n".join(lines))
+    print(f"\nResultados: {args.output}")
+    if args.save_baseline:
+        shutil.copyfile(args.output, args.baseline)
+        print(f"Referencia guardada en {args.baseline}")
+    elif not baseline:
+        print("Sin referencia: usa --save-baseline para fijarla.")
+    elif regressions:
+        print(f"{regressions} regresiones por encima del {args.tolerance:.0%}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,17 @@
 # -*- coding: utf-8 -*-
+import presupuestos_dtf.startup  # noqa: F401  (referencia de tiempo para --startup-profile)
+import sys
 from presupuestos_dtf.app import run
 
 if __name__ == "__main__":
-    run()
+    flags = sys.argv[1:]
+    if "--metrics" in flags or "--profile-calc" in flags:
+        from presupuestos_dtf.metrics import metrics
+        if "--metrics" in flags:
+            metrics.enable()
+        if "--profile-calc" in flags:
+            metrics.profile_next()
+    # Lo que no es una opción son ficheros a abrir (imágenes, carpetas, pedidos CSV/JSONL)
+    paths = [a for a in flags if not a.startswith("-")]
+    run(startup_profile="--startup-profile" in flags, paths=paths,
+        single_instance="--new-instance" not in flags)
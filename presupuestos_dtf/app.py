@@ -1,36 +1,80 @@
 # presupuestos_dtf/app.py
-import threading
-import tkinter as tk
-from tkinter import messagebox as mb
-from .ui import PresupuestoApp
-from .updater import check_for_update, download_and_replace
+from .startup import StartupProfile
+
+def run(startup_profile: bool = False, paths: list[str] | tuple[str, ...] = (),
+        single_instance: bool = True) -> None:
+    prof = StartupProfile(startup_profile)
+    prof.mark("inicio de run()")
+
+    # Con la app ya abierta se le pasan los ficheros y se sale: ni tkinter
+    # ni segunda comprobación de actualizaciones
+    server = None
+    if single_instance:
+        from . import instance
+        if instance.forward(paths):
+            prof.mark("entregado a otra instancia")
+            prof.dump()
+            return
+        server = instance.listen()
+        prof.mark("instancia única")
+
+    # Solo lo necesario para pintar la pestaña de cálculo; el updater
+    # (requests, zipfile, subprocess...) se importa en el hilo de fondo.
+    import tkinter as tk
+    from tkinter import messagebox as mb
+    prof.mark("import tkinter")
+    from .ui import PresupuestoApp, UpdateProgressDialog
+    prof.mark("import ui")
 
-def run() -> None:
     root = tk.Tk()
+    prof.mark("tk.Tk()")
     app = PresupuestoApp(root)
+    prof.mark("pestaña de cálculo")
+    if server is not None:
+        app.attach_instance(server)
+
+    # Actualizaciones: la red va en el pool de app.jobs y los diálogos en
+    # on_done/on_error, que JobScheduler entrega en el hilo de Tk
+    def _check_update():
+        from .updater import check_for_update
+        return check_for_update()
 
-    def _check_update_bg():
+    def _check_failed(e: BaseException):
         # Evita que un fallo de red rompa la app
-        try:
-            has_update, latest, url = check_for_update()
-        except Exception as e:
-            print("[Updater] check failed:", e)
+        print("[Updater] check failed:", e)
+
+    def _on_update_checked(result):
+        has_update, latest, url = result
+        # Aviso claro: se cerrará y reabrirá automáticamente
+        if not (has_update and url) or not mb.askyesno(
+            "Actualización disponible",
+            f"Hay una versión nueva ({latest}).\n"
+            f"Se descargará y la aplicación se reiniciará automáticamente.\n\n"
+            f"¿Actualizar ahora?"
+        ):
             return
+        from .updater import DownloadProgress, download_and_replace
+        progress = DownloadProgress()
+        UpdateProgressDialog(root, progress)
+
+        def failed(e: BaseException):
+            progress.finish()
+            mb.showerror("Error de actualización", f"No se pudo actualizar:\n{e}")
+
+        # Gestiona descarga + reemplazo + relanzar (sale del proceso si va bien)
+        app.jobs.submit("update", download_and_replace, url, progress, on_error=failed)
+
+    def _after_first_paint():
+        prof.mark("primer pintado")
+        app.build_deferred()
+        prof.mark("pestaña de configuración")
+        if paths:
+            app.open_paths(list(paths))
+        # Comprobación en segundo plano para no bloquear la UI
+        app.jobs.submit("update-check", _check_update, on_done=_on_update_checked, on_error=_check_failed)
+        prof.dump()
 
-        if has_update and url:
-            # Aviso claro: se cerrará y reabrirá automáticamente
-            if mb.askyesno(
-                "Actualización disponible",
-                f"Hay una versión nueva ({latest}).\n"
-                f"Se descargará y la aplicación se reiniciará automáticamente.\n\n"
-                f"¿Actualizar ahora?"
-            ):
-                try:
-                    download_and_replace(url)  # Gestiona descarga + reemplazo + relanzar
-                except Exception as e:
-                    mb.showerror("Error de actualización", f"No se pudo actualizar:\n{e}")
-
-    # Comprobación en segundo plano para no bloquear la UI
-    threading.Thread(target=_check_update_bg, daemon=True).start()
+    # after_idle + after(0): se ejecuta cuando Tk ya ha procesado el dibujado inicial
+    root.after_idle(lambda: root.after(0, _after_first_paint))
 
     root.mainloop()
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Caché LRU acotada de geometrías (compute_geometry).
+
+La clave es el CalcInput normalizado (floats canónicos, así 10 y 10.0 o
+10.0000000001 comparten entrada) y sin precio: la geometría solo depende del
+diseño, los márgenes, el rollo y las copias, y el coste se aplica encima con
+price_layout. Cambiar el precio no cuesta ningún recálculo. Se vacía sola
+cuando save_config cambia rollo o márgenes.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from .calc import compute_geometry, price_layout
+from .config import add_config_listener
+from .metrics import count, timer
+from .models import CalcInput, CalcResult, LayoutGeometry
+
+DEFAULT_MAXSIZE = 1024
+FLOAT_DIGITS = 6
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+def _canon(x: float) -> float:
+    # round() deja -0.0 tal cual; sumar 0.0 lo convierte en 0.0
+    return round(float(x), FLOAT_DIGITS) + 0.0
+
+def normalize_input(data: CalcInput) -> CalcInput:
+    return CalcInput(
+        roll_width_cm=_canon(data.roll_width_cm),
+        price_per_meter=_canon(data.price_per_meter),
+        image_width_cm=_canon(data.image_width_cm),
+        image_height_cm=_canon(data.image_height_cm),
+        margin_top_cm=_canon(data.margin_top_cm),
+        margin_right_cm=_canon(data.margin_right_cm),
+        num_copies=int(data.num_copies),
+        orientation_deg=int(data.orientation_deg),
+    )
+
+def geometry_key(data: CalcInput) -> CalcInput:
+    """Clave de caché: entrada normalizada con el precio a 0."""
+    return CalcInput(
+        roll_width_cm=_canon(data.roll_width_cm),
+        price_per_meter=0.0,
+        image_width_cm=_canon(data.image_width_cm),
+        image_height_cm=_canon(data.image_height_cm),
+        margin_top_cm=_canon(data.margin_top_cm),
+        margin_right_cm=_canon(data.margin_right_cm),
+        num_copies=int(data.num_copies),
+        orientation_deg=int(data.orientation_deg),
+    )
+
+class LayoutCache:
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize debe ser ≥ 1.")
+        self.maxsize = maxsize
+        self._data: "OrderedDict[CalcInput, LayoutGeometry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, data: CalcInput) -> CalcResult:
+        # El precio se aplica sin normalizar: coste idéntico al de compute_layout(data)
+        return price_layout(self.geometry(data), data.price_per_meter)
+
+    def geometry(self, data: CalcInput) -> LayoutGeometry:
+        key = geometry_key(data)
+        with self._lock:
+            geom = self._data.get(key)
+            if geom is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                count("calc.cache_hit")
+                return geom
+            self.misses += 1
+        count("calc.cache_miss")
+
+        # Se calcula fuera del lock y siempre sobre la clave normalizada,
+        # para que el resultado no dependa de qué variante entró primero.
+        with timer("calc.compute_geometry"):
+            geom = compute_geometry(key)
+        with self._lock:
+            self._data[key] = geom
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return geom
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.invalidations += 1
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self.hits, self.misses, self.evictions,
+                              self.invalidations, len(self._data), self.maxsize)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+layout_cache = LayoutCache()
+
+def cached_compute_layout(data: CalcInput) -> CalcResult:
+    return layout_cache.get(data)
+
+def _on_config_changed(old: dict, new: dict) -> None:
+    # Un cambio solo de precio no invalida nada: las claves no lo incluyen
+    if any(old.get(k) != new.get(k) for k in ("roll_width_cm", "margin_top_cm", "margin_right_cm")):
+        layout_cache.clear()
+
+add_config_listener(_on_config_changed)
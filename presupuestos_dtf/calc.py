@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
 import math
-from .models import CalcInput, CalcResult
+from array import array
+from dataclasses import replace
+from itertools import repeat
+from typing import Iterable, TypeVar
+from .models import CalcInput, CalcResult, CalcResultTable, LayoutGeometry, MixedLayoutResult
 
-def compute_layout(data: CalcInput) -> CalcResult:
+def compute_geometry(data: CalcInput) -> LayoutGeometry:
+    """Filas, aprovechamiento y longitud: todo lo que no depende del precio."""
     if data.orientation_deg not in (0, 90):
         raise ValueError("La orientación debe ser 0 o 90 grados.")
 
@@ -20,14 +25,200 @@ def compute_layout(data: CalcInput) -> CalcResult:
 
     total_height_cm = h * rows_needed + data.margin_top_cm * (rows_needed - 1)
     total_height_m = total_height_cm / 100.0
-    cost = total_height_m * data.price_per_meter
 
-    return CalcResult(
+    return LayoutGeometry(
         orientation_deg=data.orientation_deg,
         designs_per_row=designs_per_row,
         rows_needed=rows_needed,
         usage_percent=usage_percent,
         total_height_cm=total_height_cm,
         total_height_m=total_height_m,
-        cost=cost,
+    )
+
+def compute_layout(data: CalcInput) -> CalcResult:
+    return price_layout(compute_geometry(data), data.price_per_meter)
+
+# -------- Precio sobre geometría ya calculada -------- #
+def price_layout(geom: LayoutGeometry, price_per_meter: float) -> CalcResult:
+    return CalcResult(
+        orientation_deg=geom.orientation_deg,
+        designs_per_row=geom.designs_per_row,
+        rows_needed=geom.rows_needed,
+        usage_percent=geom.usage_percent,
+        total_height_cm=geom.total_height_cm,
+        total_height_m=geom.total_height_m,
+        cost=geom.total_height_m * price_per_meter,
+    )
+
+_Priced = TypeVar("_Priced")
+
+def reprice(result: _Priced, price_per_meter: float) -> _Priced:
+    """Mismo resultado (CalcResult, MixedLayoutResult o NestResult) con otro precio."""
+    return replace(result, cost=result.total_height_m * price_per_meter)
+
+def price_sweep(geom: LayoutGeometry, prices: Iterable[float]) -> array:
+    """Coste de una misma geometría para varios precios ("¿y si cobro X €/m?")."""
+    m = geom.total_height_m
+    return array("d", [m * p for p in prices])
+
+def reprice_batch(batch: CalcResultTable, price_per_meter) -> CalcResultTable:
+    """
+    Solo la columna de coste, con un precio escalar o uno por fila; el resto de
+    columnas se comparten con `batch` (no se copian).
+    """
+    if isinstance(price_per_meter, (int, float)):
+        cost = array("d", [m * price_per_meter for m in batch.total_height_m])
+    elif len(price_per_meter) != len(batch):
+        raise ValueError("Todas las columnas deben tener la misma longitud.")
+    else:
+        cost = array("d", [m * p for m, p in zip(batch.total_height_m, price_per_meter)])
+    return replace(batch, cost=cost)
+
+# -------- Optimizador de orientación mixta -------- #
+def _best_row(bw: float, bh: float, roll: float, mr: float, mt: float) -> tuple[int, int, float]:
+    """
+    Mejor fila con base de bw×bh: `a` copias en orientación base y el hueco
+    del borde relleno con columnas de copias giradas (bh×bw) apiladas.
+    Devuelve (copias base, copias giradas, ancho usado).
+    """
+    full = roll + mr
+    d = max(1, int(math.floor(full / (bw + mr))))
+    best = (d, 0, bw * d + mr * (d - 1))
+    # Copias giradas (alto bw) que caben apiladas en el alto bh de la fila
+    stack = int(math.floor((bh + mt) / (bw + mt))) if bw <= bh else 0
+    if stack == 0:
+        return best
+    for a in range(1, d + 1):
+        left = full - a * (bw + mr)
+        cols = int(math.floor(left / (bh + mr))) if left > 0 else 0
+        if a + cols * stack > best[0] + best[1]:
+            used = bw * a + mr * (a - 1) + (cols * (bh + mr) if cols else 0)
+            best = (a, cols * stack, used)
+    return best
+
+def optimize_mixed_layout(data: CalcInput) -> MixedLayoutResult:
+    """
+    Combinación de filas a 0° y 90° (con relleno girado en el borde) que
+    minimiza la longitud para `num_copies`. Ignora `orientation_deg`.
+
+    Solo hay dos tipos de fila útiles (alto = alto imagen o alto = ancho
+    imagen). En el óptimo, las filas del tipo con peor coste por copia son
+    menos que la capacidad del mejor tipo, así que basta con recorrer ese
+    rango: el coste no depende del número de copias.
+    """
+    iw, ih = data.image_width_cm, data.image_height_cm
+    mt, mr, roll = data.margin_top_cm, data.margin_right_cm, data.roll_width_cm
+    n = data.num_copies
+
+    a0, f0, used0 = _best_row(iw, ih, roll, mr, mt)
+    a90, f90, used90 = _best_row(ih, iw, roll, mr, mt)
+    k0, k90 = a0 + f0, a90 + f90
+    c0, c90 = ih + mt, iw + mt  # longitud por fila (con margen superior)
+
+    # "best" = tipo con menor longitud por copia; "other" = el otro
+    zero_is_best = c0 * k90 <= c90 * k0
+    kb, cb, ko, co = (k0, c0, k90, c90) if zero_is_best else (k90, c90, k0, c0)
+
+    best = None
+    for n_other in range(0, min(kb - 1, -(-n // ko)) + 1):
+        rem = n - n_other * ko
+        n_best = -(-rem // kb) if rem > 0 else 0
+        length = n_best * cb + n_other * co
+        if best is None or length < best[0]:
+            best = (length, n_best, n_other)
+
+    _, n_best, n_other = best
+    rows_0, rows_90 = (n_best, n_other) if zero_is_best else (n_other, n_best)
+    rows_needed = rows_0 + rows_90
+
+    used_in_row = max(used0 if rows_0 else 0.0, used90 if rows_90 else 0.0)
+    usage_percent = min(used_in_row / roll * 100.0, 100.0)
+    total_height_cm = ih * rows_0 + iw * rows_90 + mt * (rows_needed - 1)
+    total_height_m = total_height_cm / 100.0
+
+    return MixedLayoutResult(
+        rows_0=rows_0,
+        designs_per_row_0=a0,
+        fill_per_row_0=f0,
+        rows_90=rows_90,
+        designs_per_row_90=a90,
+        fill_per_row_90=f90,
+        rows_needed=rows_needed,
+        usage_percent=usage_percent,
+        total_height_cm=total_height_cm,
+        total_height_m=total_height_m,
+        cost=total_height_m * data.price_per_meter,
+    )
+
+# -------- Cálculo por lotes (columnas) -------- #
+def _batch_len(columns) -> int:
+    n = None
+    for col in columns:
+        if isinstance(col, (int, float)):
+            continue
+        if n is None:
+            n = len(col)
+        elif len(col) != n:
+            raise ValueError("Todas las columnas deben tener la misma longitud.")
+    return 1 if n is None else n
+
+def _column(col, n: int):
+    # Los escalares se difunden a toda la columna (como en NumPy)
+    return repeat(col, n) if isinstance(col, (int, float)) else col
+
+def compute_layouts_batch(
+    roll_width_cm, price_per_meter, image_width_cm, image_height_cm,
+    margin_top_cm, margin_right_cm, num_copies, orientation_deg,
+) -> CalcResultTable:
+    """
+    Versión en columnas de compute_layout: cada argumento es una secuencia
+    (list, array, ...) o un escalar que se aplica a todas las filas.
+    Produce exactamente los mismos valores que la función escalar.
+    """
+    cols = (roll_width_cm, price_per_meter, image_width_cm, image_height_cm,
+            margin_top_cm, margin_right_cm, num_copies, orientation_deg)
+    n = _batch_len(cols)
+
+    out_orient = array("i")
+    out_dpr = array("q")
+    out_rows = array("q")
+    out_usage = array("d")
+    out_hcm = array("d")
+    out_hm = array("d")
+    out_cost = array("d")
+
+    floor, ceil = math.floor, math.ceil
+    for roll, price, iw, ih, mt, mr, copies, orient in zip(*(_column(c, n) for c in cols)):
+        if orient == 0:
+            w, h = iw, ih
+        elif orient == 90:
+            w, h = ih, iw
+        else:
+            raise ValueError("La orientación debe ser 0 o 90 grados.")
+
+        dpr = int(floor((roll + mr) / (w + mr)))
+        if dpr < 1:
+            dpr = 1
+        rows = int(ceil(copies / dpr))
+        in_row = dpr if dpr < copies else copies
+        usage = (w * in_row + mr * (in_row - 1)) / roll * 100.0
+        hcm = h * rows + mt * (rows - 1)
+        hm = hcm / 100.0
+
+        out_orient.append(orient)
+        out_dpr.append(dpr)
+        out_rows.append(rows)
+        out_usage.append(usage if usage < 100.0 else 100.0)
+        out_hcm.append(hcm)
+        out_hm.append(hm)
+        out_cost.append(hm * price)
+
+    return CalcResultTable(
+        orientation_deg=out_orient,
+        designs_per_row=out_dpr,
+        rows_needed=out_rows,
+        usage_percent=out_usage,
+        total_height_cm=out_hcm,
+        total_height_m=out_hm,
+        cost=out_cost,
     )
@@ -0,0 +1,552 @@
+# -*- coding: utf-8 -*-
+"""
+Línea de comandos sin interfaz gráfica.
+
+    python -m presupuestos_dtf quote pedidos.csv -o presupuestos.jsonl --jobs 4
+
+Lee CSV o JSONL fila a fila, calcula cada presupuesto con compute_layout y
+escribe el resultado según avanza (memoria constante). No importa tkinter
+ni requests.
+"""
+import argparse
+import csv
+import io
+import json
+import math
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, TextIO
+from .calc import compute_layout
+from .config import load_config
+from .constants import MIN_VAL
+from .models import CalcInput, NestItem
+from .pricing import FLAT
+from .scheduler import DEFAULT_RUN_LENGTH_M, DEFAULT_TIME_BUDGET_S as DEFAULT_SCHEDULE_BUDGET_S, schedule_orders
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# Nombre de columna de entrada -> campo de CalcInput
+_ALIASES = {
+    "image_width_cm": "image_width_cm", "width_cm": "image_width_cm", "width": "image_width_cm",
+    "image_height_cm": "image_height_cm", "height_cm": "image_height_cm", "height": "image_height_cm",
+    "num_copies": "num_copies", "copies": "num_copies",
+    "orientation_deg": "orientation_deg", "orientation": "orientation_deg",
+    "roll_width_cm": "roll_width_cm",
+    "price_per_meter": "price_per_meter",
+    "margin_top_cm": "margin_top_cm",
+    "margin_right_cm": "margin_right_cm",
+}
+
+# Columnas con el cliente (para su recargo en la tarifa)
+_CUSTOMER_KEYS = ("customer", "client", "cliente")
+
+OUTPUT_FIELDS = [
+    "id", "image_width_cm", "image_height_cm", "num_copies", "orientation_deg",
+    "designs_per_row", "rows_needed", "usage_percent",
+    "total_height_cm", "total_height_m", "cost", "error",
+]
+
+# -------- Entrada / salida -------- #
+def _detect_format(path: str, explicit: str | None) -> str:
+    if explicit:
+        return explicit
+    return "jsonl" if Path(path).suffix.lower() in (".jsonl", ".ndjson", ".json") else "csv"
+
+def read_records(fp: TextIO, fmt: str) -> tuple[list[str] | None, Iterator]:
+    """
+    (cabecera, registros en bruto). En CSV cada registro es la lista de
+    campos; en JSONL (nº de línea, línea sin parsear). El parseo se hace en
+    quote_chunk, que es lo que se reparte entre procesos.
+    """
+    if fmt == "csv":
+        reader = csv.reader(fp)
+        header = next(reader, None) or []
+        return [h.strip().lower() for h in header], reader
+    return None, ((n, line) for n, line in enumerate(fp, 1) if line.strip())
+
+class _InvalidRow(dict):
+    """Registro que no se pudo leer: {"id": nº de línea, "error": motivo}."""
+
+def _iter_rows(records: list, header: list[str] | None) -> Iterator[dict]:
+    """Filas con las claves en minúsculas. Una línea JSONL rota no corta el resto."""
+    if header is None:
+        for n, line in records:
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                yield _InvalidRow(id=n, error="JSON no válido")
+                continue
+            if not isinstance(obj, dict):
+                yield _InvalidRow(id=n, error="JSON no válido: se esperaba un objeto")
+                continue
+            yield {str(k).strip().lower(): v for k, v in obj.items()}
+    else:
+        for rec in records:
+            yield dict(zip(header, rec))
+
+def _format(results: list[dict], fmt: str) -> str:
+    buf = io.StringIO()
+    if fmt == "csv":
+        csv.DictWriter(buf, fieldnames=OUTPUT_FIELDS, extrasaction="ignore").writerows(results)
+    else:
+        for r in results:
+            buf.write(json.dumps(r, ensure_ascii=False))
+            buf.write("\n")
+    return buf.getvalue()
+
+# -------- Cálculo -------- #
+def _customer(row: dict) -> str:
+    for key in _CUSTOMER_KEYS:
+        if row.get(key):
+            return str(row[key]).strip()
+    return ""
+
+def quote_row(row: dict, defaults: dict, index: int) -> dict:
+    """Presupuesto de una fila. Sin orientación elige la más barata."""
+    if isinstance(row, _InvalidRow):
+        return dict(row)
+    values = dict(defaults)
+    for k, v in row.items():
+        field = _ALIASES.get(k)
+        if field and v not in (None, ""):
+            values[field] = v
+    out = {"id": row.get("id", index)}
+    try:
+        base = dict(
+            roll_width_cm=float(values["roll_width_cm"]),
+            price_per_meter=float(values["price_per_meter"]),
+            image_width_cm=float(values["image_width_cm"]),
+            image_height_cm=float(values["image_height_cm"]),
+            margin_top_cm=float(values["margin_top_cm"]),
+            margin_right_cm=float(values["margin_right_cm"]),
+            num_copies=int(values["num_copies"]),
+        )
+        # inf/NaN pasan la comparación con MIN_VAL y revientan en compute_geometry
+        bad = [k for k, v in base.items() if k != "num_copies" and not (math.isfinite(v) and v >= MIN_VAL)]
+        if base["num_copies"] < 1:
+            bad.append("num_copies")
+        if bad:
+            raise ValueError("valores no válidos (por debajo del mínimo o no finitos): " + ", ".join(bad))
+
+        # Tarifa de config.json (tramos, arranque, mínimo, recargo del cliente de la fila)
+        rules = values.get("pricing") or FLAT
+        table = None if rules.flat else rules.table(base["price_per_meter"], _customer(row))
+
+        orient = str(values.get("orientation_deg", "auto")).strip().lower()
+        if orient in ("", "auto"):
+            r0 = compute_layout(CalcInput(**base, orientation_deg=0))
+            r90 = compute_layout(CalcInput(**base, orientation_deg=90))
+            if table is not None:
+                r0, r90 = table.price(r0), table.price(r90)
+            res = r90 if r90.cost < r0.cost else r0
+        else:
+            res = compute_layout(CalcInput(**base, orientation_deg=int(float(orient))))
+            if table is not None:
+                res = table.price(res)
+    except KeyError as e:
+        out["error"] = f"falta la columna {e.args[0]}"
+        return out
+    except OverflowError:  # int() de un Infinity de JSON
+        out["error"] = "valores no finitos"
+        return out
+    except (TypeError, ValueError) as e:
+        out["error"] = str(e)
+        return out
+
+    out.update(
+        image_width_cm=base["image_width_cm"],
+        image_height_cm=base["image_height_cm"],
+        num_copies=base["num_copies"],
+        orientation_deg=res.orientation_deg,
+        designs_per_row=res.designs_per_row,
+        rows_needed=res.rows_needed,
+        usage_percent=round(res.usage_percent, 4),
+        total_height_cm=round(res.total_height_cm, 4),
+        total_height_m=round(res.total_height_m, 6),
+        cost=round(res.cost, 2),
+    )
+    return out
+
+def quote_rows(rows: Iterable[dict], defaults: dict) -> Iterator[dict]:
+    """Generador fila a fila (claves de entrada en minúsculas)."""
+    for i, row in enumerate(rows):
+        yield quote_row(row, defaults, i)
+
+def quote_chunk(args: tuple) -> tuple[str, int]:
+    """Parsea, presupuesta y formatea un bloque. Devuelve (texto, nº errores)."""
+    records, header, out_fmt, defaults, start = args
+    results = [quote_row(r, defaults, start + i) for i, r in enumerate(_iter_rows(records, header))]
+    errors = sum(1 for r in results if "error" in r)
+    return _format(results, out_fmt), errors
+
+def _chunks(records: Iterable, size: int) -> Iterator[tuple[list, int]]:
+    it = iter(records)
+    start = 0
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk, start
+        start += len(chunk)
+
+def quote_stream(records: Iterable, header: list[str] | None, out_fmt: str, defaults: dict,
+                 jobs: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple[str, int]]:
+    """
+    Bloques de salida en el mismo orden de entrada. Con jobs > 1 reparte
+    bloques entre procesos, con un máximo de 2×jobs bloques en vuelo para que
+    la memoria no crezca con el tamaño del fichero.
+    """
+    tasks = ((chunk, header, out_fmt, defaults, start) for chunk, start in _chunks(records, chunk_size))
+    if jobs <= 1:
+        for t in tasks:
+            yield quote_chunk(t)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for t in tasks:
+            pending.append(pool.submit(quote_chunk, t))
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+# -------- Comando -------- #
+def _open_in(path: str) -> TextIO:
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="")
+    return open(path, "r", encoding="utf-8-sig", newline="")
+
+def _open_out(path: str) -> TextIO:
+    if path == "-":
+        return io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", newline="", write_through=False)
+    return open(path, "w", encoding="utf-8", newline="")
+
+def _load_config_warn() -> dict:
+    cfg = load_config()
+    if cfg["pricing_error"]:
+        print(f"Aviso: tarifa de config.json no válida ({cfg['pricing_error']}); se usa la plana.",
+              file=sys.stderr)
+    return cfg
+
+def cmd_quote(args: argparse.Namespace) -> int:
+    defaults = _load_config_warn()
+    for key in ("roll_width_cm", "price_per_meter", "margin_top_cm", "margin_right_cm"):
+        if getattr(args, key) is not None:
+            defaults[key] = getattr(args, key)
+
+    in_fmt = _detect_format(args.input, args.input_format)
+    out_fmt = _detect_format(args.output, args.output_format) if args.output != "-" else (args.output_format or "csv")
+
+    errors = 0
+    fin = _open_in(args.input)
+    fout = _open_out(args.output)
+    try:
+        header, records = read_records(fin, in_fmt)
+        if out_fmt == "csv":
+            csv.writer(fout).writerow(OUTPUT_FIELDS)
+        for text, n_err in quote_stream(records, header, out_fmt, defaults, args.jobs, args.chunk_size):
+            fout.write(text)
+            errors += n_err
+    finally:
+        fout.flush()
+        if args.input != "-":
+            fin.close()
+        if args.output != "-":
+            fout.close()
+    if errors:
+        print(f"{errors} filas con error", file=sys.stderr)
+    return 1 if errors and args.strict else 0
+
+def _design_spec(text: str) -> tuple[str, float, float, int]:
+    """'ruta.png:10x15:200' -> (ruta, ancho, alto, copias)."""
+    try:
+        path, size, copies = text.rsplit(":", 2)
+        w, h = size.lower().replace("×", "x").split("x")
+        return path, float(w), float(h), int(copies)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{text}': usa RUTA:ANCHOxALTO:COPIAS (p. ej. logo.png:10x15:200)")
+
+def cmd_export(args: argparse.Namespace) -> int:
+    from .calc import optimize_mixed_layout
+    from .export import export_gang_sheet
+    from .geometry import layout_from_mixed, layout_from_nest, layout_from_result
+    from .models import NestItem
+    from .nesting import nest_items
+
+    cfg = load_config()
+    for key in ("roll_width_cm", "margin_top_cm", "margin_right_cm"):
+        if getattr(args, key) is not None:
+            cfg[key] = getattr(args, key)
+    dpi = args.dpi or cfg["export_dpi"]
+    designs = args.designs
+    try:
+        if len(designs) > 1:
+            items = [NestItem(w, h, n, name=Path(p).name) for p, w, h, n in designs]
+            layout = layout_from_nest(nest_items(items, cfg["roll_width_cm"], cfg["price_per_meter"],
+                                                 cfg["margin_top_cm"], cfg["margin_right_cm"]))
+        else:
+            _, w, h, n = designs[0]
+            base = CalcInput(cfg["roll_width_cm"], cfg["price_per_meter"], w, h,
+                             cfg["margin_top_cm"], cfg["margin_right_cm"], n, 0)
+            if args.orientation == "optimo":
+                layout = layout_from_mixed(base, optimize_mixed_layout(base))
+            else:
+                options = [0, 90] if args.orientation == "auto" else [int(args.orientation)]
+                results = [compute_layout(replace(base, orientation_deg=o)) for o in options]
+                res = min(results, key=lambda r: r.cost)
+                layout = layout_from_result(replace(base, orientation_deg=res.orientation_deg), res)
+
+        def progress(done: int, total: int) -> None:
+            if sys.stderr is not None and sys.stderr.isatty():
+                print(f"\r{done * 100 // total:3d}%", end="", file=sys.stderr, flush=True)
+
+        res = export_gang_sheet(layout, [p for p, *_ in designs], args.output, dpi, progress=progress)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"\r{res.path}: {res.width_px}×{res.height_px} px a {res.dpi:g} DPI, "
+          f"{res.copies} copias, {layout.height_cm / 100:.3f} m ({res.seconds:.1f} s)", file=sys.stderr)
+    return 0
+
+def cmd_import(args: argparse.Namespace) -> int:
+    from .imageinfo import iter_image_files, scan_images, to_nest_items
+    from .nesting import nest_items
+
+    cfg = _load_config_warn()
+    for key in ("roll_width_cm", "price_per_meter", "margin_top_cm", "margin_right_cm"):
+        if getattr(args, key) is not None:
+            cfg[key] = getattr(args, key)
+    default_dpi = args.default_dpi or cfg["export_dpi"]
+    paths = []
+    for p in args.paths:
+        paths.extend(iter_image_files(p, args.recursive) if Path(p).is_dir() else [p])
+    results = scan_images(paths, args.jobs)
+    items = to_nest_items(results, default_dpi, args.copies, not args.no_rotate)
+
+    for r in results:
+        if r.error:
+            print(f"{r.path}: {r.error}", file=sys.stderr)
+    if args.output:
+        with _open_out(args.output) as fout:
+            w = csv.writer(fout)
+            w.writerow(["id", "width_cm", "height_cm", "copies", "path"])
+            w.writerows([it.name, it.width_cm, it.height_cm, it.copies, it.path] for it in items)
+    else:
+        for r, it in zip((r for r in results if r.info), items):
+            i = r.info
+            dpi = f"{i.dpi_x:.0f} DPI" if i.dpi_x else f"{default_dpi:.0f} DPI (supuesto)"
+            print(f"{it.name}: {i.width_px}×{i.height_px} px, {dpi} -> {it.width_cm:g}×{it.height_cm:g} cm")
+    if not items:
+        print("No se encontró ninguna imagen válida.", file=sys.stderr)
+        return 1
+
+    if not args.no_nest:
+        try:
+            res = nest_items(items, cfg["roll_width_cm"], cfg["price_per_meter"],
+                             cfg["margin_top_cm"], cfg["margin_right_cm"])
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        res = cfg["pricing"].table(cfg["price_per_meter"]).price(res)
+        print(f"Pedido: {len(items)} diseños, {len(res.placements)} copias, "
+              f"{res.total_height_m:.3f} m, aprovechamiento {res.usage_percent:.1f}%, "
+              f"coste {res.cost:.2f} €", file=sys.stderr)
+    return 1 if args.strict and len(items) < len(results) else 0
+
+SCHEDULE_FIELDS = ["run", "id", "image_width_cm", "image_height_cm", "num_copies", "orientation_deg",
+                   "designs_per_row", "full_rows", "shared_copies"]
+
+def _order_item(row: dict, index: int) -> NestItem:
+    """NestItem de una fila de pedido (mismas columnas que 'quote', más 'rotatable')."""
+    if isinstance(row, _InvalidRow):
+        raise ValueError(row["error"])
+    values = {}
+    for k, v in row.items():
+        field = _ALIASES.get(k)
+        if field and v not in (None, ""):
+            values[field] = v
+    try:
+        item = NestItem(
+            width_cm=float(values["image_width_cm"]),
+            height_cm=float(values["image_height_cm"]),
+            copies=int(values.get("num_copies", 1)),
+            rotatable=str(row.get("rotatable", "1")).strip().lower() not in ("0", "false", "no", "n"),
+            name=str(row.get("id", index)),
+        )
+    except KeyError as e:
+        raise ValueError(f"falta la columna {e.args[0]}")
+    except OverflowError:
+        raise ValueError("valores no finitos")
+    if not all(math.isfinite(v) and v >= MIN_VAL for v in (item.width_cm, item.height_cm)) or item.copies < 1:
+        raise ValueError("medidas o copias no válidas")
+    return item
+
+# Extensiones que se leen como fichero de pedidos (el resto, como imágenes)
+ORDER_SUFFIXES = (".csv", ".jsonl", ".ndjson", ".json")
+
+def read_orders(path: str, fmt: str | None = None) -> tuple[list[NestItem], list[tuple[str, str]]]:
+    """Pedidos de un CSV/JSONL ('-' = stdin): (los válidos, [(id, motivo)] de los que no)."""
+    items, errors = [], []
+    fin = _open_in(path)
+    try:
+        header, records = read_records(fin, _detect_format(path, fmt))
+        for i, row in enumerate(_iter_rows(records, header)):
+            try:
+                items.append(_order_item(row, i))
+            except (TypeError, ValueError) as e:
+                errors.append((str(row.get("id", i)), str(e)))
+    finally:
+        if path != "-":
+            fin.close()
+    return items, errors
+
+def cmd_schedule(args: argparse.Namespace) -> int:
+    cfg = _load_config_warn()
+    for key in ("roll_width_cm", "margin_top_cm", "margin_right_cm"):
+        if getattr(args, key) is not None:
+            cfg[key] = getattr(args, key)
+    out_fmt = _detect_format(args.output, args.output_format) if args.output != "-" else (args.output_format or "csv")
+
+    items, errors = read_orders(args.input, args.input_format)
+    for ref, msg in errors:
+        print(f"Pedido {ref}: {msg}", file=sys.stderr)
+    if not items:
+        print("No hay pedidos válidos.", file=sys.stderr)
+        return 1
+    try:
+        plan = schedule_orders(items, cfg["roll_width_cm"], cfg["margin_top_cm"], cfg["margin_right_cm"],
+                               args.run_length_m, args.time_budget, args.jobs)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    rows = []
+    for n, run in enumerate(plan.runs, 1):
+        print(f"Tirada {n}: {len(run.orders)} pedidos, {run.total_height_m:.3f} m "
+              f"({run.separate_height_m:.3f} m por separado), {len(run.shared_rows)} filas compartidas",
+              file=sys.stderr)
+        for o in run.orders:
+            it = items[o.item_index]
+            rows.append(dict(run=n, id=it.name, image_width_cm=it.width_cm, image_height_cm=it.height_cm,
+                             num_copies=it.copies, orientation_deg=o.orientation_deg,
+                             designs_per_row=o.designs_per_row, full_rows=o.full_rows,
+                             shared_copies=o.shared_copies))
+    fout = _open_out(args.output)
+    try:
+        if out_fmt == "csv":
+            w = csv.DictWriter(fout, fieldnames=SCHEDULE_FIELDS)
+            w.writeheader()
+            w.writerows(rows)
+        else:
+            for r in rows:
+                fout.write(json.dumps(r, ensure_ascii=False) + "\n")
+    finally:
+        fout.flush()
+        if args.output != "-":
+            fout.close()
+    print(f"{len(items)} pedidos en {len(plan.runs)} tiradas: {plan.total_height_m:.2f} m de film frente a "
+          f"{plan.separate_height_m:.2f} m por separado (ahorro {plan.saved_m:.2f} m)", file=sys.stderr)
+    return 1 if errors and args.strict else 0
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    from .server import serve
+    serve(args.host, args.port)
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m presupuestos_dtf")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="Mostrar tiempos de import y primer pintado de la app")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Medir rutas calientes y volcarlas a metrics.json/metrics.prom al salir")
+    parser.add_argument("--new-instance", action="store_true",
+                        help="Abrir otra ventana aunque la app ya esté abierta")
+    parser.add_argument("--profile-calc", action="store_true",
+                        help="Perfilar con cProfile el primer cálculo de la app")
+    sub = parser.add_subparsers(dest="command")
+
+    q = sub.add_parser("quote", help="Presupuestar un fichero CSV/JSONL sin interfaz gráfica")
+    q.add_argument("input", help="Fichero de entrada CSV/JSONL ('-' = stdin)")
+    q.add_argument("-o", "--output", default="-", help="Fichero de salida CSV/JSONL ('-' = stdout)")
+    q.add_argument("--input-format", choices=("csv", "jsonl"))
+    q.add_argument("--output-format", choices=("csv", "jsonl"))
+    q.add_argument("-j", "--jobs", type=int, default=1, help="Procesos en paralelo (por defecto 1)")
+    q.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    q.add_argument("--roll-width-cm", dest="roll_width_cm", type=float)
+    q.add_argument("--price-per-meter", dest="price_per_meter", type=float)
+    q.add_argument("--margin-top-cm", dest="margin_top_cm", type=float)
+    q.add_argument("--margin-right-cm", dest="margin_right_cm", type=float)
+    q.add_argument("--strict", action="store_true", help="Salir con código 1 si alguna fila falla")
+    q.set_defaults(func=cmd_quote)
+
+    ex = sub.add_parser("export", help="Gang sheet en PNG listo para imprimir")
+    ex.add_argument("designs", nargs="+", type=_design_spec, metavar="RUTA:ANCHOxALTO:COPIAS",
+                    help="Imagen del diseño, medidas en cm y copias; con varios se hace nesting")
+    ex.add_argument("-o", "--output", required=True, help="Fichero PNG de salida")
+    ex.add_argument("--dpi", type=float, help="Resolución (por defecto export_dpi de config.json, 300)")
+    ex.add_argument("--orientation", choices=("auto", "0", "90", "optimo"), default="auto",
+                    help="Con un solo diseño: orientación de las filas (auto = la más barata)")
+    ex.add_argument("--roll-width-cm", dest="roll_width_cm", type=float)
+    ex.add_argument("--margin-top-cm", dest="margin_top_cm", type=float)
+    ex.add_argument("--margin-right-cm", dest="margin_right_cm", type=float)
+    ex.set_defaults(func=cmd_export)
+
+    im = sub.add_parser("import", help="Pedido a partir de una carpeta de imágenes (medidas de la cabecera)")
+    im.add_argument("paths", nargs="+", help="Carpetas o ficheros PNG/JPEG/TIFF")
+    im.add_argument("-r", "--recursive", action="store_true", help="Incluir subcarpetas")
+    im.add_argument("-n", "--copies", type=int, default=1, help="Copias de cada diseño (por defecto 1)")
+    im.add_argument("--default-dpi", type=float,
+                    help="DPI si la imagen no lo indica (por defecto export_dpi de config.json, 300)")
+    im.add_argument("--no-rotate", action="store_true", help="No permitir girar los diseños")
+    im.add_argument("-j", "--jobs", type=int, default=8, help="Hilos de lectura (por defecto 8)")
+    im.add_argument("-o", "--output", help="Escribir las líneas del pedido en CSV (válido para 'quote')")
+    im.add_argument("--no-nest", action="store_true", help="Solo medir, sin calcular el pedido")
+    im.add_argument("--roll-width-cm", dest="roll_width_cm", type=float)
+    im.add_argument("--price-per-meter", dest="price_per_meter", type=float)
+    im.add_argument("--margin-top-cm", dest="margin_top_cm", type=float)
+    im.add_argument("--margin-right-cm", dest="margin_right_cm", type=float)
+    im.add_argument("--strict", action="store_true", help="Salir con código 1 si algún fichero falla")
+    im.set_defaults(func=cmd_import)
+
+    sc = sub.add_parser("schedule", help="Agrupar los pedidos del día en tiradas de rollo (menos film)")
+    sc.add_argument("input", help="Pedidos en CSV/JSONL ('-' = stdin): id, width_cm, height_cm, copies, rotatable")
+    sc.add_argument("-o", "--output", default="-", help="Plan por pedido en CSV/JSONL ('-' = stdout)")
+    sc.add_argument("--input-format", choices=("csv", "jsonl"))
+    sc.add_argument("--output-format", choices=("csv", "jsonl"))
+    sc.add_argument("--run-length-m", type=float, default=DEFAULT_RUN_LENGTH_M,
+                    help=f"Longitud máxima de una tirada (por defecto {DEFAULT_RUN_LENGTH_M:g} m)")
+    sc.add_argument("--time-budget", type=float, default=DEFAULT_SCHEDULE_BUDGET_S,
+                    help=f"Segundos de búsqueda (por defecto {DEFAULT_SCHEDULE_BUDGET_S:g})")
+    sc.add_argument("-j", "--jobs", type=int, default=1, help="Procesos para la búsqueda (por defecto 1)")
+    sc.add_argument("--roll-width-cm", dest="roll_width_cm", type=float)
+    sc.add_argument("--margin-top-cm", dest="margin_top_cm", type=float)
+    sc.add_argument("--margin-right-cm", dest="margin_right_cm", type=float)
+    sc.add_argument("--strict", action="store_true", help="Salir con código 1 si alguna fila falla")
+    sc.set_defaults(func=cmd_schedule)
+
+    srv = sub.add_parser("serve", help="Servicio HTTP/JSON local de presupuestos")
+    srv.add_argument("--host", default="127.0.0.1")
+    srv.add_argument("--port", type=int, default=8765)
+    srv.set_defaults(func=cmd_serve)
+    return parser
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.metrics or args.profile_calc:
+        from .metrics import metrics
+        if args.metrics:
+            metrics.enable()
+        if args.profile_calc:
+            metrics.profile_next()
+    if not getattr(args, "func", None):
+        # Sin subcomando: abrir la aplicación de escritorio
+        from .app import run
+        run(startup_profile=args.startup_profile, single_instance=not args.new_instance)
+        return 0
+    return args.func(args)
@@ -3,33 +3,67 @@ import json
 import os
 import sys
 from pathlib import Path
-from tkinter import messagebox
+from typing import Callable
 from .constants import (
     APP_DIRNAME, CONFIG_FILENAME,
     DEFAULT_ROLL_WIDTH_CM, DEFAULT_PRICE_PER_METER,
     DEFAULT_MARGIN_TOP_CM, DEFAULT_MARGIN_RIGHT_CM,
+    DEFAULT_UPDATE_CHECK_INTERVAL_H, DEFAULT_EXPORT_DPI,
 )
+from .metrics import timed
 
-def get_config_path() -> Path:
+# Callbacks (old, new) llamados cuando save_config cambia algún valor
+_listeners: list[Callable[[dict, dict], None]] = []
+
+def add_config_listener(callback: Callable[[dict, dict], None]) -> None:
+    if callback not in _listeners:
+        _listeners.append(callback)
+
+def remove_config_listener(callback: Callable[[dict, dict], None]) -> None:
+    if callback in _listeners:
+        _listeners.remove(callback)
+
+def get_config_dir() -> Path:
+    # Sin mkdir: la carpeta solo se crea al escribir (ver save_config)
     if sys.platform.startswith("win"):
         base = os.getenv("APPDATA", str(Path.home()))
-        cfg_dir = Path(base) / APP_DIRNAME
-    else:
-        cfg_dir = Path.home() / f".{APP_DIRNAME}"
-    cfg_dir.mkdir(parents=True, exist_ok=True)
-    return cfg_dir / CONFIG_FILENAME
+        return Path(base) / APP_DIRNAME
+    return Path.home() / f".{APP_DIRNAME}"
 
+def get_config_path() -> Path:
+    return get_config_dir() / CONFIG_FILENAME
+
+@timed("config.load")
 def load_config() -> dict:
+    # Aquí y no arriba: get_config_dir se usa antes de tkinter (instancia única) y no los necesita
+    from .pricing import FLAT, parse_pricing
+    from .rolls import parse_rolls
     p = get_config_path()
     if p.exists():
         try:
             with p.open("r", encoding="utf-8") as f:
                 data = json.load(f)
+                # Una tarifa mal escrita no invalida el resto: se usa la plana y se avisa
+                try:
+                    pricing, pricing_error = parse_pricing(data.get("pricing")), ""
+                except ValueError as e:
+                    pricing, pricing_error = FLAT, str(e)
+                try:
+                    rolls, rolls_error = parse_rolls(data.get("rolls"), pricing), ""
+                except ValueError as e:
+                    rolls, rolls_error = (), str(e)
                 return {
                     "roll_width_cm": float(data.get("roll_width_cm", DEFAULT_ROLL_WIDTH_CM)),
                     "price_per_meter": float(data.get("price_per_meter", DEFAULT_PRICE_PER_METER)),
                     "margin_top_cm": float(data.get("margin_top_cm", DEFAULT_MARGIN_TOP_CM)),
                     "margin_right_cm": float(data.get("margin_right_cm", DEFAULT_MARGIN_RIGHT_CM)),
+                    "update_check_interval_h": float(data.get("update_check_interval_h", DEFAULT_UPDATE_CHECK_INTERVAL_H)),
+                    "export_dpi": float(data.get("export_dpi", DEFAULT_EXPORT_DPI)),
+                    "presets_file": str(data.get("presets_file") or ""),
+                    "pricing": pricing,
+                    "pricing_error": pricing_error,
+                    "rolls": rolls,
+                    "rolls_error": rolls_error,
                 }
         except Exception:
             pass
@@ -38,8 +72,16 @@ def load_config() -> dict:
         "price_per_meter": DEFAULT_PRICE_PER_METER,
         "margin_top_cm": DEFAULT_MARGIN_TOP_CM,
         "margin_right_cm": DEFAULT_MARGIN_RIGHT_CM,
+        "update_check_interval_h": DEFAULT_UPDATE_CHECK_INTERVAL_H,
+        "export_dpi": DEFAULT_EXPORT_DPI,
+        "presets_file": "",
+        "pricing": FLAT,
+        "pricing_error": "",
+        "rolls": (),
+        "rolls_error": "",
     }
 
+@timed("config.save")
 def save_config(roll_width_cm: float, price_per_meter: float, margin_top_cm: float, margin_right_cm: float) -> None:
     data = {
         "roll_width_cm": roll_width_cm,
@@ -47,8 +89,24 @@ def save_config(roll_width_cm: float, price_per_meter: float, margin_top_cm: flo
         "margin_top_cm": margin_top_cm,
         "margin_right_cm": margin_right_cm,
     }
+    old = load_config()
     try:
-        with get_config_path().open("w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        p = get_config_path()
+        p.parent.mkdir(parents=True, exist_ok=True)
+        # Conservar claves que no gestiona la UI (p. ej. update_check_interval_h)
+        try:
+            merged = json.loads(p.read_text(encoding="utf-8"))
+            if not isinstance(merged, dict):
+                merged = {}
+        except Exception:
+            merged = {}
+        merged.update(data)
+        with p.open("w", encoding="utf-8") as f:
+            json.dump(merged, f, ensure_ascii=False, indent=2)
     except Exception as e:
+        from tkinter import messagebox  # solo con interfaz; la CLI no carga tkinter
         messagebox.showwarning("Aviso", f"No se pudo guardar la configuración:\n{e}")
+        return
+    if any(float(old[k]) != float(v) for k, v in data.items()):
+        for cb in list(_listeners):
+            cb(old, dict(data))
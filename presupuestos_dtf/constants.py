@@ -6,8 +6,18 @@ DEFAULT_PRICE_PER_METER = 11.0
 DEFAULT_MARGIN_TOP_CM = 0.5
 DEFAULT_MARGIN_RIGHT_CM = 0.5
 
+ORIENTATION_MIXED = -1  # resultado "Óptimo" (mezcla de filas a 0° y 90°)
+
 APP_DIRNAME = "PresupuestosDTF"
 CONFIG_FILENAME = "config.json"
+RELEASE_CACHE_FILENAME = "release_cache.json"
+
+# Mínimo entre comprobaciones de actualización (config.json: update_check_interval_h)
+DEFAULT_UPDATE_CHECK_INTERVAL_H = 6.0
 
 APP_TITLE = "Calculadora de presupuestos DTF"
 WINDOW_SIZE = "820x560"
+DEFAULT_EXPORT_DPI = 300.0  # resolución del PNG exportado (config.json: export_dpi)
+
+RECALC_DEBOUNCE_MS = 150  # espera tras la última tecla antes de recalcular
+INSTANCE_POLL_MS = 50     # cada cuánto se atienden los arranques posteriores (instancia única)
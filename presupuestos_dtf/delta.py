@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Actualizaciones delta del build onedir.
+
+Cada release publica, junto al ZIP, un manifiesto con el SHA-256 de cada
+fichero y la posición de sus datos comprimidos dentro del ZIP. El updater
+compara con la instalación local y descarga con peticiones Range solo los
+ficheros que cambian. El hash se calcula mientras se escribe, sin releer.
+
+Solo biblioteca estándar: la red la pone updater.py.
+"""
+import hashlib
+import json
+import os
+import struct
+import zipfile
+import zlib
+from pathlib import Path, PureWindowsPath
+from typing import Iterable
+
+MANIFEST_FORMAT = 1
+LOCAL_MANIFEST_NAME = ".dtf_manifest.json"   # copia del manifiesto instalado
+DELETE_LIST_NAME = ".dtf_delete.txt"         # ficheros a borrar al aplicar el delta
+CHUNK = 256 * 1024
+
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")   # cabecera local ZIP (30 bytes)
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+# -------- Manifiesto (lo genera el CI) -------- #
+def build_manifest(zip_path: Path, version: str) -> dict:
+    zip_path = Path(zip_path)
+    files = []
+    with open(zip_path, "rb") as raw, zipfile.ZipFile(raw) as z:
+        infos = [i for i in z.infolist() if not i.is_dir()]
+        for info in infos:
+            if info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+                raise ValueError(f"Compresión no soportada en {info.filename}")
+            h = hashlib.sha256()
+            with z.open(info) as f:
+                for chunk in iter(lambda: f.read(CHUNK), b""):
+                    h.update(chunk)
+            raw.seek(info.header_offset)
+            header = _LOCAL_HEADER.unpack(raw.read(_LOCAL_HEADER.size))
+            name_len, extra_len = header[-2], header[-1]
+            files.append({
+                "path": info.filename,
+                "size": info.file_size,
+                "sha256": h.hexdigest(),
+                "offset": info.header_offset + _LOCAL_HEADER.size + name_len + extra_len,
+                "compressed_size": info.compress_size,
+                "method": info.compress_type,
+            })
+
+    # Igual que _extract_to_stage: una única carpeta raíz no forma parte de la ruta
+    root = ""
+    tops = {f["path"].split("/", 1)[0] for f in files}
+    if len(tops) == 1 and all("/" in f["path"] for f in files):
+        root = tops.pop() + "/"
+    for f in files:
+        f["path"] = f["path"][len(root):]
+
+    return {
+        "format": MANIFEST_FORMAT,
+        "version": version,
+        "zip": zip_path.name,
+        "zip_size": zip_path.stat().st_size,
+        "zip_sha256": file_sha256(zip_path),
+        "files": files,
+    }
+
+def parse_manifest(data: bytes | str) -> dict:
+    m = json.loads(data)
+    if m.get("format") != MANIFEST_FORMAT or not isinstance(m.get("files"), list):
+        raise ValueError("Manifiesto no reconocido.")
+    for f in m["files"]:
+        p = f["path"]
+        # ".." en cualquiera de los dos formatos: el stage se escribe en Windows
+        if p.startswith(("/", "\\")) or ":" in p or ".." in PureWindowsPath(p).parts:
+            raise ValueError(f"Ruta no válida en el manifiesto: {p}")
+    return m
+
+# -------- Plan -------- #
+def local_hashes(install_dir: Path) -> dict[str, str]:
+    """
+    {ruta: sha256} de la instalación. Si hay manifiesto local y los tamaños
+    cuadran se usa sin releer; si no, se calculan los hashes.
+    """
+    install_dir = Path(install_dir)
+    lm = install_dir / LOCAL_MANIFEST_NAME
+    if lm.exists():
+        try:
+            m = parse_manifest(lm.read_bytes())
+            out = {}
+            for f in m["files"]:
+                p = install_dir / f["path"]
+                if p.is_file() and p.stat().st_size == f["size"]:
+                    out[f["path"]] = f["sha256"]
+            return out
+        except Exception:
+            pass
+    out = {}
+    for dirpath, _, names in os.walk(install_dir):
+        for n in names:
+            p = Path(dirpath) / n
+            rel = p.relative_to(install_dir).as_posix()
+            if rel not in (LOCAL_MANIFEST_NAME, DELETE_LIST_NAME):
+                out[rel] = file_sha256(p)
+    return out
+
+def plan_delta(manifest: dict, install_dir: Path) -> tuple[list[dict], list[str]]:
+    """(entradas a descargar, rutas locales a borrar)."""
+    local = local_hashes(install_dir)
+    wanted = {f["path"] for f in manifest["files"]}
+    changed = [f for f in manifest["files"] if local.get(f["path"]) != f["sha256"]]
+    deleted = sorted(p for p in local if p not in wanted)
+    return changed, deleted
+
+# -------- Escritura en stage -------- #
+def write_entry(chunks: Iterable[bytes], entry: dict, dst: Path) -> None:
+    """
+    Descomprime los bytes de `entry` (tal cual vienen del ZIP) en `dst`,
+    calculando tamaño y SHA-256 al vuelo. Lanza ValueError si no cuadran.
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    dec = zlib.decompressobj(-zlib.MAX_WBITS) if entry["method"] == zipfile.ZIP_DEFLATED else None
+    h = hashlib.sha256()
+    size = 0
+    with open(dst, "wb") as f:
+        for chunk in chunks:
+            data = dec.decompress(chunk) if dec else chunk
+            if data:
+                h.update(data)
+                f.write(data)
+                size += len(data)
+        if dec:
+            data = dec.flush()
+            h.update(data)
+            f.write(data)
+            size += len(data)
+    if size != entry["size"] or h.hexdigest() != entry["sha256"]:
+        dst.unlink(missing_ok=True)
+        raise ValueError(f"Verificación fallida: {entry['path']}")
+
+def write_stage_metadata(stage: Path, manifest: dict, deleted: list[str] = ()) -> None:
+    (stage / LOCAL_MANIFEST_NAME).write_text(json.dumps(manifest), encoding="utf-8")
+    if deleted:
+        # Rutas con "\" para el del del .bat
+        text = "\r\n".join(p.replace("/", "\\") for p in deleted) + "\r\n"
+        (stage / DELETE_LIST_NAME).write_text(text, encoding="utf-8")
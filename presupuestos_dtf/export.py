@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Exportación del gang sheet a un PNG listo para imprimir.
+
+La imagen se compone por franjas de `strip_rows` filas: para cada franja se
+piden a la geometría solo las copias que la cruzan y cada fila de salida se
+arma copiando las filas ya escaladas de cada diseño. La memoria depende del
+ancho del rollo y del tamaño de los diseños, no de la longitud del trabajo.
+"""
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Sequence
+from .geometry import PlacementLayout, RowLayout
+from .metrics import timed
+from .raster import PngWriter, load_design
+
+CM_PER_INCH = 2.54
+DEFAULT_STRIP_ROWS = 256
+MAX_ROLL_PX = 1 << 20   # por encima de ~1M de píxeles de ancho algo está mal configurado
+
+# progress(filas_hechas, filas_totales)
+ProgressCallback = Callable[[int, int], None]
+
+class ExportCancelled(Exception):
+    pass
+
+@dataclass(frozen=True)
+class ExportResult:
+    path: Path
+    width_px: int
+    height_px: int
+    dpi: float
+    copies: int
+    seconds: float
+
+def cm_to_px(cm: float, dpi: float) -> int:
+    return int(round(cm / CM_PER_INCH * dpi))
+
+@timed("export.gang_sheet")
+def export_gang_sheet(
+    layout: RowLayout | PlacementLayout,
+    designs: Sequence[Path],
+    out_path: Path,
+    dpi: float,
+    strip_rows: int = DEFAULT_STRIP_ROWS,
+    level: int = 6,
+    progress: ProgressCallback | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> ExportResult:
+    """
+    Compone `layout` con las imágenes de `designs` (una por índice de diseño)
+    en un PNG RGBA de fondo transparente del ancho del rollo a `dpi`.
+    """
+    if dpi <= 0:
+        raise ValueError("Los DPI deben ser positivos.")
+    width = cm_to_px(layout.roll_width_cm, dpi)
+    height = max(1, cm_to_px(layout.height_cm, dpi))
+    if not 1 <= width <= MAX_ROLL_PX:
+        raise ValueError(f"Ancho de rollo fuera de rango: {width} px.")
+    designs = [Path(p) for p in designs]
+    t0 = time.perf_counter()
+
+    # Diseños escalados: uno por (diseño, girado, tamaño), no por copia
+    cache: dict[tuple, list[bytes]] = {}
+
+    def footprint(item: int, rot: bool, wpx: int, hpx: int) -> list[bytes]:
+        key = (item, rot, wpx, hpx)
+        rows = cache.get(key)
+        if rows is None:
+            if not 0 <= item < len(designs):
+                raise ValueError(f"Falta la imagen del diseño {item + 1}.")
+            rows = cache[key] = load_design(designs[item], wpx, hpx, rot)
+        return rows
+
+    out_path = Path(out_path)
+    tmp = out_path.with_name(out_path.name + ".part")
+    blank = bytes(width * 4)
+    copies = 0
+    try:
+        with open(tmp, "wb") as f:
+            png = PngWriter(f, width, height, dpi, level)
+            for top in range(0, height, strip_rows):
+                if cancelled and cancelled():
+                    raise ExportCancelled()
+                bottom = min(height, top + strip_rows)
+                # Copias que cruzan la franja, en píxeles: (x0, y0, recorte, filas)
+                spans = []
+                for x, y, w, h, rot, item in layout.visible(top * CM_PER_INCH / dpi,
+                                                            bottom * CM_PER_INCH / dpi):
+                    x0, y0 = cm_to_px(x, dpi), cm_to_px(y, dpi)
+                    wpx, hpx = cm_to_px(w, dpi), cm_to_px(h, dpi)
+                    if wpx < 1 or hpx < 1 or x0 >= width or y0 >= bottom or y0 + hpx <= top:
+                        continue
+                    keep = min(wpx, width - x0) * 4  # recorte al ancho del rollo
+                    spans.append((x0 * 4, y0, keep, footprint(item, rot, wpx, hpx)))
+                    if y0 >= top:
+                        copies += 1
+
+                for py in range(top, bottom):
+                    row = None
+                    for xb, y0, keep, rows in spans:
+                        ry = py - y0
+                        if 0 <= ry < len(rows):
+                            if row is None:
+                                row = bytearray(blank)
+                            src = rows[ry]
+                            row[xb:xb + keep] = src if keep == len(src) else src[:keep]
+                    png.write_row(blank if row is None else row)
+                if progress:
+                    progress(bottom, height)
+            png.close()
+        tmp.replace(out_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return ExportResult(out_path, width, height, dpi, copies, time.perf_counter() - t0)
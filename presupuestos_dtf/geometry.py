@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Geometría de un trabajo sobre el rollo, sin Tk: dónde cae cada copia.
+
+No se expande a una lista de rectángulos: RowLayout describe el trabajo como
+tramos de filas iguales y calcula por aritmética qué filas caen en una
+franja [y0, y1]; PlacementLayout (gang sheets) usa bisect sobre las
+colocaciones ordenadas por y. Lo usan la vista previa y la exportación.
+"""
+import math
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Iterator
+from .models import CalcInput, CalcResult, MixedLayoutResult, NestResult
+
+# (x, y, ancho, alto, girado, índice del diseño) en cm; índice -1 = banda resumen
+Rect = tuple[float, float, float, float, bool, int]
+
+@dataclass(frozen=True)
+class RowBand:
+    """`rows` filas iguales de alto `height_cm`; `cells` relativas a la fila."""
+    rows: int
+    height_cm: float
+    cells: tuple[Rect, ...]
+
+class RowLayout:
+    """Trabajo de filas repetidas (compute_layout y mezcla óptima)."""
+    def __init__(self, roll_width_cm: float, margin_top_cm: float, bands: list[RowBand], copies: int) -> None:
+        self.roll_width_cm = roll_width_cm
+        self.margin_top_cm = margin_top_cm
+        self.bands = [b for b in bands if b.rows > 0 and b.cells]
+        self.copies = copies
+        # Inicio en y y primera copia de cada tramo
+        self._y_start: list[float] = []
+        self._first_copy: list[int] = []
+        y, c = 0.0, 0
+        for b in self.bands:
+            self._y_start.append(y)
+            self._first_copy.append(c)
+            y += b.rows * (b.height_cm + margin_top_cm)
+            c += b.rows * len(b.cells)
+        self.rows = sum(b.rows for b in self.bands)
+        self.height_cm = max(0.0, y - margin_top_cm)
+
+    def _row_range(self, k: int, y0: float, y1: float) -> range:
+        b = self.bands[k]
+        pitch = b.height_cm + self.margin_top_cm
+        ys = self._y_start[k]
+        first = max(0, math.ceil((y0 - ys - b.height_cm) / pitch)) if pitch > 0 else 0
+        last = min(b.rows - 1, math.floor((y1 - ys) / pitch)) if pitch > 0 else b.rows - 1
+        return range(first, last + 1)
+
+    def _copies_in_row(self, k: int, r: int) -> int:
+        n = len(self.bands[k].cells)
+        return max(0, min(n, self.copies - self._first_copy[k] - r * n))
+
+    def visible(self, y0: float, y1: float) -> Iterator[Rect]:
+        for k, b in enumerate(self.bands):
+            pitch = b.height_cm + self.margin_top_cm
+            for r in self._row_range(k, y0, y1):
+                n = self._copies_in_row(k, r)
+                if n == 0:
+                    return
+                y = self._y_start[k] + r * pitch
+                for x, dy, w, h, rot, item in b.cells[:n]:
+                    yield x, y + dy, w, h, rot, item
+
+    def visible_rows(self, y0: float, y1: float) -> Iterator[Rect]:
+        """Una banda por fila (para cuando hay demasiadas copias a la vista)."""
+        for k, b in enumerate(self.bands):
+            pitch = b.height_cm + self.margin_top_cm
+            for r in self._row_range(k, y0, y1):
+                n = self._copies_in_row(k, r)
+                if n == 0:
+                    return
+                right = max(c[0] + c[2] for c in b.cells[:n])
+                yield 0.0, self._y_start[k] + r * pitch, right, b.height_cm, False, -1
+
+    def estimate(self, y0: float, y1: float) -> int:
+        return sum(len(self._row_range(k, y0, y1)) * len(b.cells) for k, b in enumerate(self.bands))
+
+class PlacementLayout:
+    """Colocaciones libres (nesting de pedidos multi-diseño)."""
+    def __init__(self, roll_width_cm: float, rects: list[Rect], height_cm: float) -> None:
+        self.roll_width_cm = roll_width_cm
+        self.rects = sorted(rects, key=lambda r: r[1])
+        self._ys = [r[1] for r in self.rects]
+        self._max_h = max((r[3] for r in self.rects), default=0.0)
+        self.copies = len(self.rects)
+        self.height_cm = height_cm
+
+    def _span(self, y0: float, y1: float) -> range:
+        return range(bisect_left(self._ys, y0 - self._max_h), bisect_right(self._ys, y1))
+
+    def visible(self, y0: float, y1: float) -> Iterator[Rect]:
+        rects = self.rects
+        for i in self._span(y0, y1):
+            r = rects[i]
+            if r[1] + r[3] >= y0:
+                yield r
+
+    def visible_rows(self, y0: float, y1: float, buckets: int = 200) -> Iterator[Rect]:
+        """Ocupación por franjas horizontales (vista muy alejada)."""
+        step = max((y1 - y0) / buckets, 1e-9)
+        right: dict[int, float] = {}
+        for x, y, w, h, _, _ in self.visible(y0, y1):
+            for b in range(int((max(y, y0) - y0) // step), int((min(y + h, y1) - y0) // step) + 1):
+                if right.get(b, 0.0) < x + w:
+                    right[b] = x + w
+        for b, r in sorted(right.items()):
+            yield 0.0, y0 + b * step, r, step, False, -1
+
+    def estimate(self, y0: float, y1: float) -> int:
+        return len(self._span(y0, y1))
+
+# -------- Constructores -------- #
+def _row_cells(count: int, w: float, h: float, mr: float, rot: bool, x0: float = 0.0) -> list[Rect]:
+    return [(x0 + i * (w + mr), 0.0, w, h, rot, 0) for i in range(count)]
+
+def layout_from_result(data: CalcInput, res: CalcResult) -> RowLayout:
+    rot = res.orientation_deg == 90
+    w, h = (data.image_height_cm, data.image_width_cm) if rot else (data.image_width_cm, data.image_height_cm)
+    band = RowBand(res.rows_needed, h, tuple(_row_cells(res.designs_per_row, w, h, data.margin_right_cm, rot)))
+    return RowLayout(data.roll_width_cm, data.margin_top_cm, [band], data.num_copies)
+
+def _mixed_band(rows: int, base: int, fill: int, bw: float, bh: float,
+                mr: float, mt: float, base_rot: bool) -> RowBand:
+    # Igual que calc._best_row: copias base y columnas de copias giradas (bh×bw) en el borde
+    cells = _row_cells(base, bw, bh, mr, base_rot)
+    if fill:
+        stack = int(math.floor((bh + mt) / (bw + mt)))
+        x0 = base * (bw + mr)
+        for c in range(fill // stack):
+            for s in range(stack):
+                cells.append((x0 + c * (bh + mr), s * (bw + mt), bh, bw, not base_rot, 0))
+    return RowBand(rows, bh, tuple(cells))
+
+def layout_from_mixed(data: CalcInput, res: MixedLayoutResult) -> RowLayout:
+    iw, ih = data.image_width_cm, data.image_height_cm
+    mt, mr = data.margin_top_cm, data.margin_right_cm
+    bands = [
+        _mixed_band(res.rows_0, res.designs_per_row_0, res.fill_per_row_0, iw, ih, mr, mt, False),
+        _mixed_band(res.rows_90, res.designs_per_row_90, res.fill_per_row_90, ih, iw, mr, mt, True),
+    ]
+    return RowLayout(data.roll_width_cm, mt, bands, data.num_copies)
+
+def layout_from_nest(res: NestResult) -> PlacementLayout:
+    rects = [(p.x_cm, p.y_cm, p.width_cm, p.height_cm, p.rotated, p.item_index) for p in res.placements]
+    return PlacementLayout(res.roll_width_cm, rects, res.total_height_cm)
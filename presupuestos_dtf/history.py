@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+"""
+Historial de presupuestos en SQLite (modo WAL), junto a config.json.
+
+Las inserciones se encolan y las escribe un hilo propio en lotes, así que
+add() nunca bloquea el bucle de Tk. La lectura se hace por páginas con
+paginación por clave (created_at, id), que usa índices y cuesta lo mismo en
+la primera página que en la 500.000. La búsqueda por cliente pagina por
+(cliente, created_at, id), el orden de su índice: un prefijo corto que
+coincide con medio historial no obliga a ordenar todas esas filas. Cada hilo
+que lee tiene su propia conexión, así que la UI puede consultar desde el
+pool de trabajos.
+"""
+import json
+import queue
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from .config import get_config_dir
+from .pricing import FLAT, PricingRules
+
+HISTORY_FILENAME = "history.sqlite3"
+PAGE_SIZE = 100
+COUNT_LIMIT = 10_000  # las búsquedas dejan de contar a partir de aquí ("10 000+")
+_WRITE_BATCH = 500
+_STOP = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    customer TEXT NOT NULL DEFAULT '',
+    image_width_cm REAL NOT NULL,
+    image_height_cm REAL NOT NULL,
+    num_copies INTEGER NOT NULL,
+    roll_width_cm REAL NOT NULL,
+    price_per_meter REAL NOT NULL,
+    margin_top_cm REAL NOT NULL,
+    margin_right_cm REAL NOT NULL,
+    length_0_cm REAL,
+    cost_0 REAL,
+    length_90_cm REAL,
+    cost_90 REAL,
+    chosen_orientation INTEGER NOT NULL,
+    chosen_length_cm REAL NOT NULL,
+    chosen_cost REAL NOT NULL,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_quotes_created ON quotes(created_at, id);
+CREATE INDEX IF NOT EXISTS ix_quotes_customer ON quotes(customer COLLATE NOCASE, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS ix_quotes_dims ON quotes(image_width_cm, image_height_cm, created_at, id);
+"""
+
+_COLUMNS = (
+    "created_at", "customer", "image_width_cm", "image_height_cm", "num_copies",
+    "roll_width_cm", "price_per_meter", "margin_top_cm", "margin_right_cm",
+    "length_0_cm", "cost_0", "length_90_cm", "cost_90",
+    "chosen_orientation", "chosen_length_cm", "chosen_cost", "details",
+)
+_INSERT = f"INSERT INTO quotes ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+def _reprice_sql(price: float, rules: PricingRules) -> tuple[str, dict]:
+    """
+    Nuevo precio en una sola pasada: cada coste se recalcula con la tarifa
+    compilada a SQL (mismas operaciones que PriceTable.cost), también los
+    guardados en `details`.
+    """
+    params = {"p": price}
+
+    def cost(length_m: str) -> str:
+        # Todas las expresiones comparten los mismos parámetros de tarifa
+        return rules.sql_cost(length_m, "customer", price, params, "t")
+
+    detail = ",\n        ".join(
+        f"'$.{key}.cost', " + cost(f"json_extract(details, '$.{key}.total_height_m')")
+        for key in ('"0"', '"90"', "optimo"))
+    sql = f"""
+UPDATE quotes SET
+    price_per_meter = :p,
+    cost_0 = {cost("length_0_cm / 100.0")},
+    cost_90 = {cost("length_90_cm / 100.0")},
+    chosen_cost = {cost("chosen_length_cm / 100.0")},
+    details = CASE WHEN details IS NULL THEN NULL ELSE json_set(details,
+        {detail}) END
+"""
+    return sql, params
+
+class _Reprice:
+    """Orden para el hilo escritor; va en la misma cola que las inserciones."""
+    __slots__ = ("price", "rules", "result")
+
+    def __init__(self, price: float, rules: PricingRules) -> None:
+        self.price = price
+        self.rules = rules
+        self.result: Future = Future()
+
+_LIST_COLUMNS = ("id", "created_at", "customer", "image_width_cm", "image_height_cm", "num_copies",
+                 "chosen_orientation", "chosen_length_cm", "chosen_cost")
+
+@dataclass(frozen=True)
+class QuoteRecord:
+    customer: str
+    image_width_cm: float
+    image_height_cm: float
+    num_copies: int
+    roll_width_cm: float
+    price_per_meter: float
+    margin_top_cm: float
+    margin_right_cm: float
+    length_0_cm: float | None
+    cost_0: float | None
+    length_90_cm: float | None
+    cost_90: float | None
+    chosen_orientation: int
+    chosen_length_cm: float
+    chosen_cost: float
+    details: dict | None = None
+    created_at: float = 0.0  # 0 = ahora
+
+@dataclass(frozen=True)
+class QuoteRow:
+    id: int
+    created_at: float
+    customer: str
+    image_width_cm: float
+    image_height_cm: float
+    num_copies: int
+    chosen_orientation: int
+    chosen_length_cm: float
+    chosen_cost: float
+
+def _connect(path: Path, check_same_thread: bool = True) -> sqlite3.Connection:
+    con = sqlite3.connect(str(path), timeout=30, check_same_thread=check_same_thread)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    return con
+
+_DIMS = re.compile(r"^\s*(\d+(?:[.,]\d+)?)\s*[x×*]\s*(\d+(?:[.,]\d+)?)\s*$", re.IGNORECASE)
+
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+def _prefix_end(prefix: str) -> str | None:
+    """Cota superior (en orden NOCASE) de los clientes que empiezan por `prefix`."""
+    folded = prefix.translate(_ASCII_LOWER)  # NOCASE y LIKE solo pliegan ASCII
+    last = ord(folded[-1])
+    return folded[:-1] + chr(last + 1) if last < 0x10FFFF else None
+
+def _where(search: str, low: str | None = None, high: str | None = None) -> tuple[str, list, bool]:
+    """
+    '10x15' filtra por medidas; cualquier otro texto, por prefijo de cliente
+    (el tercer valor es True: esa búsqueda pagina por cliente). Para el
+    prefijo, el rango del índice es explícito y LIKE solo filtra: `low` y
+    `high` (la clave de la página actual) lo acotan más.
+    """
+    search = (search or "").strip()
+    if not search:
+        return "", [], False
+    m = _DIMS.match(search)
+    if m:
+        w, h = (float(g.replace(",", ".")) for g in m.groups())
+        return "image_width_cm = ? AND image_height_cm = ?", [w, h], False
+    conds, args = ["customer COLLATE NOCASE >= ?"], [low if low is not None else search]
+    end = _prefix_end(search)
+    if high is not None:
+        conds.append("customer COLLATE NOCASE <= ?")
+        args.append(high)
+    elif end is not None:
+        conds.append("customer COLLATE NOCASE < ?")
+        args.append(end)
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    # "+": que el planificador no saque del LIKE otro rango que compita con el nuestro
+    conds.append("+customer LIKE ? ESCAPE '\\'")
+    args.append(escaped + "%")
+    return " AND ".join(conds), args, True
+
+class HistoryStore:
+    def __init__(self, path: Path | None = None) -> None:
+        if path is None:
+            get_config_dir().mkdir(parents=True, exist_ok=True)
+            path = get_config_dir() / HISTORY_FILENAME
+        self.path = Path(path)
+        con = _connect(self.path)
+        con.executescript(_SCHEMA)
+        con.close()
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self.written = 0  # filas confirmadas por el hilo escritor
+        self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+        self._writer.start()
+
+    # -------- Escritura (hilo propio) -------- #
+    def add(self, rec: QuoteRecord) -> None:
+        """Encola el presupuesto; no toca disco en el hilo que llama."""
+        self._queue.put(rec)
+
+    def reprice(self, price_per_meter: float, rules: PricingRules = FLAT) -> int:
+        """
+        Recalcula el coste de todo el historial con otro precio por metro y
+        tarifa. La orientación elegida se mantiene; solo cambia su coste. Se
+        ejecuta en el hilo escritor, detrás de las inserciones ya encoladas, y
+        espera a que termine. Devuelve las filas actualizadas.
+        """
+        if not self._writer.is_alive():
+            raise RuntimeError("El historial está cerrado.")
+        order = _Reprice(float(price_per_meter), rules)
+        self._queue.put(order)
+        return order.result.result()
+
+    def _write_loop(self) -> None:
+        con = _connect(self.path)
+        try:
+            item = None
+            while True:
+                if item is None:
+                    item = self._queue.get()
+                if isinstance(item, _Reprice):
+                    self._run_reprice(con, item)
+                    item = None
+                    self._queue.task_done()
+                    continue
+                batch = [] if item is _STOP else [item]
+                stop = item is _STOP
+                item = None
+                while not stop and len(batch) < _WRITE_BATCH:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        item = None
+                        break
+                    if item is _STOP:
+                        stop = True
+                        item = None
+                    elif isinstance(item, _Reprice):
+                        break  # primero se escribe el lote; la orden, en la siguiente vuelta
+                    else:
+                        batch.append(item)
+                        item = None
+                if batch:
+                    now = time.time()
+                    rows = []
+                    for r in batch:
+                        d = asdict(r)
+                        d["created_at"] = r.created_at or now
+                        d["details"] = json.dumps(r.details, ensure_ascii=False) if r.details else None
+                        rows.append(tuple(d[c] for c in _COLUMNS))
+                    with con:
+                        con.executemany(_INSERT, rows)
+                    self.written += len(rows)
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self._queue.task_done()
+                if stop:
+                    return
+        finally:
+            con.close()
+
+    @staticmethod
+    def _run_reprice(con: sqlite3.Connection, order: _Reprice) -> None:
+        try:
+            with con:
+                n = con.execute(*_reprice_sql(order.price, order.rules)).rowcount
+        except Exception as e:
+            order.result.set_exception(e)
+        else:
+            order.result.set_result(n)
+
+    def flush(self) -> None:
+        """Espera a que todo lo encolado esté en disco."""
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout=10)
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for con in readers:
+            con.close()
+
+    # -------- Lectura -------- #
+    def _con(self) -> sqlite3.Connection:
+        """Conexión de lectura del hilo que llama (se crea la primera vez)."""
+        con = getattr(self._local, "con", None)
+        if con is None:
+            # Solo la usa este hilo; close() las cierra todas desde el suyo
+            con = _connect(self.path, check_same_thread=False)
+            self._local.con = con
+            with self._readers_lock:
+                self._readers.append(con)
+        return con
+
+    def count(self, search: str = "", limit: int | None = None) -> int:
+        """Presupuestos que coinciden. Con `limit` deja de contar al pasarlo (devuelve limit + 1)."""
+        where, args, _ = _where(search)
+        cond = f" WHERE {where}" if where else ""
+        if limit is None:
+            sql = f"SELECT count(*) FROM quotes{cond}"
+        else:
+            sql = f"SELECT count(*) FROM (SELECT 1 FROM quotes{cond} LIMIT ?)"
+            args.append(limit + 1)
+        return self._con().execute(sql, args).fetchone()[0]
+
+    def page(self, search: str = "", after: QuoteRow | None = None,
+             before: QuoteRow | None = None, last: bool = False,
+             limit: int = PAGE_SIZE) -> list[QuoteRow]:
+        """
+        Una página, de más reciente a más antiguo; la búsqueda por cliente,
+        por cliente y dentro de cada uno de más reciente a más antiguo.
+        `after`/`before` son la última/primera fila de la página actual;
+        `last=True` devuelve la última página.
+        """
+        where, args, by_customer = _where(search, after and after.customer, before and before.customer)
+        conds = [where] if where else []
+        backward = before is not None or last
+        anchor = after if after is not None else before
+        if anchor is not None:
+            newer = ">" if backward else "<"
+            if by_customer:
+                # Cliente ascendente y, dentro de cada uno, (created_at, id)
+                # descendente; _where ya ha llevado el rango hasta el cliente de la clave
+                conds.append(f"(customer COLLATE NOCASE {'<' if backward else '>'} ?"
+                             f" OR (created_at, id) {newer} (?, ?))")
+                args.append(anchor.customer)
+            else:
+                conds.append(f"(created_at, id) {newer} (?, ?)")
+            args += [anchor.created_at, anchor.id]
+        desc, asc = ("ASC", "DESC") if backward else ("DESC", "ASC")
+        order = f"created_at {desc}, id {desc}"
+        if by_customer:
+            order = f"customer COLLATE NOCASE {asc}, {order}"
+        sql = (f"SELECT {', '.join(_LIST_COLUMNS)} FROM quotes"
+               + (f" WHERE {' AND '.join(conds)}" if conds else "")
+               + f" ORDER BY {order} LIMIT ?")
+        rows = [QuoteRow(*r) for r in self._con().execute(sql, args + [limit])]
+        return rows[::-1] if backward else rows
+
+    def get_details(self, quote_id: int) -> dict | None:
+        row = self._con().execute("SELECT details FROM quotes WHERE id = ?", (quote_id,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+Importación masiva de diseños: tamaño y DPI leídos solo de las cabeceras.
+
+Para PNG, JPEG y TIFF se leen los bytes justos (IHDR/pHYs, marcadores SOF y
+JFIF/EXIF, IFD0) sin descomprimir píxeles, así que una carpeta de cientos de
+ficheros se mide en milisegundos. La lectura se reparte en un pool de hilos:
+es casi todo E/S y el parseo es mínimo.
+
+Si la imagen no trae resolución se usa `default_dpi` (el de exportación).
+"""
+import io
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator
+from .metrics import count, timed
+from .models import NestItem
+
+CM_PER_INCH = 2.54
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".jpe", ".tif", ".tiff")
+DEFAULT_WORKERS = 8
+_CHUNK = 64         # ficheros por tarea del pool
+MAX_DPI = 100_000   # resoluciones absurdas en la cabecera se ignoran
+
+@dataclass(frozen=True)
+class ImageInfo:
+    path: str
+    format: str             # "png", "jpeg" o "tiff"
+    width_px: int
+    height_px: int
+    dpi_x: float | None     # None si la cabecera no lo indica
+    dpi_y: float | None
+
+    def size_cm(self, default_dpi: float) -> tuple[float, float]:
+        dx = self.dpi_x or default_dpi
+        dy = self.dpi_y or self.dpi_x or default_dpi
+        return self.width_px / dx * CM_PER_INCH, self.height_px / dy * CM_PER_INCH
+
+@dataclass(frozen=True)
+class ScanResult:
+    path: str
+    info: ImageInfo | None
+    error: str = ""
+
+def _dpi(value: float) -> float | None:
+    return value if 1 <= value <= MAX_DPI else None
+
+# -------- PNG -------- #
+def _png_info(f: BinaryIO, path: str) -> ImageInfo:
+    head = f.read(33)
+    if len(head) < 33 or head[12:16] != b"IHDR":
+        raise ValueError("PNG sin cabecera IHDR")
+    w, h = struct.unpack(">II", head[16:24])
+    dpi = (None, None)
+    # pHYs va siempre antes de los datos: se recorren chunks hasta el primer IDAT
+    while True:
+        hdr = f.read(8)
+        if len(hdr) < 8:
+            break
+        length, tag = struct.unpack(">I4s", hdr)
+        if tag in (b"IDAT", b"IEND"):
+            break
+        if tag == b"pHYs" and length == 9:
+            ppx, ppy, unit = struct.unpack(">IIB", f.read(9))
+            if unit == 1:  # píxeles por metro
+                dpi = (_dpi(ppx * 0.0254), _dpi(ppy * 0.0254))
+            break
+        f.seek(length + 4, os.SEEK_CUR)  # cuerpo + CRC
+    return ImageInfo(path, "png", w, h, *dpi)
+
+# -------- TIFF (también el bloque EXIF de los JPEG) -------- #
+_TIFF_TYPES = {1: "B", 3: "H", 4: "I", 5: "II", 16: "Q"}  # BYTE, SHORT, LONG, RATIONAL, LONG8
+
+def _tiff_tags(f: BinaryIO, base: int, wanted: set[int]) -> dict[int, float]:
+    """Valores escalares de `wanted` en la IFD0 de un TIFF que empieza en `base`."""
+    f.seek(base)
+    order = f.read(2)
+    if order not in (b"II", b"MM"):
+        raise ValueError("cabecera TIFF no válida")
+    e = "<" if order == b"II" else ">"
+    magic, = struct.unpack(e + "H", f.read(2))
+    if magic == 42:
+        ifd, = struct.unpack(e + "I", f.read(4))
+        count_fmt, entry_fmt, entry_size, inline = "H", "HHI4s", 12, 4
+    elif magic == 43:  # BigTIFF
+        _, _, ifd = struct.unpack(e + "HHQ", f.read(12))
+        count_fmt, entry_fmt, entry_size, inline = "Q", "HHQ8s", 20, 8
+    else:
+        raise ValueError("cabecera TIFF no válida")
+
+    f.seek(base + ifd)
+    n, = struct.unpack(e + count_fmt, f.read(struct.calcsize(count_fmt)))
+    table = f.read(n * entry_size)
+    out: dict[int, float] = {}
+    for i in range(n):
+        tag, typ, cnt, raw = struct.unpack(e + entry_fmt, table[i * entry_size:(i + 1) * entry_size])
+        if tag not in wanted or typ not in _TIFF_TYPES or cnt < 1:
+            continue
+        fmt = e + _TIFF_TYPES[typ]
+        size = struct.calcsize(fmt)
+        if size > inline:
+            offset, = struct.unpack(e + ("I" if inline == 4 else "Q"), raw)
+            f.seek(base + offset)
+            raw = f.read(size)
+        vals = struct.unpack(fmt, raw[:size])
+        out[tag] = vals[0] / vals[1] if typ == 5 and vals[1] else float(vals[0])
+    return out
+
+_TAG_WIDTH, _TAG_HEIGHT, _TAG_XRES, _TAG_YRES, _TAG_UNIT, _TAG_ORIENT = 256, 257, 282, 283, 296, 274
+
+def _resolution(tags: dict[int, float]) -> tuple[float | None, float | None]:
+    unit = tags.get(_TAG_UNIT, 2)  # 2 = pulgada (valor por defecto), 3 = cm
+    factor = {2: 1.0, 3: CM_PER_INCH}.get(int(unit))
+    if factor is None or _TAG_XRES not in tags:
+        return None, None
+    x = _dpi(tags[_TAG_XRES] * factor)
+    y = _dpi(tags.get(_TAG_YRES, tags[_TAG_XRES]) * factor)
+    return x, y
+
+def _tiff_info(f: BinaryIO, path: str) -> ImageInfo:
+    tags = _tiff_tags(f, 0, {_TAG_WIDTH, _TAG_HEIGHT, _TAG_XRES, _TAG_YRES, _TAG_UNIT})
+    if _TAG_WIDTH not in tags or _TAG_HEIGHT not in tags:
+        raise ValueError("TIFF sin ancho/alto")
+    return ImageInfo(path, "tiff", int(tags[_TAG_WIDTH]), int(tags[_TAG_HEIGHT]), *_resolution(tags))
+
+# -------- JPEG -------- #
+_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+def _jpeg_info(f: BinaryIO, path: str) -> ImageInfo:
+    f.seek(2)
+    dpi = None
+    orientation = 1
+    while True:
+        b = f.read(1)
+        while b and b != b"\xff":   # bytes de relleno entre segmentos
+            b = f.read(1)
+        while b == b"\xff":
+            b = f.read(1)
+        if not b:
+            raise ValueError("JPEG sin marcador SOF")
+        marker = b[0]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            continue  # sin longitud
+        if marker == 0xD9:
+            raise ValueError("JPEG sin marcador SOF")
+        length, = struct.unpack(">H", f.read(2))
+        if length < 2:
+            raise ValueError("segmento JPEG corrupto")
+        if marker in _SOF:
+            _, h, w = struct.unpack(">BHH", f.read(5))
+            if orientation >= 5:  # EXIF: girada 90° al mostrarla
+                w, h = h, w
+            return ImageInfo(path, "jpeg", w, h, *(dpi or (None, None)))
+        if marker == 0xE0 and dpi is None:
+            body = f.read(length - 2)
+            if body[:5] == b"JFIF\0" and len(body) >= 12:
+                unit, x, y = struct.unpack(">BHH", body[7:12])
+                if unit in (1, 2):  # 1 = puntos por pulgada, 2 = por cm
+                    k = 1.0 if unit == 1 else CM_PER_INCH
+                    dpi = (_dpi(x * k), _dpi(y * k))
+        elif marker == 0xE1:
+            body = f.read(length - 2)
+            if body[:6] == b"Exif\0\0":
+                try:
+                    tags = _tiff_tags(io.BytesIO(body), 6, {_TAG_XRES, _TAG_YRES, _TAG_UNIT, _TAG_ORIENT})
+                except (ValueError, struct.error):
+                    tags = {}
+                orientation = int(tags.get(_TAG_ORIENT, 1))
+                if dpi is None and _resolution(tags)[0]:
+                    dpi = _resolution(tags)
+        else:
+            f.seek(length - 2, os.SEEK_CUR)
+
+# -------- API -------- #
+def read_image_info(path: str | Path) -> ImageInfo:
+    """Tamaño en píxeles y DPI de un PNG/JPEG/TIFF sin decodificar la imagen."""
+    path = str(path)
+    with open(path, "rb", buffering=4096) as f:
+        sig = f.read(8)
+        f.seek(0)
+        try:
+            if sig.startswith(b"\x89PNG\r\n\x1a\n"):
+                return _png_info(f, path)
+            if sig.startswith(b"\xff\xd8"):
+                return _jpeg_info(f, path)
+            if sig[:4] in (b"II*\0", b"MM\0*", b"II+\0", b"MM\0+"):
+                return _tiff_info(f, path)
+        except struct.error:
+            raise ValueError("cabecera truncada")
+    raise ValueError("formato no soportado (solo PNG, JPEG y TIFF)")
+
+def _scan_one(path: str) -> ScanResult:
+    try:
+        return ScanResult(path, read_image_info(path))
+    except (OSError, ValueError) as e:
+        return ScanResult(path, None, str(e))
+
+def _scan_many(paths: list[str]) -> list[ScanResult]:
+    return [_scan_one(p) for p in paths]
+
+def iter_image_files(folder: str | Path, recursive: bool = False) -> Iterator[str]:
+    """Rutas de imágenes de la carpeta, por nombre."""
+    it = Path(folder).rglob("*") if recursive else Path(folder).iterdir()
+    for p in sorted(it):
+        if p.suffix.lower() in IMAGE_EXTENSIONS and p.is_file():
+            yield str(p)
+
+@timed("import.scan")
+def scan_images(paths: Iterable[str | Path], workers: int = DEFAULT_WORKERS) -> list[ScanResult]:
+    """Lee las cabeceras en paralelo. El orden de salida es el de entrada."""
+    paths = [str(p) for p in paths]
+    count("import.files", len(paths))
+    if workers <= 1 or len(paths) < 2:
+        return [_scan_one(p) for p in paths]
+    # Bloques de rutas por tarea: con miles de ficheros pequeños, un future por
+    # fichero cuesta más que leer su cabecera
+    size = max(1, min(_CHUNK, len(paths) // workers))
+    chunks = [paths[i:i + size] for i in range(0, len(paths), size)]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="import") as pool:
+        return [r for part in pool.map(_scan_many, chunks) for r in part]
+
+def to_nest_items(results: Iterable[ScanResult], default_dpi: float,
+                  copies: int = 1, rotatable: bool = True) -> list[NestItem]:
+    """Líneas de pedido (una por imagen válida) con las medidas en cm."""
+    items = []
+    for r in results:
+        if r.info is None:
+            continue
+        w, h = r.info.size_cm(default_dpi)
+        items.append(NestItem(round(w, 2), round(h, 2), copies, rotatable,
+                              name=Path(r.path).name, path=r.path))
+    return items
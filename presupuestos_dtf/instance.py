@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Una sola instancia de la app de escritorio.
+
+La primera instancia escucha en un socket TCP local (127.0.0.1, puerto
+libre) y deja puerto y un token aleatorio en instance.json, junto a
+config.json. Un segundo arranque lee ese fichero, manda al socket una línea
+JSON con el token y los ficheros que ha recibido (rutas absolutas) y sale en
+cuanto recibe el acuse: no importa tkinter, no abre ventana ni comprueba
+actualizaciones. La primera instancia pasa al frente y abre los ficheros.
+
+Solo usa la biblioteca estándar y se importa antes que tkinter: la
+comprobación cuesta unos milisegundos. Un instance.json de una instancia que
+ya no existe (cierre brusco) se detecta porque la conexión falla, y se
+reemplaza.
+"""
+import hmac
+import json
+import os
+import queue
+import secrets
+import socket
+import threading
+from pathlib import Path
+from .config import get_config_dir
+
+INSTANCE_FILENAME = "instance.json"
+CONNECT_TIMEOUT_S = 0.5
+MAX_MESSAGE_BYTES = 64 * 1024
+
+def get_instance_path() -> Path:
+    return get_config_dir() / INSTANCE_FILENAME
+
+def _read_info(path: Path) -> dict | None:
+    try:
+        info = json.loads(path.read_text(encoding="utf-8"))
+        return info if isinstance(info, dict) else None
+    except (OSError, ValueError):
+        return None
+
+def _forward(info: dict, paths: list[str]) -> bool:
+    """Entrega `paths` a la instancia de `info`. False si no responde (fichero obsoleto)."""
+    try:
+        port = int(info["port"])
+        message = json.dumps({"token": str(info["token"]), "paths": paths}, ensure_ascii=False)
+        with socket.create_connection(("127.0.0.1", port), timeout=CONNECT_TIMEOUT_S) as s:
+            s.sendall(message.encode("utf-8") + b"\n")
+            return s.makefile("rb").readline().strip() == b"ok"
+    except (OSError, KeyError, TypeError, ValueError):
+        return False
+
+class InstanceServer:
+    """
+    Escucha a las instancias posteriores. Los ficheros recibidos se encolan
+    desde el hilo del socket; la UI los recoge en su hilo con poll().
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.token = secrets.token_hex(16)
+        self.requests: "queue.SimpleQueue[list[str]]" = queue.SimpleQueue()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(8)
+        self.port = self._sock.getsockname()[1]
+        self._closed = False
+        threading.Thread(target=self._serve, name="instance", daemon=True).start()
+
+    def info(self) -> dict:
+        return {"port": self.port, "token": self.token, "pid": os.getpid()}
+
+    def poll(self) -> list[list[str]]:
+        """Peticiones pendientes (cada una, la lista de ficheros de un arranque)."""
+        out = []
+        while True:
+            try:
+                out.append(self.requests.get_nowait())
+            except queue.Empty:
+                return out
+
+    def close(self) -> None:
+        """Deja de escuchar y borra instance.json si sigue siendo el nuestro."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+        info = _read_info(self.path)
+        if info and info.get("token") == self.token:
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+
+    def _serve(self) -> None:
+        while not self._closed:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return  # socket cerrado
+            with conn:
+                try:
+                    conn.settimeout(CONNECT_TIMEOUT_S)
+                    line = conn.makefile("rb").readline(MAX_MESSAGE_BYTES)
+                    msg = json.loads(line)
+                    if not hmac.compare_digest(str(msg.get("token", "")), self.token):
+                        continue
+                    paths = [str(p) for p in msg.get("paths") or ()]
+                    self.requests.put(paths)
+                    conn.sendall(b"ok\n")
+                except (OSError, ValueError, AttributeError):
+                    continue
+
+def forward(paths: list[str] | tuple[str, ...] = ()) -> bool:
+    """True si ya hay una instancia en marcha y ha recibido `paths` (este arranque debe salir)."""
+    info = _read_info(get_instance_path())
+    return info is not None and _forward(info, [str(Path(p).resolve()) for p in paths])
+
+def listen() -> InstanceServer | None:
+    """
+    Servidor de esta instancia, ya escuchando y anunciado en instance.json.
+    None si no se puede (sin red local): la app arranca igual, sin el modo
+    de instancia única.
+    """
+    path = get_instance_path()
+    try:
+        server = InstanceServer(path)
+    except OSError:
+        return None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{INSTANCE_FILENAME}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(server.info()), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        server.close()
+        return None
+    return server
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajos en segundo plano para la interfaz.
+
+JobScheduler ejecuta funciones en un pool de hilos (o de procesos) y entrega
+los resultados en el hilo de Tk mediante root.after, así que los callbacks
+pueden tocar widgets. Cada trabajo lleva una clave: al enviar otro con la
+misma clave el anterior queda obsoleto (se cancela si no ha empezado y, si
+ya está en marcha, su resultado se descarta). Un recálculo en vivo nunca
+pinta datos viejos.
+
+La entrega tiene un presupuesto por tick (FRAME_BUDGET_S); lo que no quepa
+sale en el siguiente, de modo que la ventana no se bloquea más de un
+fotograma por culpa de los resultados.
+"""
+import queue
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+from .metrics import count
+
+POLL_MS = 16               # ~60 Hz mientras haya trabajos en curso
+FRAME_BUDGET_S = 0.008     # tiempo máximo de callbacks por tick
+DEFAULT_WORKERS = 2
+
+class JobCancelled(Exception):
+    """La lanza Job.check() dentro del trabajo si se ha cancelado."""
+
+class Job:
+    """
+    Un trabajo enviado. Desde el hilo de trabajo (solo con hilos, with_job=True)
+    se puede informar del avance con progress() y cortar con check().
+    """
+    __slots__ = ("key", "on_done", "on_error", "on_progress", "future",
+                 "submitted_at", "_cancelled", "_progress", "_progress_seen")
+
+    def __init__(self, key, on_done, on_error, on_progress) -> None:
+        self.key = key
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.future: Future | None = None
+        self.submitted_at = time.perf_counter()
+        self._cancelled = False
+        self._progress = None
+        self._progress_seen = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self) -> None:
+        self._cancelled = True
+        if self.future is not None:
+            self.future.cancel()  # solo surte efecto si aún no ha empezado
+
+    def check(self) -> None:
+        if self._cancelled:
+            raise JobCancelled()
+
+    def progress(self, done: float, total: float) -> None:
+        # Asignar una tupla es atómico: el hilo de Tk lee el último valor
+        self._progress = (done, total)
+
+class JobScheduler:
+    def __init__(self, root, workers: int = DEFAULT_WORKERS, processes: bool = False) -> None:
+        self.root = root
+        self.workers = workers
+        self.processes = processes
+        self._executor: Executor | None = None   # se crea con el primer trabajo
+        self._done: "queue.SimpleQueue[Job]" = queue.SimpleQueue()
+        self._running: set[Job] = set()
+        self._latest: dict[Any, Job] = {}        # clave -> trabajo vigente
+        self._after_id = None
+
+    # -------- API -------- #
+    def submit(self, key, fn: Callable, *args,
+               on_done: Callable[[Any], None] | None = None,
+               on_error: Callable[[BaseException], None] | None = None,
+               on_progress: Callable[[float, float], None] | None = None,
+               with_job: bool = False) -> Job:
+        """
+        Ejecuta fn(*args) (o fn(job, *args) con `with_job`) fuera del hilo de
+        Tk. `on_done(resultado)`, `on_error(excepción)` y `on_progress(hecho,
+        total)` se llaman en el hilo de Tk y nunca para un trabajo obsoleto.
+        Con key=None el trabajo no reemplaza a ningún otro.
+        """
+        if with_job and self.processes:
+            raise ValueError("with_job solo es posible con hilos.")
+        if key is not None:
+            prev = self._latest.get(key)
+            if prev is not None:
+                prev.cancel()
+                count("jobs.superseded")
+        job = Job(key, on_done, on_error, on_progress)
+        if key is not None:
+            self._latest[key] = job
+        self._running.add(job)
+        count("jobs.submitted")
+        job.future = self._pool().submit(fn, job, *args) if with_job else self._pool().submit(fn, *args)
+        # El callback corre en el hilo de trabajo: solo encola
+        job.future.add_done_callback(lambda _f, job=job: self._done.put(job))
+        self._schedule()
+        return job
+
+    def cancel(self, key) -> None:
+        job = self._latest.pop(key, None)
+        if job is not None:
+            job.cancel()
+
+    def cancel_all(self) -> None:
+        for job in list(self._running):
+            job.cancel()
+        self._latest.clear()
+
+    def busy(self, key=None) -> bool:
+        """¿Hay un trabajo vigente con esa clave (o cualquiera, sin clave)?"""
+        return key in self._latest if key is not None else bool(self._running)
+
+    def shutdown(self) -> None:
+        self.cancel_all()
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # -------- Interno -------- #
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            if self.processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        return self._executor
+
+    def _schedule(self) -> None:
+        if self._after_id is None and self._running:
+            self._after_id = self.root.after(POLL_MS, self._pump)
+
+    def _pump(self) -> None:
+        self._after_id = None
+        deadline = time.perf_counter() + FRAME_BUDGET_S
+        for job in list(self._latest.values()):
+            p = job._progress
+            if p is not None and p is not job._progress_seen and job.on_progress and not job.cancelled:
+                job._progress_seen = p
+                self._call(job.on_progress, *p)
+        while time.perf_counter() < deadline:
+            try:
+                job = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._deliver(job)
+        self._schedule()
+
+    def _deliver(self, job: Job) -> None:
+        self._running.discard(job)
+        if job.key is not None and self._latest.get(job.key) is job:
+            del self._latest[job.key]
+        if job.cancelled:
+            count("jobs.discarded")
+            return
+        try:
+            result = job.future.result()
+        except JobCancelled:
+            return
+        except BaseException as e:
+            if job.on_error is not None:
+                self._call(job.on_error, e)
+            else:
+                self.root.report_callback_exception(type(e), e, e.__traceback__)
+            return
+        if job.on_done is not None:
+            self._call(job.on_done, result)
+
+    def _call(self, fn: Callable, *args) -> None:
+        # Un callback que falla no debe impedir la entrega de los demás
+        try:
+            fn(*args)
+        except Exception as e:
+            self.root.report_callback_exception(type(e), e, e.__traceback__)
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentación opcional (--metrics o DTF_METRICS=1).
+
+Tiempos y contadores de las rutas calientes (cálculo, on_calcular, config,
+fases del updater). Cada medida va a un buffer circular y a un agregado por
+nombre; al salir (o con Ctrl+Mayús+M en la app) se vuelcan a metrics.json y
+metrics.prom (formato de texto tipo Prometheus) junto a config.json.
+
+Desactivada no mide nada: timer() devuelve un contexto vacío compartido.
+Con profile_next() el siguiente bloque profiled() se captura con cProfile.
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+ENV_VAR = "DTF_METRICS"
+DEFAULT_RING_SIZE = 4096
+JSON_FILENAME = "metrics.json"
+TEXT_FILENAME = "metrics.prom"
+PROFILE_FILENAME = "calc_profile"   # .pstats y .txt
+
+class _NullTimer:
+    __slots__ = ()
+    path = None  # como _Profile cuando no se ha capturado nada
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+_NULL = _NullTimer()
+
+class _Timer:
+    __slots__ = ("_m", "_name", "_t0")
+
+    def __init__(self, m: "Metrics", name: str) -> None:
+        self._m = m
+        self._name = name
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._m.record(self._name, time.perf_counter() - self._t0)
+
+class Metrics:
+    def __init__(self, ring_size: int = DEFAULT_RING_SIZE) -> None:
+        self.enabled = False
+        self.events: deque = deque(maxlen=ring_size)   # (epoch, nombre, ms)
+        self.timers: dict[str, list] = {}              # nombre -> [n, total_ms, max_ms]
+        self.counters: dict[str, float] = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._atexit = False
+        self._profile_armed = False
+
+    def enable(self, dump_on_exit: bool = True) -> None:
+        self.enabled = True
+        if dump_on_exit and not self._atexit:
+            self._atexit = True
+            atexit.register(self.dump_if_enabled)
+
+    # -------- Medidas -------- #
+    def timer(self, name: str):
+        return _Timer(self, name) if self.enabled else _NULL
+
+    def record(self, name: str, seconds: float) -> None:
+        ms = seconds * 1e3
+        with self._lock:
+            self.events.append((time.time(), name, ms))
+            agg = self.timers.get(name)
+            if agg is None:
+                self.timers[name] = [1, ms, ms]
+            else:
+                agg[0] += 1
+                agg[1] += ms
+                if ms > agg[2]:
+                    agg[2] = ms
+
+    def count(self, name: str, n: float = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def timed(self, name: str):
+        """Decorador: mide cada llamada a la función con timer(name)."""
+        def deco(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _Timer(self, name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return deco
+
+    # -------- Volcado -------- #
+    def snapshot(self) -> dict:
+        with self._lock:
+            events = list(self.events)
+            timers = {k: list(v) for k, v in self.timers.items()}
+            counters = dict(self.counters)
+        recent: dict[str, list[float]] = {}
+        for _, name, ms in events:
+            recent.setdefault(name, []).append(ms)
+        out = {}
+        for name, (n, total, mx) in sorted(timers.items()):
+            xs = sorted(recent.get(name, ()))
+            out[name] = {
+                "count": n,
+                "total_ms": round(total, 3),
+                "mean_ms": round(total / n, 3),
+                "max_ms": round(mx, 3),
+                # Percentiles sobre lo que queda en el buffer circular
+                "p50_ms": round(xs[len(xs) // 2], 3) if xs else None,
+                "p95_ms": round(xs[min(len(xs) - 1, int(len(xs) * 0.95))], 3) if xs else None,
+            }
+        return {
+            "started_at": self.started,
+            "uptime_s": round(time.time() - self.started, 3),
+            "timers": out,
+            "counters": counters,
+            "events": [{"t": round(t, 3), "name": n, "ms": round(ms, 3)} for t, n, ms in events],
+        }
+
+    def to_text(self, snap: dict | None = None) -> str:
+        snap = snap or self.snapshot()
+        lines = ["# TYPE dtf_timer_count counter", "# TYPE dtf_timer_ms summary"]
+        for name, t in snap["timers"].items():
+            lab = f'name="{name}"'
+            lines.append(f"dtf_timer_count{{{lab}}} {t['count']}")
+            lines.append(f"dtf_timer_ms_sum{{{lab}}} {t['total_ms']}")
+            lines.append(f"dtf_timer_ms_max{{{lab}}} {t['max_ms']}")
+            for q, key in (("0.5", "p50_ms"), ("0.95", "p95_ms")):
+                if t[key] is not None:
+                    lines.append(f'dtf_timer_ms{{{lab},quantile="{q}"}} {t[key]}')
+        lines.append("# TYPE dtf_counter counter")
+        for name, v in sorted(snap["counters"].items()):
+            lines.append(f'dtf_counter{{name="{name}"}} {v:g}')
+        lines.append(f"dtf_uptime_seconds {snap['uptime_s']}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, directory: Path | None = None) -> tuple[Path, Path]:
+        """Escribe metrics.json y metrics.prom. Devuelve sus rutas."""
+        d = Path(directory) if directory else _default_dir()
+        d.mkdir(parents=True, exist_ok=True)
+        snap = self.snapshot()
+        pj, pt = d / JSON_FILENAME, d / TEXT_FILENAME
+        pj.write_text(json.dumps(snap, indent=2, ensure_ascii=False), encoding="utf-8")
+        pt.write_text(self.to_text(snap), encoding="utf-8")
+        return pj, pt
+
+    def dump_if_enabled(self) -> None:
+        """Volcado al salir: sin errores si no se puede escribir."""
+        if not self.enabled:
+            return
+        try:
+            self.dump()
+        except Exception:
+            pass
+
+    # -------- cProfile -------- #
+    def profile_next(self) -> None:
+        """El siguiente bloque profiled() se captura con cProfile."""
+        self._profile_armed = True
+
+    @property
+    def profile_armed(self) -> bool:
+        return self._profile_armed
+
+    def profiled(self, directory: Path | None = None):
+        if not self._profile_armed:
+            return _NULL
+        self._profile_armed = False
+        return _Profile(Path(directory) if directory else _default_dir())
+
+class _Profile:
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.path: Path | None = None
+
+    def __enter__(self):
+        import cProfile
+        self._prof = cProfile.Profile()
+        self._prof.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        import io
+        import pstats
+        self._prof.disable()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        base = self.directory / PROFILE_FILENAME
+        self._prof.dump_stats(str(base.with_suffix(".pstats")))
+        buf = io.StringIO()
+        pstats.Stats(self._prof, stream=buf).sort_stats("cumulative").print_stats(40)
+        self.path = base.with_suffix(".txt")
+        self.path.write_text(buf.getvalue(), encoding="utf-8")
+
+def _default_dir() -> Path:
+    from .config import get_config_dir
+    return get_config_dir()
+
+metrics = Metrics()
+timer = metrics.timer
+count = metrics.count
+timed = metrics.timed
+
+if os.getenv(ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on"):
+    metrics.enable()
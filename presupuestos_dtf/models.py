@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
+from array import array
 from dataclasses import dataclass
+from typing import Iterable, Iterator
 
-@dataclass(frozen=True)
+# slots: sin __dict__ por instancia; historiales y lotes guardan millones
+@dataclass(frozen=True, slots=True)
 class CalcInput:
     roll_width_cm: float
     price_per_meter: float
@@ -12,7 +15,17 @@ class CalcInput:
     num_copies: int
     orientation_deg: int  # 0 o 90
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
+class LayoutGeometry:
+    """Parte de CalcResult que no depende del precio (se cachea)."""
+    orientation_deg: int
+    designs_per_row: int
+    rows_needed: int
+    usage_percent: float
+    total_height_cm: float
+    total_height_m: float
+
+@dataclass(frozen=True, slots=True)
 class CalcResult:
     orientation_deg: int
     designs_per_row: int
@@ -21,3 +34,198 @@ class CalcResult:
     total_height_cm: float
     total_height_m: float
     cost: float
+
+@dataclass(frozen=True, slots=True)
+class MixedLayoutResult:
+    # Filas con base a 0° (alto = alto imagen) y filas con base a 90°.
+    # Cada fila lleva `designs_per_row_*` copias en su orientación base y
+    # `fill_per_row_*` copias giradas apiladas en el hueco del borde.
+    rows_0: int
+    designs_per_row_0: int
+    fill_per_row_0: int
+    rows_90: int
+    designs_per_row_90: int
+    fill_per_row_90: int
+    rows_needed: int
+    usage_percent: float
+    total_height_cm: float
+    total_height_m: float
+    cost: float
+
+# Columnas de CalcResultTable y su tipo de array (enteros de 64 bits y
+# dobles: guardan sin pérdida los int y float de CalcResult)
+RESULT_COLUMNS = (
+    ("orientation_deg", "i"),
+    ("designs_per_row", "q"),
+    ("rows_needed", "q"),
+    ("usage_percent", "d"),
+    ("total_height_cm", "d"),
+    ("total_height_m", "d"),
+    ("cost", "d"),
+)
+
+@dataclass(frozen=True, slots=True)
+class CalcResultTable:
+    """
+    Muchos CalcResult en columnas (un array tipado por campo): 52 bytes por
+    resultado en lugar de un objeto con siete atributos. `table[i]` y la
+    iteración dan vistas (CalcResultView) que leen de las columnas sin
+    copiar; `row(i)` crea el CalcResult. Las columnas se pueden ampliar con
+    append/extend; replace() con otra columna comparte el resto.
+    """
+    orientation_deg: array
+    designs_per_row: array
+    rows_needed: array
+    usage_percent: array
+    total_height_cm: array
+    total_height_m: array
+    cost: array
+
+    @classmethod
+    def empty(cls) -> "CalcResultTable":
+        return cls(*(array(code) for _, code in RESULT_COLUMNS))
+
+    @classmethod
+    def from_results(cls, results: Iterable[CalcResult]) -> "CalcResultTable":
+        table = cls.empty()
+        table.extend(results)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.cost)
+
+    def __getitem__(self, i: int) -> "CalcResultView":
+        n = len(self.cost)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("índice fuera de la tabla")
+        return CalcResultView(self, i)
+
+    def __iter__(self) -> Iterator["CalcResultView"]:
+        for i in range(len(self.cost)):
+            yield CalcResultView(self, i)
+
+    def append(self, r: CalcResult) -> None:
+        self.orientation_deg.append(r.orientation_deg)
+        self.designs_per_row.append(r.designs_per_row)
+        self.rows_needed.append(r.rows_needed)
+        self.usage_percent.append(r.usage_percent)
+        self.total_height_cm.append(r.total_height_cm)
+        self.total_height_m.append(r.total_height_m)
+        self.cost.append(r.cost)
+
+    def extend(self, results: Iterable[CalcResult]) -> None:
+        for r in results:
+            self.append(r)
+
+    def row(self, i: int) -> CalcResult:
+        return CalcResult(
+            orientation_deg=self.orientation_deg[i],
+            designs_per_row=self.designs_per_row[i],
+            rows_needed=self.rows_needed[i],
+            usage_percent=self.usage_percent[i],
+            total_height_cm=self.total_height_cm[i],
+            total_height_m=self.total_height_m[i],
+            cost=self.cost[i],
+        )
+
+    def to_results(self) -> list[CalcResult]:
+        return [CalcResult(*values) for values in zip(
+            self.orientation_deg, self.designs_per_row, self.rows_needed, self.usage_percent,
+            self.total_height_cm, self.total_height_m, self.cost)]
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria de los datos de las columnas (sin la cabecera de cada array)."""
+        return sum(getattr(self, name).itemsize * len(self.cost) for name, _ in RESULT_COLUMNS)
+
+# Nombre anterior (compute_layouts_batch, reprice_batch, PriceTable.price_batch)
+CalcResultBatch = CalcResultTable
+
+def _column_value(name: str) -> property:
+    return property(lambda self: getattr(self._table, name)[self._index], doc=f"{name} de la fila")
+
+class CalcResultView:
+    """Fila de una CalcResultTable: mismos atributos que CalcResult, leídos de las columnas."""
+    __slots__ = ("_table", "_index")
+
+    orientation_deg = _column_value("orientation_deg")
+    designs_per_row = _column_value("designs_per_row")
+    rows_needed = _column_value("rows_needed")
+    usage_percent = _column_value("usage_percent")
+    total_height_cm = _column_value("total_height_cm")
+    total_height_m = _column_value("total_height_m")
+    cost = _column_value("cost")
+
+    def __init__(self, table: CalcResultTable, index: int) -> None:
+        self._table = table
+        self._index = index
+
+    def to_result(self) -> CalcResult:
+        return self._table.row(self._index)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CalcResultView):
+            other = other.to_result()
+        return self.to_result() == other if isinstance(other, CalcResult) else NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"CalcResultView({self._index}, {self.to_result()!r})"
+
+@dataclass(frozen=True)
+class NestItem:
+    width_cm: float
+    height_cm: float
+    copies: int = 1
+    rotatable: bool = True
+    name: str = ""
+    path: str = ""    # imagen del diseño, si se conoce (importación masiva)
+
+@dataclass(frozen=True, slots=True)
+class Placement:
+    item_index: int   # índice en la lista de NestItem
+    x_cm: float
+    y_cm: float
+    width_cm: float   # ya girado si rotated
+    height_cm: float
+    rotated: bool
+
+@dataclass(frozen=True)
+class NestResult:
+    placements: tuple[Placement, ...]
+    roll_width_cm: float
+    usage_percent: float
+    total_height_cm: float
+    total_height_m: float
+    cost: float
+
+@dataclass(frozen=True)
+class ScheduledOrder:
+    item_index: int        # índice en la lista de pedidos (NestItem)
+    orientation_deg: int
+    designs_per_row: int
+    full_rows: int         # filas completas solo de este pedido
+    shared_copies: int     # copias de la última fila, en filas compartidas
+
+@dataclass(frozen=True)
+class RollRun:
+    orders: tuple[ScheduledOrder, ...]
+    shared_rows: tuple[tuple[tuple[int, int], ...], ...]   # por fila: (item_index, copias)
+    rows_needed: int
+    total_height_cm: float
+    total_height_m: float
+    separate_height_m: float   # lo que suman sus pedidos presupuestados por separado
+
+@dataclass(frozen=True)
+class ProductionPlan:
+    runs: tuple[RollRun, ...]
+    roll_width_cm: float
+    total_height_m: float
+    separate_height_m: float
+
+    @property
+    def saved_m(self) -> float:
+        return self.separate_height_m - self.total_height_m
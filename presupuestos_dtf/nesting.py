@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Nesting de gang sheets: varios diseños distintos en un mismo rollo.
+
+Empaquetado skyline (bottom-left) sobre una tira de ancho fijo y longitud
+libre. Cada copia ocupa su tamaño más los márgenes (derecho/superior), igual
+que en compute_layout. Se prueban varias ordenaciones y, mientras quede
+tiempo, se mejora la mejor por búsqueda local (anytime).
+"""
+import random
+import time
+from typing import Iterable
+from .models import NestItem, Placement, NestResult
+
+EPS = 1e-9
+DEFAULT_TIME_BUDGET_S = 0.3
+
+# (índice del item, ancho, alto, girable) ya con márgenes sumados
+_Rect = tuple[int, float, float, bool]
+
+def _expand(items: list[NestItem], strip_w: float, margin_top: float, margin_right: float) -> list[_Rect]:
+    rects = []
+    for idx, it in enumerate(items):
+        if it.width_cm <= 0 or it.height_cm <= 0 or it.copies < 1:
+            raise ValueError(f"Diseño {idx + 1}: medidas y copias deben ser positivas.")
+        fw = it.width_cm + margin_right
+        fh = it.height_cm + margin_top
+        fits = fw <= strip_w + EPS
+        fits_rot = it.rotatable and fh <= strip_w + EPS
+        if not (fits or fits_rot):
+            raise ValueError(f"Diseño {idx + 1} ({it.width_cm:g}×{it.height_cm:g} cm) no cabe en el ancho del rollo.")
+        rects.extend([(idx, fw, fh, it.rotatable)] * it.copies)
+    return rects
+
+def _pack(rects: list[_Rect], strip_w: float) -> tuple[float, list[tuple]]:
+    """Skyline bottom-left. Devuelve (altura usada, [(idx, x, y, w, h, girado)])."""
+    sky = [[0.0, 0.0, strip_w]]  # segmentos [x, y, ancho], ordenados por x
+    placed = []
+    top = 0.0
+    for idx, w, h, rot in rects:
+        options = ((w, h, False), (h, w, True)) if rot and w != h else ((w, h, False),)
+        best = None
+        n = len(sky)
+        for fw, fh, r in options:
+            if fw > strip_w + EPS:
+                continue
+            for i in range(n):
+                x = sky[i][0]
+                if x + fw > strip_w + EPS:
+                    break
+                y = 0.0
+                rem = fw
+                j = i
+                while rem > EPS and j < n:
+                    if sky[j][1] > y:
+                        y = sky[j][1]
+                    rem -= sky[j][2]
+                    j += 1
+                score = (y + fh, x)
+                if best is None or score < best[0]:
+                    best = (score, i, x, y, fw, fh, r)
+
+        _, i, x, y, fw, fh, r = best
+        end = x + fw
+        j = i
+        while j < len(sky) and sky[j][0] < end - EPS:
+            seg_end = sky[j][0] + sky[j][2]
+            if seg_end <= end + EPS:
+                del sky[j]
+            else:
+                sky[j][2] = seg_end - end
+                sky[j][0] = end
+                break
+        sky.insert(i, [x, y + fh, fw])
+        # Fusionar vecinos a la misma altura
+        if i + 1 < len(sky) and abs(sky[i + 1][1] - sky[i][1]) <= EPS:
+            sky[i][2] += sky[i + 1][2]
+            del sky[i + 1]
+        if i > 0 and abs(sky[i - 1][1] - sky[i][1]) <= EPS:
+            sky[i - 1][2] += sky[i][2]
+            del sky[i]
+
+        placed.append((idx, x, y, fw, fh, r))
+        if y + fh > top:
+            top = y + fh
+    return top, placed
+
+_ORDERINGS = (
+    lambda r: (-r[2], -r[1]),              # alto desc
+    lambda r: (-max(r[1], r[2]), -r[1]),   # lado mayor desc
+    lambda r: (-r[1] * r[2], -r[2]),       # área desc
+    lambda r: (-r[1], -r[2]),              # ancho desc
+)
+
+def nest_items(
+    items: Iterable[NestItem],
+    roll_width_cm: float,
+    price_per_meter: float,
+    margin_top_cm: float,
+    margin_right_cm: float,
+    time_budget_s: float = DEFAULT_TIME_BUDGET_S,
+    seed: int = 0,
+) -> NestResult:
+    """
+    Coloca todas las copias de `items` en el rollo minimizando la longitud.
+    Siempre completa al menos una pasada; el resto del presupuesto de tiempo
+    se dedica a mejorar el resultado.
+    """
+    items = list(items)
+    if not items:
+        raise ValueError("El pedido no tiene diseños.")
+    deadline = time.perf_counter() + max(time_budget_s, 0.0)
+
+    # Igual que compute_layout: el último diseño de la fila no necesita margen derecho
+    strip_w = roll_width_cm + margin_right_cm
+    rects = _expand(items, strip_w, margin_top_cm, margin_right_cm)
+
+    best_h, best_placed, best_order = None, None, None
+    for key in _ORDERINGS:
+        order = sorted(rects, key=key)
+        h, placed = _pack(order, strip_w)
+        if best_h is None or h < best_h - EPS:
+            best_h, best_placed, best_order = h, placed, order
+        if time.perf_counter() >= deadline:
+            break
+
+    # Mejora anytime: intercambios aleatorios sobre la mejor ordenación
+    lower_bound = sum(w * h for _, w, h, _ in rects) / strip_w
+    rnd = random.Random(seed)
+    n = len(best_order)
+    while n > 1 and best_h > lower_bound + EPS and time.perf_counter() < deadline:
+        order = best_order[:]
+        for _ in range(rnd.randint(1, 3)):
+            a = rnd.randrange(n)
+            b = min(n - 1, a + rnd.randint(1, 8))
+            order[a], order[b] = order[b], order[a]
+        h, placed = _pack(order, strip_w)
+        if h < best_h - EPS:
+            best_h, best_placed, best_order = h, placed, order
+
+    placements = tuple(
+        Placement(idx, x, y, fw - margin_right_cm, fh - margin_top_cm, r)
+        for idx, x, y, fw, fh, r in best_placed
+    )
+    total_height_cm = best_h - margin_top_cm
+    total_height_m = total_height_cm / 100.0
+    area = sum(p.width_cm * p.height_cm for p in placements)
+    usage_percent = min(area / (roll_width_cm * total_height_cm) * 100.0, 100.0)
+
+    return NestResult(
+        placements=placements,
+        roll_width_cm=roll_width_cm,
+        usage_percent=usage_percent,
+        total_height_cm=total_height_cm,
+        total_height_m=total_height_m,
+        cost=total_height_m * price_per_meter,
+    )
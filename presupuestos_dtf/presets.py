@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+Catálogo de tamaños predefinidos con búsqueda por prefijo.
+
+Los tamaños de serie están aquí mismo; los de cada cliente se añaden en un
+CSV externo (presets.csv junto a config.json, o la ruta de `presets_file`
+en config.json) con columnas name, width_cm, height_cm y, opcionales,
+group y client (también en castellano: nombre, ancho_cm, alto_cm, grupo,
+cliente).
+
+El fichero se lee la primera vez que se busca y queda en caché hasta que
+cambie en disco. El índice guarda, para cada prefijo corto (1-2 letras), los
+presets con alguna palabra que empieza así, y una lista ordenada de
+palabras para prefijos más largos (bisect). search() parte de la lista de
+candidatos más pequeña y se detiene al llegar a `limit`, así que cuesta
+casi lo mismo con 50 presets que con 50.000.
+"""
+import csv
+import io
+import os
+import re
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+from itertools import groupby
+from dataclasses import dataclass
+from pathlib import Path
+from .metrics import count, timed
+
+PRESETS_FILENAME = "presets.csv"
+CUSTOM_PRESET = "Personalizado"   # primera entrada: no cambia las medidas
+SHORT_PREFIX = 2                  # prefijos de hasta 2 letras precalculados
+DEFAULT_LIMIT = 200               # entradas como máximo en el desplegable
+
+@dataclass(frozen=True, slots=True)   # slots: catálogos de decenas de miles
+class Preset:
+    name: str
+    width_cm: float
+    height_cm: float
+    group: str = ""
+    client: str = ""
+
+# grupo,nombre,ancho,alto
+_BUILTIN_CSV = """\
+Etiquetas / Branding,Etiqueta cuello 4×4 (cuadrado),4,4
+Etiquetas / Branding,Etiqueta interior 6×6 (cuadrado),6,6
+Etiquetas / Branding,Etiqueta interior 8×4,8,4
+Logos pequeños,Logo mini 6×6 (cuadrado),6,6
+Logos pequeños,Logo pecho 8×8 (cuadrado),8,8
+Logos pequeños,Logo pecho 10×10 (cuadrado),10,10
+Logos pequeños,Logo pecho 12×12 (cuadrado),12,12
+Logos pequeños,Logo rectangular 8×12,8,12
+Logos pequeños,Logo rectangular 10×15,10,15
+Mangas,Manga corta 8×12,8,12
+Mangas,Manga corta 10×15,10,15
+Mangas,Manga larga 8×30,8,30
+Mangas,Manga larga 10×35,10,35
+Frontales,Frontal pequeño 20×20 (cuadrado),20,20
+Frontales,Frontal pequeño 20×25,20,25
+Frontales,Frontal medio 25×25 (cuadrado),25,25
+Frontales,Frontal medio 25×35,25,35
+Frontales,Frontal grande 30×30 (cuadrado),30,30
+Frontales,Frontal grande 30×40,30,40
+Espalda,Espalda estándar 30×30 (cuadrado),30,30
+Espalda,Espalda estándar 30×35,30,35
+Espalda,Espalda grande 35×35 (cuadrado),35,35
+Espalda,Espalda grande 35×40,35,40
+Oversized,Oversized pecho 38×45,38,45
+Oversized,Oversized espalda 40×50,40,50
+Oversized,Oversized 40×40 (cuadrado),40,40
+Oversized,Oversized 45×45 (cuadrado),45,45
+Pantalones,Pierna lateral 10×30,10,30
+Pantalones,Pierna grande 12×50,12,50
+Pantalones,Muslo/Short 15×15 (cuadrado),15,15
+Gorras,Gorra frontal 10×5,10,5
+Gorras,Gorra frontal 6×6 (cuadrado),6,6
+Bolsas / Mochilas,Bolsa tote 25×25 (cuadrado),25,25
+Bolsas / Mochilas,Bolsa shopper 30×35,30,35
+Bolsas / Mochilas,Mochila saco 20×25,20,25
+Parches / Apliques,Parche pequeño 8×8 (cuadrado),8,8
+Parches / Apliques,Parche mediano 12×12 (cuadrado),12,12
+Parches / Apliques,Parche grande 20×20 (cuadrado),20,20
+Infantil,Body bebé 8×8 (cuadrado),8,8
+Infantil,Camiseta niño 15×15 (cuadrado),15,15
+Infantil,Camiseta niño 20×20 (cuadrado),20,20
+Textiles grandes,Toalla mano 30×50,30,50
+Textiles grandes,Toalla baño 50×70,50,70
+Textiles grandes,Funda cojín 40×40 (cuadrado),40,40
+Textiles grandes,Funda cojín 50×50 (cuadrado),50,50
+"""
+
+# -------- Normalización -------- #
+_SPLIT = re.compile(r"[^0-9a-z.]+")
+_DIMS = re.compile(r"^(\d+(?:\.\d+)?)x(\d+(?:\.\d+)?)$")
+
+_FOLD = str.maketrans("áàäâéèëêíìïîóòöôúùüûñç×,", "aaaaeeeeiiiioooouuuuncx.")
+
+def normalize(text: str) -> str:
+    """Minúsculas, sin tildes y con × como x."""
+    text = text.lower().translate(_FOLD)
+    if text.isascii():
+        return text
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+def tokens(text: str) -> list[str]:
+    """Palabras de búsqueda; '10x15' también aporta '10' y '15'."""
+    out = []
+    for tok in _SPLIT.split(normalize(text)):
+        tok = tok.strip(".")
+        if tok:
+            out.append(tok)
+            m = _DIMS.match(tok)
+            if m:
+                out.extend(m.groups())
+    return out
+
+# -------- Índice -------- #
+class PresetIndex:
+    def __init__(self, presets: list[Preset]) -> None:
+        self.presets = presets
+        self._text: list[str] = []   # " palabra palabra ... " por preset, para comprobar prefijos
+        by_word: dict[str, list[int]] = {}
+        shared: dict[str, list[str]] = {}   # grupos y clientes se repiten mucho
+        # Los ids se añaden en orden creciente: cada lista queda ordenada
+        for i, p in enumerate(presets):
+            extra = shared.get(p.group + "\0" + p.client)
+            if extra is None:
+                extra = shared[p.group + "\0" + p.client] = tokens(f"{p.group} {p.client}")
+            words = dict.fromkeys(tokens(p.name) + extra)
+            self._text.append(" " + " ".join(words) + " ")
+            for w in words:
+                ids = by_word.get(w)
+                if ids is None:
+                    by_word[w] = [i]
+                else:
+                    ids.append(i)
+        self._sorted_words = sorted(by_word)
+        self._by_word = {w: array("I", ids) for w, ids in by_word.items()}
+        # Prefijos cortos: unión de las palabras que comparten prefijo (contiguas al ordenar)
+        self._short: dict[str, array] = {}
+        for k in range(1, SHORT_PREFIX + 1):
+            for prefix, group in groupby(self._sorted_words, key=lambda w: w[:k]):
+                group = list(group)
+                if len(group) == 1:
+                    self._short[prefix] = self._by_word[group[0]]
+                else:
+                    ids = set()
+                    for w in group:
+                        ids.update(self._by_word[w])
+                    self._short[prefix] = array("I", sorted(ids))
+
+    def _candidates(self, word: str):
+        """Ids (en orden de catálogo) con alguna palabra que empieza por `word`."""
+        if len(word) <= SHORT_PREFIX:
+            return self._short.get(word, ())
+        lo = bisect_left(self._sorted_words, word)
+        hi = bisect_left(self._sorted_words, word + "\uffff", lo)
+        if hi - lo == 1:
+            return self._by_word[self._sorted_words[lo]]
+        ids = set()
+        for w in self._sorted_words[lo:hi]:
+            ids.update(self._by_word[w])
+        return sorted(ids)
+
+    def _size(self, word: str) -> int:
+        """Nº de candidatos de `word` (cota superior si hay varias palabras con ese prefijo)."""
+        if len(word) <= SHORT_PREFIX:
+            return len(self._short.get(word, ()))
+        lo = bisect_left(self._sorted_words, word)
+        hi = bisect_left(self._sorted_words, word + "\uffff", lo)
+        return sum(len(self._by_word[w]) for w in self._sorted_words[lo:hi])
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> tuple[list[Preset], bool]:
+        """
+        Presets (en orden de catálogo, como mucho `limit`) con alguna palabra
+        que empieza por cada palabra de `query`, y si hay más que no caben.
+        """
+        words = list(dict.fromkeys(tokens(query)))
+        if not words:
+            return self.presets[:limit], len(self.presets) > limit
+        # La palabra más selectiva da los candidatos, la segunda se cruza con
+        # un set y el resto se comprueba sobre el texto de cada preset
+        words.sort(key=self._size)
+        cands = self._candidates(words[0])
+        if len(words) > 1:
+            second = set(self._candidates(words[1]))
+            cands = (i for i in cands if i in second)  # perezoso: se corta en `limit`
+        rest = [" " + q for q in words[2:]]   # " q" dentro del texto = palabra que empieza por q
+        text = self._text
+        out = []
+        for i in cands:
+            if all(q in text[i] for q in rest):
+                if len(out) == limit:
+                    return out, True
+                out.append(self.presets[i])
+        return out, False
+
+# -------- Carga -------- #
+_ALIASES = {
+    "name": "name", "nombre": "name",
+    "width_cm": "width_cm", "ancho_cm": "width_cm", "width": "width_cm", "ancho": "width_cm",
+    "height_cm": "height_cm", "alto_cm": "height_cm", "height": "height_cm", "alto": "height_cm",
+    "group": "group", "grupo": "group",
+    "client": "client", "cliente": "client",
+}
+
+def builtin_presets() -> list[Preset]:
+    return [Preset(name, float(w), float(h), group)
+            for group, name, w, h in csv.reader(io.StringIO(_BUILTIN_CSV))]
+
+def parse_presets(fp) -> tuple[list[Preset], int]:
+    """(presets, nº de filas descartadas) de un CSV con cabecera."""
+    reader = csv.reader(fp)
+    header = [_ALIASES.get(h.strip().lower(), "") for h in next(reader, [])]
+    if "name" not in header or "width_cm" not in header or "height_cm" not in header:
+        raise ValueError("El catálogo necesita las columnas name, width_cm y height_cm.")
+    out, bad = [], 0
+    for rec in reader:
+        row = dict(zip(header, rec))
+        try:
+            w = float(row["width_cm"].replace(",", "."))
+            h = float(row["height_cm"].replace(",", "."))
+            name = row["name"].strip()
+            if not name or w <= 0 or h <= 0:
+                raise ValueError
+        except (KeyError, ValueError, AttributeError):
+            bad += 1 if any(f.strip() for f in rec) else 0
+            continue
+        out.append(Preset(name, w, h, row.get("group", "").strip(), row.get("client", "").strip()))
+    return out, bad
+
+class PresetCatalog:
+    """Presets de serie + catálogo externo, con su índice."""
+    def __init__(self, presets: list[Preset], source: Path | None = None,
+                 signature=None, skipped: int = 0, error: str = "") -> None:
+        self.presets = presets
+        self.by_name = {p.name: p for p in presets}
+        self.index = PresetIndex(presets)
+        self.source = source
+        self.signature = signature
+        self.skipped = skipped
+        self.error = error
+
+    def get(self, name: str) -> Preset | None:
+        return self.by_name.get(name)
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> tuple[list[Preset], bool]:
+        return self.index.search(query, limit)
+
+    def __len__(self) -> int:
+        return len(self.presets)
+
+def default_catalog_path() -> Path:
+    from .config import get_config_dir, load_config
+    custom = load_config().get("presets_file") or ""
+    return Path(custom).expanduser() if custom else get_config_dir() / PRESETS_FILENAME
+
+def _signature(path: Path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+@timed("presets.load")
+def load_catalog(path: Path | None) -> PresetCatalog:
+    presets = builtin_presets()
+    sig = _signature(path) if path else None
+    skipped, error = 0, ""
+    if sig is not None:
+        try:
+            with open(path, "r", encoding="utf-8-sig", newline="") as f:
+                extra, skipped = parse_presets(f)
+            presets.extend(extra)
+        except (OSError, ValueError, UnicodeDecodeError, csv.Error) as e:
+            error = f"{path.name}: {e}"
+    return PresetCatalog(presets, path, sig, skipped, error)
+
+_cache: PresetCatalog | None = None
+_cache_lock = threading.Lock()
+
+def get_catalog(path: Path | None = None) -> PresetCatalog:
+    """Catálogo en caché; se vuelve a leer solo si el fichero ha cambiado."""
+    global _cache
+    path = path or default_catalog_path()
+    with _cache_lock:
+        cat = _cache
+        if cat is not None and cat.source == path and cat.signature == _signature(path):
+            count("presets.cache_hit")
+            return cat
+        _cache = cat = load_catalog(path)
+        return cat
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+Tarifas por tramos: precio por volumen, gastos de arranque, importe mínimo y
+recargos por cliente.
+
+La sección "pricing" de config.json se convierte una vez en PricingRules y,
+para cada precio base y cliente, en una PriceTable: una función por tramos
+con los límites en una lista ordenada (bisect) y el coste acumulado de cada
+tramo ya sumado, así que evaluar una longitud es una búsqueda binaria y una
+multiplicación. price_per_meter sigue siendo el precio del primer tramo
+(desde 0 m); sin tramos, arranque, mínimo ni recargo la tabla es plana y el
+coste es exactamente el de siempre, longitud × precio.
+
+    "pricing": {
+        "mode": "graduated",
+        "tiers": [{"from_m": 10, "price_per_meter": 9.5}, {"from_m": 50, "price_per_meter": 8}],
+        "setup_fee": 3,
+        "minimum_charge": 5,
+        "markups": {"Club Norte": 10}
+    }
+
+"graduated": cada tramo se cobra a su precio (los 10 primeros metros a
+price_per_meter, del 10 al 50 a 9,5…). "volume": toda la longitud al precio
+del tramo alcanzado. Los recargos son porcentajes sobre el total, por nombre
+exacto de cliente.
+"""
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Iterable, TypeVar
+from .models import CalcResult, LayoutGeometry
+
+MODES = ("graduated", "volume")
+
+_Priced = TypeVar("_Priced")
+
+class PriceTable:
+    """Coste (€) en función de la longitud (m), compilado para un precio base y un recargo."""
+    __slots__ = ("bounds", "rates", "base", "graduated", "setup_fee", "minimum_charge",
+                 "factor", "flat", "key")
+
+    def __init__(self, price_per_meter: float, tiers: Iterable[tuple[float, float]] = (),
+                 graduated: bool = True, setup_fee: float = 0.0, minimum_charge: float = 0.0,
+                 markup_pct: float = 0.0) -> None:
+        bounds = [0.0]
+        rates = [float(price_per_meter)]
+        for from_m, price in sorted(tiers):
+            bounds.append(float(from_m))
+            rates.append(float(price))
+        # Coste acumulado al empezar cada tramo (solo se usa en modo graduated)
+        base = [0.0]
+        for i in range(1, len(bounds)):
+            base.append(base[-1] + (bounds[i] - bounds[i - 1]) * rates[i - 1])
+        self.bounds = bounds
+        self.rates = rates
+        self.base = base
+        self.graduated = bool(graduated)
+        self.setup_fee = float(setup_fee)
+        self.minimum_charge = float(minimum_charge)
+        self.factor = 1.0 + float(markup_pct) / 100.0
+        self.flat = len(bounds) == 1 and not self.setup_fee and not self.minimum_charge and self.factor == 1.0
+        self.key = (tuple(bounds), tuple(rates), self.graduated, self.setup_fee, self.minimum_charge, self.factor)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PriceTable) and self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        return f"PriceTable(bounds={self.bounds}, rates={self.rates}, graduated={self.graduated})"
+
+    def cost(self, length_m: float) -> float:
+        if self.flat:
+            return length_m * self.rates[0]
+        i = bisect_right(self.bounds, length_m) - 1
+        if i < 0:
+            i = 0
+        if self.graduated:
+            c = self.base[i] + (length_m - self.bounds[i]) * self.rates[i]
+        else:
+            c = length_m * self.rates[i]
+        c += self.setup_fee
+        if c < self.minimum_charge:
+            c = self.minimum_charge
+        return c * self.factor
+
+    def cost_many(self, lengths_m: Iterable[float]) -> array:
+        """cost() sobre una columna de longitudes, con todo lo invariante fuera del bucle."""
+        rate0 = self.rates[0]
+        if self.flat:
+            return array("d", [m * rate0 for m in lengths_m])
+        bounds, rates, base = self.bounds, self.rates, self.base
+        setup, minimum, factor, graduated = self.setup_fee, self.minimum_charge, self.factor, self.graduated
+        first_bound = bounds[1] if len(bounds) > 1 else float("inf")
+        out = array("d")
+        append = out.append
+        for m in lengths_m:
+            # Casi todos los trabajos caen en el primer tramo: sin bisect
+            i = 0 if m < first_bound else bisect_right(bounds, m) - 1
+            if graduated:
+                c = base[i] + (m - bounds[i]) * rates[i]
+            else:
+                c = m * rates[i]
+            c += setup
+            if c < minimum:
+                c = minimum
+            append(c * factor)
+        return out
+
+    def price(self, result: _Priced) -> _Priced:
+        """El mismo resultado (CalcResult, MixedLayoutResult, NestResult) con el coste de esta tarifa."""
+        if type(result) is CalcResult:
+            # Camino caliente: replace() genérico cuesta más que toda la tarifa
+            return self.price_geometry(result)
+        return replace(result, cost=self.cost(result.total_height_m))
+
+    def price_geometry(self, geom: LayoutGeometry | CalcResult) -> CalcResult:
+        """Como calc.price_layout, pero con esta tarifa."""
+        return CalcResult(
+            orientation_deg=geom.orientation_deg,
+            designs_per_row=geom.designs_per_row,
+            rows_needed=geom.rows_needed,
+            usage_percent=geom.usage_percent,
+            total_height_cm=geom.total_height_cm,
+            total_height_m=geom.total_height_m,
+            cost=self.cost(geom.total_height_m),
+        )
+
+    def price_batch(self, batch):
+        """CalcResultTable con la columna de coste de esta tarifa; el resto se comparte."""
+        return replace(batch, cost=self.cost_many(batch.total_height_m))
+
+    def sql(self, length_m: str, params: dict, prefix: str = "t") -> str:
+        """
+        Misma función como expresión SQL sobre `length_m`, con los valores en
+        `params` (claves `prefix`…): SQLite hace las mismas operaciones en
+        double y da los mismos céntimos que cost().
+        """
+        for i, (b, r, acc) in enumerate(zip(self.bounds, self.rates, self.base)):
+            params[f"{prefix}b{i}"], params[f"{prefix}r{i}"], params[f"{prefix}a{i}"] = b, r, acc
+        m = f"({length_m})"
+        if self.flat:
+            return f"{m} * :{prefix}r0"
+
+        def band(i: int) -> str:
+            if self.graduated:
+                return f":{prefix}a{i} + ({m} - :{prefix}b{i}) * :{prefix}r{i}"
+            return f"{m} * :{prefix}r{i}"
+
+        expr = band(0)
+        if len(self.bounds) > 1:
+            whens = " ".join(f"WHEN {m} >= :{prefix}b{i} THEN {band(i)}"
+                             for i in range(len(self.bounds) - 1, 0, -1))
+            expr = f"CASE {whens} ELSE {expr} END"
+        params[f"{prefix}setup"], params[f"{prefix}min"], params[f"{prefix}k"] = \
+            self.setup_fee, self.minimum_charge, self.factor
+        return f"(MAX(({expr}) + :{prefix}setup, :{prefix}min) * :{prefix}k)"
+
+@dataclass(frozen=True)
+class PricingRules:
+    """Sección "pricing" de config.json ya validada (sin el precio base, que va aparte)."""
+    tiers: tuple[tuple[float, float], ...] = ()     # (desde_m, €/m), ordenados
+    graduated: bool = True
+    setup_fee: float = 0.0
+    minimum_charge: float = 0.0
+    markups: tuple[tuple[str, float], ...] = ()     # (cliente, %)
+
+    @property
+    def flat(self) -> bool:
+        return not (self.tiers or self.setup_fee or self.minimum_charge or self.markups)
+
+    def markup_pct(self, customer: str = "") -> float:
+        customer = (customer or "").strip()
+        for name, pct in self.markups:
+            if name == customer:
+                return pct
+        return 0.0
+
+    def table(self, price_per_meter: float, customer: str = "") -> PriceTable:
+        return _table(self, float(price_per_meter), self.markup_pct(customer))
+
+    def sql_cost(self, length_m: str, customer: str, price_per_meter: float,
+                 params: dict, prefix: str = "t") -> str:
+        """
+        Expresión SQL del coste para una fila con longitud `length_m` (m) y
+        cliente en la columna `customer`. Los valores de la tarifa se añaden
+        a `params` con claves que empiezan por `prefix`.
+        """
+        table = PriceTable(price_per_meter, self.tiers, self.graduated, self.setup_fee, self.minimum_charge)
+        expr = table.sql(length_m, params, prefix)
+        if not self.markups:
+            return expr
+        whens = []
+        for i, (name, pct) in enumerate(self.markups):
+            params[f"{prefix}mc{i}"], params[f"{prefix}mk{i}"] = name, 1.0 + pct / 100.0
+            whens.append(f"WHEN :{prefix}mc{i} THEN :{prefix}mk{i}")
+        return f"({expr} * CASE {customer} {' '.join(whens)} ELSE 1.0 END)"
+
+    def describe(self) -> str:
+        """Resumen de una línea para la interfaz."""
+        if self.flat:
+            return "Tarifa plana (precio por metro)."
+        parts = []
+        if self.tiers:
+            steps = ", ".join(f"desde {m:g} m a {p:g} €/m" for m, p in self.tiers)
+            parts.append(f"{'Tramos' if self.graduated else 'Precio por volumen'}: {steps}")
+        if self.setup_fee:
+            parts.append(f"arranque {self.setup_fee:g} €")
+        if self.minimum_charge:
+            parts.append(f"mínimo {self.minimum_charge:g} €")
+        if self.markups:
+            parts.append(f"{len(self.markups)} clientes con recargo")
+        return "; ".join(parts) + "."
+
+@lru_cache(maxsize=256)
+def _table(rules: PricingRules, price_per_meter: float, markup_pct: float) -> PriceTable:
+    return PriceTable(price_per_meter, rules.tiers, rules.graduated, rules.setup_fee,
+                      rules.minimum_charge, markup_pct)
+
+FLAT = PricingRules()
+
+def parse_number(value, what: str, minimum: float = 0.0, positive: bool = False) -> float:
+    """Número de config.json ≥ minimum (> 0 con `positive`). Lanza ValueError con el motivo."""
+    try:
+        x = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{what}: '{value}' no es un número.")
+    if positive:
+        if not x > 0:  # también descarta NaN
+            raise ValueError(f"{what} debe ser mayor que 0.")
+    elif not x >= minimum:
+        raise ValueError(f"{what} debe ser ≥ {minimum:g}.")
+    return x
+
+def parse_pricing(data) -> PricingRules:
+    """Valida la sección "pricing" de config.json. Lanza ValueError con el motivo."""
+    if not data:
+        return FLAT
+    if not isinstance(data, dict):
+        raise ValueError("'pricing' debe ser un objeto.")
+    mode = str(data.get("mode") or "graduated").strip().lower()
+    if mode not in MODES:
+        raise ValueError(f"'mode' debe ser {' o '.join(MODES)}.")
+
+    tiers = []
+    for t in data.get("tiers") or ():
+        if not isinstance(t, dict):
+            raise ValueError("Cada tramo debe ser un objeto con from_m y price_per_meter.")
+        from_m = parse_number(t.get("from_m"), "from_m")
+        if from_m == 0:
+            raise ValueError("El tramo desde 0 m es el precio por metro de la configuración.")
+        tiers.append((from_m, parse_number(t.get("price_per_meter"), "price_per_meter")))
+    tiers.sort()
+    if len({m for m, _ in tiers}) != len(tiers):
+        raise ValueError("Hay dos tramos con el mismo from_m.")
+
+    markups = data.get("markups") or {}
+    if not isinstance(markups, dict):
+        raise ValueError("'markups' debe ser un objeto cliente → porcentaje.")
+    return PricingRules(
+        tiers=tuple(tiers),
+        graduated=mode == "graduated",
+        setup_fee=parse_number(data.get("setup_fee", 0), "setup_fee"),
+        minimum_charge=parse_number(data.get("minimum_charge", 0), "minimum_charge"),
+        markups=tuple((str(k).strip(), parse_number(v, f"Recargo de {k}", -100.0)) for k, v in markups.items()),
+    )
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Lectura de diseños y escritura de PNG en streaming (exportación de gang sheets).
+
+PngWriter escribe fila a fila con un zlib.compressobj: la imagen completa no
+existe nunca en memoria. load_design() devuelve el diseño ya escalado (y
+girado) a su huella en píxeles como lista de filas RGBA.
+
+Pillow es opcional: si está instalado se usa para leer (PNG, JPEG, TIFF...) y
+escalar con buena calidad. Sin Pillow solo se aceptan PNG de 8/16 bits sin
+entrelazar y se escala por vecino más próximo.
+"""
+import struct
+import zlib
+from array import array
+from pathlib import Path
+from typing import BinaryIO
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # opcional
+    Image = ImageOps = None
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+IDAT_CHUNK = 1 << 20   # bytes comprimidos por chunk IDAT
+
+# -------- Escritura -------- #
+def _chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+class PngWriter:
+    """PNG RGBA de 8 bits escrito fila a fila."""
+    def __init__(self, fp: BinaryIO, width: int, height: int, dpi: float | None = None, level: int = 6) -> None:
+        if width < 1 or height < 1:
+            raise ValueError("La imagen debe tener al menos 1×1 píxeles.")
+        self.fp = fp
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._z = zlib.compressobj(level)
+        self._pending: list[bytes] = []
+        self._pending_len = 0
+        self._filter = b"\x00"  # sin filtro: la fila se copia tal cual
+        fp.write(PNG_SIGNATURE)
+        fp.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)))
+        if dpi:
+            ppm = int(round(dpi / 0.0254))  # píxeles por metro (para el RIP)
+            fp.write(_chunk(b"pHYs", struct.pack(">IIB", ppm, ppm, 1)))
+
+    def write_row(self, row: bytes | bytearray) -> None:
+        if len(row) != self.width * 4:
+            raise ValueError("Longitud de fila incorrecta.")
+        self._push(self._z.compress(self._filter))
+        self._push(self._z.compress(row))
+        self.rows_written += 1
+
+    def _push(self, data: bytes) -> None:
+        if data:
+            self._pending.append(data)
+            self._pending_len += len(data)
+            if self._pending_len >= IDAT_CHUNK:
+                self._flush_idat()
+
+    def _flush_idat(self) -> None:
+        if self._pending_len:
+            self.fp.write(_chunk(b"IDAT", b"".join(self._pending)))
+            self._pending.clear()
+            self._pending_len = 0
+
+    def close(self) -> None:
+        if self.rows_written != self.height:
+            raise ValueError(f"Se escribieron {self.rows_written} filas de {self.height}.")
+        self._push(self._z.flush())
+        self._flush_idat()
+        self.fp.write(_chunk(b"IEND", b""))
+
+# -------- Lectura PNG (sin Pillow) -------- #
+def _unfilter(ftype: int, line: bytearray, prev: bytes, bpp: int) -> None:
+    n = len(line)
+    if ftype == 0:
+        return
+    if ftype == 1:  # Sub
+        for i in range(bpp, n):
+            line[i] = (line[i] + line[i - bpp]) & 0xFF
+    elif ftype == 2:  # Up: suma byte a byte sin acarreo con enteros grandes
+        a = int.from_bytes(line, "little")
+        b = int.from_bytes(prev, "little")
+        lo = int.from_bytes(b"\x7f" * n, "little")
+        hi = int.from_bytes(b"\x80" * n, "little")
+        line[:] = (((a & lo) + (b & lo)) ^ ((a ^ b) & hi)).to_bytes(n, "little")
+    elif ftype == 3:  # Average
+        for i in range(n):
+            left = line[i - bpp] if i >= bpp else 0
+            line[i] = (line[i] + ((left + prev[i]) >> 1)) & 0xFF
+    elif ftype == 4:  # Paeth
+        for i in range(n):
+            a = line[i - bpp] if i >= bpp else 0
+            b = prev[i]
+            c = prev[i - bpp] if i >= bpp else 0
+            p = a + b - c
+            pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+            line[i] = (line[i] + (a if pa <= pb and pa <= pc else b if pb <= pc else c)) & 0xFF
+    else:
+        raise ValueError(f"Filtro PNG desconocido: {ftype}")
+
+def read_png(path: Path) -> tuple[int, int, array]:
+    """(ancho, alto, píxeles RGBA como array('I') de ancho×alto)."""
+    data = Path(path).read_bytes()
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError(f"{Path(path).name}: no es un PNG (instala Pillow para otros formatos).")
+    pos, idat, palette, trns = 8, [], None, None
+    while pos < len(data):
+        length, tag = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if tag == b"IHDR":
+            w, h, depth, ctype, _, _, interlace = struct.unpack(">IIBBBBB", body)
+        elif tag == b"PLTE":
+            palette = body
+        elif tag == b"tRNS":
+            trns = body
+        elif tag == b"IDAT":
+            idat.append(body)
+        elif tag == b"IEND":
+            break
+    if interlace or depth not in (8, 16) and not (ctype == 3 and depth == 8):
+        raise ValueError(f"{Path(path).name}: PNG no soportado sin Pillow "
+                         f"(profundidad {depth}, entrelazado {interlace}).")
+    channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}[ctype]
+    bpp = channels * depth // 8
+    stride = w * bpp
+    raw = zlib.decompress(b"".join(idat))
+
+    out = bytearray(w * h * 4)
+    prev = bytes(stride)
+    if ctype == 3:
+        alpha = (trns or b"") + b"\xff" * 256
+        lut = [palette[3 * i:3 * i + 3] + alpha[i:i + 1] if 3 * i + 3 <= len(palette) else b"\0\0\0\xff"
+               for i in range(256)]
+    for y in range(h):
+        off = y * (stride + 1)
+        line = bytearray(raw[off + 1:off + 1 + stride])
+        _unfilter(raw[off], line, prev, bpp)
+        prev = bytes(line)
+        if depth == 16:
+            line = line[0::2]  # byte alto de cada muestra
+        o = y * w * 4
+        if ctype == 6:
+            out[o:o + w * 4] = line
+        elif ctype == 2:
+            px = out[o:o + w * 4]
+            px[0::4], px[1::4], px[2::4] = line[0::3], line[1::3], line[2::3]
+            px[3::4] = b"\xff" * w
+            if trns and len(trns) >= 6:
+                key = bytes((trns[1], trns[3], trns[5]))
+                for i in range(w):
+                    if line[3 * i:3 * i + 3] == key:
+                        px[4 * i + 3] = 0
+            out[o:o + w * 4] = px
+        elif ctype in (0, 4):
+            g = line[0::channels]
+            px = out[o:o + w * 4]
+            px[0::4] = px[1::4] = px[2::4] = g
+            px[3::4] = line[1::2] if ctype == 4 else b"\xff" * w
+            out[o:o + w * 4] = px
+        else:
+            out[o:o + w * 4] = b"".join(lut[i] for i in line)
+    return w, h, array("I", bytes(out))
+
+# -------- Diseños escalados -------- #
+def _scale_nearest(w: int, h: int, px: array, tw: int, th: int) -> array:
+    cols = [min(w - 1, (2 * x + 1) * w // (2 * tw)) for x in range(tw)]
+    out = array("I")
+    last_sy, last_row = -1, None
+    for ty in range(th):
+        sy = min(h - 1, (2 * ty + 1) * h // (2 * th))
+        if sy != last_sy:
+            src = px[sy * w:(sy + 1) * w]
+            last_row = array("I", map(src.__getitem__, cols))
+            last_sy = sy
+        out.extend(last_row)
+    return out
+
+def load_design(path: Path, width_px: int, height_px: int, rotated: bool = False) -> list[bytes]:
+    """
+    Filas RGBA del diseño con la huella final `width_px`×`height_px`.
+    Con `rotated` la imagen se gira 90° (antihorario) antes de encajarla.
+    """
+    sw, sh = (height_px, width_px) if rotated else (width_px, height_px)
+    if Image is not None:
+        with Image.open(path) as im:
+            # Orientación EXIF aplicada, como en las medidas de imageinfo
+            im = ImageOps.exif_transpose(im).convert("RGBA").resize((sw, sh), Image.Resampling.LANCZOS)
+            if rotated:
+                im = im.transpose(Image.Transpose.ROTATE_90)
+            data = im.tobytes()
+        stride = width_px * 4
+        return [data[i:i + stride] for i in range(0, len(data), stride)]
+
+    w, h, px = read_png(path)
+    px = _scale_nearest(w, h, px, sw, sh)
+    if rotated:
+        # Columna sw-1-j del escalado = fila j del girado
+        return [px[sw - 1 - j::sw].tobytes() for j in range(sw)]
+    return [px[y * sw:(y + 1) * sw].tobytes() for y in range(sh)]
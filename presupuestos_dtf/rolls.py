@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Catálogo de rollos de varios proveedores (sección "rolls" de config.json).
+
+rank_rolls evalúa un diseño contra todos los perfiles a la vez: las dos
+orientaciones de todos los rollos van en una sola llamada a
+compute_layouts_batch (una columna de anchos, otra de orientaciones). La
+geometría no depende del precio, así que se calcula una vez por ancho
+distinto (y la mezcla óptima también) y cada perfil solo aplica su tarifa a
+esas longitudes. Con decenas de perfiles es menos de un milisegundo.
+
+    "rolls": [
+        {"name": "Norte 57", "supplier": "Film Norte", "width_cm": 57, "price_per_meter": 11},
+        {"name": "FilmPro 60", "supplier": "FilmPro", "width_cm": 60, "price_per_meter": 12.5,
+         "pricing": {"tiers": [{"from_m": 20, "price_per_meter": 10}]}}
+    ]
+
+Un perfil sin "pricing" usa la tarifa general (tramos, arranque y mínimo)
+con su propio precio por metro; con "pricing", la suya. Los recargos por
+cliente son siempre los de la tarifa general.
+"""
+from dataclasses import dataclass, replace
+from .calc import compute_layouts_batch, optimize_mixed_layout
+from .constants import ORIENTATION_MIXED
+from .models import CalcInput, CalcResult, MixedLayoutResult
+from .pricing import FLAT, PricingRules, parse_number, parse_pricing
+
+DEFAULT_ALTERNATIVES = 3
+
+@dataclass(frozen=True)
+class RollProfile:
+    name: str
+    width_cm: float
+    price_per_meter: float
+    supplier: str = ""
+    rules: PricingRules = FLAT
+
+    @property
+    def label(self) -> str:
+        return f"{self.name} ({self.supplier})" if self.supplier and self.supplier not in self.name else self.name
+
+class RollOption:
+    """
+    Un perfil en una orientación (0, 90 u ORIENTATION_MIXED) con el coste de
+    su tarifa. La geometría (a precio 0) se comparte entre los perfiles del
+    mismo ancho; `result` la devuelve con el coste, solo cuando se pide.
+    """
+    __slots__ = ("profile", "orientation_deg", "cost", "geometry")
+
+    def __init__(self, profile: RollProfile, orientation_deg: int, cost: float,
+                 geometry: CalcResult | MixedLayoutResult) -> None:
+        self.profile = profile
+        self.orientation_deg = orientation_deg
+        self.cost = cost
+        self.geometry = geometry
+
+    def __repr__(self) -> str:
+        return f"RollOption({self.profile.label!r}, {self.orientation_deg}, cost={self.cost:.2f})"
+
+    @property
+    def total_height_m(self) -> float:
+        return self.geometry.total_height_m
+
+    @property
+    def result(self) -> CalcResult | MixedLayoutResult:
+        return replace(self.geometry, cost=self.cost)
+
+def parse_rolls(data, general: PricingRules = FLAT) -> tuple[RollProfile, ...]:
+    """Valida la sección "rolls" de config.json. Lanza ValueError con el motivo."""
+    if not data:
+        return ()
+    if not isinstance(data, list):
+        raise ValueError("'rolls' debe ser una lista de rollos.")
+    profiles = []
+    for i, r in enumerate(data, 1):
+        if not isinstance(r, dict):
+            raise ValueError(f"Rollo {i}: debe ser un objeto.")
+        name = str(r.get("name") or "").strip() or f"Rollo {i}"
+        rules = general
+        if r.get("pricing"):
+            try:
+                own = parse_pricing(r["pricing"])
+            except ValueError as e:
+                raise ValueError(f"{name}: {e}")
+            rules = replace(own, markups=general.markups)
+        profiles.append(RollProfile(
+            name=name,
+            width_cm=parse_number(r.get("width_cm"), f"{name}: width_cm", positive=True),
+            price_per_meter=parse_number(r.get("price_per_meter"), f"{name}: price_per_meter", positive=True),
+            supplier=str(r.get("supplier") or "").strip(),
+            rules=rules,
+        ))
+    return tuple(profiles)
+
+def rank_rolls(profiles: tuple[RollProfile, ...] | list[RollProfile], width_cm: float, height_cm: float,
+               copies: int, margin_top_cm: float, margin_right_cm: float,
+               customer: str = "", mixed: bool = True) -> list[RollOption]:
+    """
+    Todas las opciones (perfil × orientación) en las que cabe el diseño, de
+    la más barata a la más cara (a igual coste, la de menos film).
+    """
+    if not profiles:
+        return []
+    # La geometría no depende del precio: una sola vez por ancho distinto
+    widths = sorted({p.width_cm for p in profiles})
+    n = len(widths)
+    col = {w: k for k, w in enumerate(widths)}
+    batch = compute_layouts_batch(
+        widths + widths, 0.0, width_cm, height_cm, margin_top_cm, margin_right_cm,
+        copies, [0] * n + [90] * n,
+    )
+    mixes = {}
+    if mixed:
+        for w in widths:
+            if min(width_cm, height_cm) > w:
+                continue
+            opt = optimize_mixed_layout(CalcInput(w, 0.0, width_cm, height_cm,
+                                                  margin_top_cm, margin_right_cm, copies, 0))
+            # optimize_mixed_layout pone al menos un diseño por fila aunque no quepa
+            if (opt.rows_0 and width_cm > w) or (opt.rows_90 and height_cm > w):
+                continue
+            # Solo interesa si combina orientaciones; si no, es una de las simples
+            if (opt.rows_0 and opt.rows_90) or opt.fill_per_row_0 or opt.fill_per_row_90:
+                mixes[w] = opt
+
+    rows = [batch.row(k) for k in range(2 * n)]
+
+    options = []
+    append = options.append
+    for p in profiles:
+        table = p.rules.table(p.price_per_meter, customer)
+        k = col[p.width_cm]
+        # compute_layout pone al menos un diseño por fila: si no cabe, se descarta
+        if width_cm <= p.width_cm:
+            append(RollOption(p, 0, table.cost(rows[k].total_height_m), rows[k]))
+        if height_cm <= p.width_cm:
+            append(RollOption(p, 90, table.cost(rows[n + k].total_height_m), rows[n + k]))
+        opt = mixes.get(p.width_cm)
+        if opt is not None:
+            append(RollOption(p, ORIENTATION_MIXED, table.cost(opt.total_height_m), opt))
+    options.sort(key=lambda o: (o.cost, o.geometry.total_height_m))
+    return options
+
+def best_per_profile(options: list[RollOption], limit: int = 1 + DEFAULT_ALTERNATIVES) -> list[RollOption]:
+    """La mejor opción de cada perfil, en el orden de rank_rolls: ganador y alternativas."""
+    seen, out = set(), []
+    for o in options:
+        if o.profile not in seen:
+            seen.add(o.profile)
+            out.append(o)
+            if len(out) == limit:
+                break
+    return out
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Planificador de producción: agrupa los pedidos aceptados del día en tiradas
+de rollo para gastar menos film.
+
+Cada presupuesto se calcula como si el pedido se imprimiera solo, así que la
+última fila de cada pedido (copias % diseños por fila) deja hueco. Aquí las
+filas completas de cada pedido se mantienen (las de compute_geometry) y las
+copias sueltas de todos los pedidos de una tirada se colocan juntas en filas
+compartidas (estanterías first-fit por alto decreciente; las copias de un
+pedido pueden repartirse entre varias filas). Una tirada no pasa de la
+longitud de un rollo.
+
+Reparto inicial: pedidos ordenados por el alto de su última fila, en
+tiradas consecutivas. Después, mientras quede tiempo, búsqueda local (girar
+un pedido, pasarlo a una tirada vecina) por bloques de tiradas; los bloques
+son independientes y se reparten entre procesos.
+"""
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable
+from .calc import compute_geometry
+from .models import CalcInput, NestItem, ProductionPlan, RollRun, ScheduledOrder
+
+EPS = 1e-9
+DEFAULT_RUN_LENGTH_M = 100.0
+DEFAULT_TIME_BUDGET_S = 1.0
+_STALL = 20  # intentos sin mejora por pedido antes de dar la búsqueda por terminada
+
+# Por pedido y orientación: (orientación, diseños por fila, filas completas,
+# copias sueltas, ancho de celda con margen, alto de fila)
+_Option = tuple[int, int, int, int, float, float]
+
+def _options(items: list[NestItem], roll: float, mt: float, mr: float) -> tuple[list, list[float]]:
+    """Orientaciones posibles de cada pedido (la mejor por separado primero) y su longitud por separado."""
+    opts, alone = [], []
+    for idx, it in enumerate(items):
+        if it.width_cm <= 0 or it.height_cm <= 0 or it.copies < 1:
+            raise ValueError(f"Pedido {idx + 1}: medidas y copias deben ser positivas.")
+        rows = []
+        for o in (0, 90) if it.rotatable and it.width_cm != it.height_cm else (0,):
+            w, h = (it.width_cm, it.height_cm) if o == 0 else (it.height_cm, it.width_cm)
+            if w > roll + EPS:
+                continue
+            g = compute_geometry(CalcInput(roll, 0.0, it.width_cm, it.height_cm, mt, mr, it.copies, o))
+            d = g.designs_per_row
+            rows.append((g.total_height_cm, (o, d, it.copies // d, it.copies % d, w + mr, h)))
+        if not rows:
+            raise ValueError(f"Pedido {idx + 1} ({it.width_cm:g}×{it.height_cm:g} cm) no cabe en el ancho del rollo.")
+        rows.sort(key=lambda r: r[0])
+        alone.append(rows[0][0])
+        opts.append(tuple(opt for _, opt in rows))
+    return opts, alone
+
+def _pack(members: list[int], choice: dict, opts: dict, strip: float, mt: float,
+          detail: bool = False) -> tuple[float, list, int]:
+    """Longitud (cm) de una tirada, sus filas compartidas [alto, libre, contenido] y sus filas completas."""
+    if not members:
+        return 0.0, [], 0
+    full_h = 0.0
+    rows = 0
+    pieces = []
+    for i in members:
+        _, d, full, tail, cell, h = opts[i][choice[i]]
+        full_h += full * h
+        rows += full
+        if tail:
+            pieces.append((h, cell, d, tail, i))
+    pieces.sort(reverse=True)  # más altas primero: las bajas aprovechan el hueco de las altas
+    shelves = []
+    for h, cell, d, n, i in pieces:
+        for s in shelves:
+            if s[1] + EPS >= cell:
+                k = min(n, int((s[1] + EPS) / cell))
+                s[1] -= k * cell
+                n -= k
+                if detail:
+                    s[2].append((i, k))
+                if not n:
+                    break
+        # Lo que no cabe abre una fila propia (nunca más de una: n < d)
+        while n:
+            k = min(n, d)
+            n -= k
+            shelves.append([h, strip - k * cell, [(i, k)] if detail else None])
+    length = full_h + sum(s[0] for s in shelves) + mt * (rows + len(shelves) - 1)
+    return length, shelves, rows
+
+def _initial_runs(opts: list, alone: list[float], mt: float, cap_cm: float) -> list[list[int]]:
+    """Pedidos por alto de su última fila, en tiradas de hasta cap_cm (cota: todo por separado)."""
+    def tail_height(i: int) -> float:
+        o = opts[i][0]
+        return o[5] if o[3] else 0.0
+
+    runs, current, used = [], [], 0.0
+    for i in sorted(range(len(opts)), key=tail_height, reverse=True):
+        need = alone[i] + mt
+        if current and used + need > cap_cm + EPS:
+            runs.append(current)
+            current, used = [], 0.0
+        current.append(i)
+        used += need
+    if current:
+        runs.append(current)
+    return runs
+
+def _improve(args: tuple) -> tuple[list[list[int]], dict]:
+    """
+    Búsqueda local sobre un bloque de tiradas (se ejecuta en un proceso del
+    pool): girar un pedido o pasarlo a una tirada cercana. Solo se aceptan
+    cambios que no alargan el total ni pasan de cap_cm.
+    """
+    runs, opts, choice, strip, mt, cap_cm, budget_s, seed = args
+    deadline = time.perf_counter() + budget_s
+    rnd = random.Random(seed)
+    lengths = [_pack(r, choice, opts, strip, mt)[0] for r in runs]
+    where = {i: k for k, r in enumerate(runs) for i in r}
+    flippable = [i for i in where if len(opts[i]) > 1]
+    n_runs = len(runs)
+    stall, limit = 0, _STALL * len(where)
+
+    while stall < limit and time.perf_counter() < deadline:
+        stall += 1
+        if flippable and (n_runs == 1 or rnd.random() < 0.5):
+            i = rnd.choice(flippable)
+            k = where[i]
+            old = choice[i]
+            choice[i] = 1 - old
+            new = _pack(runs[k], choice, opts, strip, mt)[0]
+            if new <= lengths[k] + EPS:
+                if new < lengths[k] - EPS:
+                    stall = 0
+                lengths[k] = new
+            else:
+                choice[i] = old
+        elif n_runs > 1:
+            # Tiradas cercanas: pedidos con últimas filas de alto parecido
+            a = rnd.randrange(n_runs)
+            b = min(n_runs - 1, max(0, a + rnd.choice((-2, -1, 1, 2))))
+            if a == b or not runs[a]:
+                continue
+            i = rnd.choice(runs[a])
+            runs[a].remove(i)
+            runs[b].append(i)
+            new_a = _pack(runs[a], choice, opts, strip, mt)[0]
+            new_b = _pack(runs[b], choice, opts, strip, mt)[0]
+            if new_b <= cap_cm + EPS and new_a + new_b <= lengths[a] + lengths[b] + EPS:
+                if new_a + new_b < lengths[a] + lengths[b] - EPS:
+                    stall = 0
+                lengths[a], lengths[b] = new_a, new_b
+                where[i] = b
+            else:
+                runs[b].pop()
+                runs[a].append(i)
+        else:
+            break
+    return runs, choice
+
+def _blocks(runs: list[list[int]], n: int) -> list[list[list[int]]]:
+    """n bloques de tiradas consecutivas (vecinas en alto de última fila)."""
+    n = max(1, min(n, len(runs)))
+    size = -(-len(runs) // n)
+    return [runs[k:k + size] for k in range(0, len(runs), size)]
+
+def schedule_orders(
+    items: Iterable[NestItem],
+    roll_width_cm: float,
+    margin_top_cm: float,
+    margin_right_cm: float,
+    run_length_m: float = DEFAULT_RUN_LENGTH_M,
+    time_budget_s: float = DEFAULT_TIME_BUDGET_S,
+    jobs: int = 1,
+    seed: int = 0,
+) -> ProductionPlan:
+    """
+    Plan de tiradas para los pedidos del día (un NestItem por pedido). Nunca
+    gasta más que la suma de los pedidos presupuestados por separado (salvo
+    el margen superior entre pedidos); el presupuesto de tiempo es por bloque
+    y con jobs > 1 los bloques se mejoran en paralelo.
+    """
+    items = list(items)
+    if not items:
+        raise ValueError("No hay pedidos que planificar.")
+    strip = roll_width_cm + margin_right_cm
+    cap_cm = run_length_m * 100.0
+    opts, alone = _options(items, roll_width_cm, margin_top_cm, margin_right_cm)
+    runs = _initial_runs(opts, alone, margin_top_cm, cap_cm)
+
+    tasks = []
+    for k, block in enumerate(_blocks(runs, jobs)):
+        members = [i for r in block for i in r]
+        tasks.append((block, {i: opts[i] for i in members}, {i: 0 for i in members},
+                      strip, margin_top_cm, cap_cm, max(time_budget_s, 0.0), seed + k))
+    if jobs <= 1 or len(tasks) == 1:
+        results = [_improve(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_improve, tasks))
+
+    all_opts = dict(enumerate(opts))
+    plan_runs = []
+    for block, choice in results:
+        for members in block:
+            if not members:
+                continue
+            length, shelves, rows = _pack(members, choice, all_opts, strip, margin_top_cm, detail=True)
+            orders = []
+            for i in members:
+                o, d, full, tail, _, _ = opts[i][choice[i]]
+                orders.append(ScheduledOrder(i, o, d, full, tail))
+            plan_runs.append(RollRun(
+                orders=tuple(orders),
+                shared_rows=tuple(tuple(s[2]) for s in shelves),
+                rows_needed=rows + len(shelves),
+                total_height_cm=length,
+                total_height_m=length / 100.0,
+                separate_height_m=sum(alone[i] for i in members) / 100.0,
+            ))
+    return ProductionPlan(
+        runs=tuple(plan_runs),
+        roll_width_cm=roll_width_cm,
+        total_height_m=sum(r.total_height_m for r in plan_runs),
+        separate_height_m=sum(alone) / 100.0,
+    )
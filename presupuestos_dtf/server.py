@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Servicio HTTP/JSON local (asyncio, solo biblioteca estándar).
+
+    python -m presupuestos_dtf serve --port 8765
+
+Endpoints:
+    GET  /health        -> {"status": "ok", "version": ...}
+    POST /quote         -> un pedido (mismos campos que el comando quote)
+    POST /quote/batch   -> {"items": [...]} o una lista -> {"quotes": [...]}
+
+Las conexiones son keep-alive (HTTP/1.1). Los valores por defecto salen de
+config.json y se releen cuando el fichero cambia. Las peticiones con cuerpo
+grande (lotes de unos cientos de pedidos en adelante) se calculan en un pool
+de hilos, así que un lote de 10.000 no deja esperando al resto de conexiones.
+"""
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from . import __version__
+from .cli import quote_row
+from .config import get_config_path, load_config
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 8 * 1024 * 1024
+MAX_BATCH = 10_000
+IDLE_TIMEOUT_S = 30.0
+OFFLOAD_BODY_BYTES = 16 * 1024  # ~300 pedidos: a partir de aquí, fuera del bucle de eventos
+OFFLOAD_WORKERS = 2
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+class _Defaults:
+    """load_config() cacheado según la fecha de modificación de config.json."""
+    def __init__(self) -> None:
+        self._path = get_config_path()
+        self._mtime = None
+        self._values = load_config()
+
+    def get(self) -> dict:
+        try:
+            mtime = os.stat(self._path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self._mtime:
+            self._mtime = mtime
+            self._values = load_config()
+        return self._values
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+def _lower_keys(row) -> dict:
+    if not isinstance(row, dict):
+        raise HttpError(400, "Cada pedido debe ser un objeto JSON.")
+    return {str(k).strip().lower(): v for k, v in row.items()}
+
+class QuoteServer:
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        self.host = host
+        self.port = port
+        self.defaults = _Defaults()
+        self._server: asyncio.AbstractServer | None = None
+        self._pool = ThreadPoolExecutor(max_workers=OFFLOAD_WORKERS, thread_name_prefix="quote")
+
+    # -------- Rutas -------- #
+    def handle(self, method: str, path: str, body: bytes) -> tuple[int, object]:
+        path = path.split("?", 1)[0].rstrip("/") or "/"
+        if path == "/health":
+            if method != "GET":
+                raise HttpError(405, "Usa GET.")
+            return 200, {"status": "ok", "version": __version__}
+        if path not in ("/quote", "/quote/batch"):
+            raise HttpError(404, "Ruta no encontrada.")
+        if method != "POST":
+            raise HttpError(405, "Usa POST.")
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError:
+            raise HttpError(400, "JSON no válido.")
+
+        defaults = self.defaults.get()
+        if path == "/quote":
+            return 200, quote_row(_lower_keys(payload), defaults, 0)
+
+        items = payload.get("items") if isinstance(payload, dict) else payload
+        if not isinstance(items, list):
+            raise HttpError(400, "Se esperaba una lista de pedidos en 'items'.")
+        if len(items) > MAX_BATCH:
+            raise HttpError(413, f"Máximo {MAX_BATCH} pedidos por lote.")
+        return 200, {"quotes": [quote_row(_lower_keys(r), defaults, i) for i, r in enumerate(items)]}
+
+    # -------- HTTP -------- #
+    async def _read_request(self, reader: asyncio.StreamReader):
+        line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT_S)
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HttpError(400, "Línea de petición no válida.")
+        headers = {}
+        while True:
+            h = await reader.readline()
+            if h in (b"\r\n", b"\n", b""):
+                break
+            k, _, v = h.decode("latin-1").partition(":")
+            headers[k.strip().lower()] = v.strip()
+        raw_length = headers.get("content-length", "0")  # presente pero vacío: no válido
+        if not (raw_length.isascii() and raw_length.isdigit()):
+            raise HttpError(400, "Content-Length no válido.")
+        length = int(raw_length)
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, "Cuerpo demasiado grande.")
+        body = await reader.readexactly(length) if length else b""
+        conn = headers.get("connection", "").lower()
+        keep_alive = conn != "close" if version == "HTTP/1.1" else conn == "keep-alive"
+        return method.upper(), target, body, keep_alive
+
+    @staticmethod
+    def _response(status: int, payload: object, keep_alive: bool) -> bytes:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        return head.encode("latin-1") + body
+
+    def _respond(self, method: str, target: str, body: bytes, keep_alive: bool) -> bytes:
+        """handle() y la respuesta ya serializada: lo que va al pool con cuerpos grandes."""
+        try:
+            status, payload = self.handle(method, target, body)
+        except HttpError as e:
+            status, payload = e.status, {"error": str(e)}
+        return self._response(status, payload, keep_alive)
+
+    async def _on_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    req = await self._read_request(reader)
+                    if req is None:
+                        break
+                    method, target, body, keep_alive = req
+                    if len(body) > OFFLOAD_BODY_BYTES:
+                        # Parseo, cálculo y json.dumps de 10.000 pedidos son decenas de ms cada uno
+                        loop = asyncio.get_running_loop()
+                        response = await loop.run_in_executor(
+                            self._pool, self._respond, method, target, body, keep_alive)
+                    else:
+                        response = self._respond(method, target, body, keep_alive)
+                except HttpError as e:
+                    response = self._response(e.status, {"error": str(e)}, keep_alive)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    response = self._response(500, {"error": str(e)}, keep_alive)
+                writer.write(response)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._on_client, self.host, self.port)
+        # Con port=0 el sistema asigna uno libre
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        print(f"Servicio de presupuestos en http://{self.host}:{self.port}", flush=True)
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+    try:
+        asyncio.run(QuoteServer(host, port).serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Perfil de arranque (--startup-profile): tiempos de import y de primer pintado.
+
+Para el detalle módulo a módulo: python -X importtime main.py
+"""
+import sys
+import time
+
+# Referencia: primer import de este módulo (main.py lo importa antes que nada)
+_T0 = time.perf_counter()
+
+class StartupProfile:
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.marks: list[tuple[str, float, float]] = []  # (fase, duración, acumulado) en s
+        self._last = _T0
+
+    def mark(self, label: str) -> None:
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.marks.append((label, now - self._last, now - _T0))
+        self._last = now
+
+    def report(self) -> str:
+        lines = ["[Startup] fase                          ms     acumulado"]
+        for label, dt, total in self.marks:
+            lines.append(f"[Startup] {label:<26} {dt * 1e3:9.1f}  {total * 1e3:9.1f}")
+        loaded = [m for m in ("requests", "zipfile", "subprocess") if m in sys.modules]
+        lines.append(f"[Startup] módulos cargados: {len(sys.modules)}; "
+                     f"red/actualización: {', '.join(loaded) or 'ninguno'}")
+        return "\n".join(lines)
+
+    def dump(self) -> None:
+        if not self.enabled:
+            return
+        text = self.report()
+        # En el build --noconsole no hay stderr: se deja junto a config.json
+        if sys.stderr is not None:
+            print(text, file=sys.stderr, flush=True)
+            return
+        try:
+            from .config import get_config_dir
+            d = get_config_dir()
+            d.mkdir(parents=True, exist_ok=True)
+            (d / "startup_profile.txt").write_text(text + "\n", encoding="utf-8")
+        except Exception:
+            pass
@@ -1,88 +1,56 @@
 # -*- coding: utf-8 -*-
+import time
 import tkinter as tk
+from dataclasses import asdict, replace
+from pathlib import Path
 from tkinter import ttk, messagebox
-from .constants import MIN_VAL, APP_TITLE, WINDOW_SIZE
+from .constants import MIN_VAL, APP_TITLE, WINDOW_SIZE, RECALC_DEBOUNCE_MS, INSTANCE_POLL_MS, ORIENTATION_MIXED
 from . import __version__
-from .config import load_config, save_config
-from .models import CalcInput
-from .calc import compute_layout
-
-# Tamaños predefinidos (cm): nombre -> (ancho, alto)
-PRESET_SIZES = {
-    "Personalizado": None,  # No cambia nada
-
-    " --- Etiquetas / Branding --- ": None,
-    "Etiqueta cuello 4×4 (cuadrado)": (4.0, 4.0),
-    "Etiqueta interior 6×6 (cuadrado)": (6.0, 6.0),
-    "Etiqueta interior 8×4": (8.0, 4.0),
-
-    " --- Logos pequeños --- ": None,
-    "Logo mini 6×6 (cuadrado)": (6.0, 6.0),
-    "Logo pecho 8×8 (cuadrado)": (8.0, 8.0),
-    "Logo pecho 10×10 (cuadrado)": (10.0, 10.0),
-    "Logo pecho 12×12 (cuadrado)": (12.0, 12.0),
-    "Logo rectangular 8×12": (8.0, 12.0),
-    "Logo rectangular 10×15": (10.0, 15.0),
-
-    " --- Mangas --- ": None,
-    "Manga corta 8×12": (8.0, 12.0),
-    "Manga corta 10×15": (10.0, 15.0),
-    "Manga larga 8×30": (8.0, 30.0),
-    "Manga larga 10×35": (10.0, 35.0),
-
-    " --- Frontales --- ": None,
-    "Frontal pequeño 20×20 (cuadrado)": (20.0, 20.0),
-    "Frontal pequeño 20×25": (20.0, 25.0),
-    "Frontal medio 25×25 (cuadrado)": (25.0, 25.0),
-    "Frontal medio 25×35": (25.0, 35.0),
-    "Frontal grande 30×30 (cuadrado)": (30.0, 30.0),
-    "Frontal grande 30×40": (30.0, 40.0),
-
-    " --- Espalda --- ": None,
-    "Espalda estándar 30×30 (cuadrado)": (30.0, 30.0),
-    "Espalda estándar 30×35": (30.0, 35.0),
-    "Espalda grande 35×35 (cuadrado)": (35.0, 35.0),
-    "Espalda grande 35×40": (35.0, 40.0),
-
-    " --- Oversized --- ": None,
-    "Oversized pecho 38×45": (38.0, 45.0),
-    "Oversized espalda 40×50": (40.0, 50.0),
-    "Oversized 40×40 (cuadrado)": (40.0, 40.0),
-    "Oversized 45×45 (cuadrado)": (45.0, 45.0),
-
-    " --- Pantalones --- ": None,
-    "Pierna lateral 10×30": (10.0, 30.0),
-    "Pierna grande 12×50": (12.0, 50.0),
-    "Muslo/Short 15×15 (cuadrado)": (15.0, 15.0),
-
-    " --- Gorras --- ": None,
-    "Gorra frontal 10×5": (10.0, 5.0),
-    "Gorra frontal 6×6 (cuadrado)": (6.0, 6.0),
-
-    " --- Bolsas / Mochilas --- ": None,
-    "Bolsa tote 25×25 (cuadrado)": (25.0, 25.0),
-    "Bolsa shopper 30×35": (30.0, 35.0),
-    "Mochila saco 20×25": (20.0, 25.0),
-
-    " --- Parches / Apliques --- ": None,
-    "Parche pequeño 8×8 (cuadrado)": (8.0, 8.0),
-    "Parche mediano 12×12 (cuadrado)": (12.0, 12.0),
-    "Parche grande 20×20 (cuadrado)": (20.0, 20.0),
-
-    " --- Infantil --- ": None,
-    "Body bebé 8×8 (cuadrado)": (8.0, 8.0),
-    "Camiseta niño 15×15 (cuadrado)": (15.0, 15.0),
-    "Camiseta niño 20×20 (cuadrado)": (20.0, 20.0),
-
-    " --- Textiles grandes --- ": None,
-    "Toalla mano 30×50": (30.0, 50.0),
-    "Toalla baño 50×70": (50.0, 70.0),    
-    "Funda cojín 40×40 (cuadrado)": (40.0, 40.0),
-    "Funda cojín 50×50 (cuadrado)": (50.0, 50.0),
-}
+from .config import get_config_dir, load_config, save_config
+from .models import CalcInput, NestItem
+from .calc import optimize_mixed_layout
+from .cache import layout_cache
+from .nesting import nest_items
+from .history import HistoryStore, QuoteRecord, COUNT_LIMIT, HISTORY_FILENAME, PAGE_SIZE
+from .jobs import JobScheduler
+from .metrics import metrics, timer
+from .presets import CUSTOM_PRESET, Preset, builtin_presets, get_catalog
+from .pricing import PriceTable
+from .rolls import best_per_profile, rank_rolls
 
+PRESET_LIST_LIMIT = 200      # entradas del desplegable de tamaños
+PRESET_FILTER_MS = 80        # espera tras la última tecla antes de filtrar
 
 
+class UpdateProgressDialog:
+    """Ventana con barra de progreso; sondea el estado de la descarga cada 100 ms."""
+    POLL_MS = 100
+
+    def __init__(self, root: tk.Misc, state) -> None:
+        self.state = state
+        self.win = tk.Toplevel(root)
+        self.win.title("Descargando actualización")
+        self.win.resizable(False, False)
+        self.win.transient(root)
+        self.win.protocol("WM_DELETE_WINDOW", lambda: None)  # no se cierra a mano
+        self.text = tk.StringVar(value="Conectando…")
+        ttk.Label(self.win, textvariable=self.text).pack(anchor=tk.W, padx=12, pady=(12, 6))
+        self.bar = ttk.Progressbar(self.win, length=320, mode="determinate", maximum=1000)
+        self.bar.pack(padx=12, pady=(0, 12))
+        self._poll()
+
+    def _poll(self) -> None:
+        st = self.state
+        if st.finished:
+            self.win.destroy()
+            return
+        if st.total:
+            self.bar["value"] = 1000 * st.done / st.total
+            self.text.set(f"{st.done / 1e6:.1f} / {st.total / 1e6:.1f} MB")
+        elif st.done:
+            self.text.set(f"{st.done / 1e6:.1f} MB")
+        self.win.after(self.POLL_MS, self._poll)
+
 
 class PresupuestoApp:
     def __init__(self, root: tk.Tk) -> None:
@@ -98,32 +66,101 @@ class PresupuestoApp:
         self.price_per_meter = tk.DoubleVar(value=cfg["price_per_meter"])
         self.margin_top_cm = tk.DoubleVar(value=cfg["margin_top_cm"])
         self.margin_right_cm = tk.DoubleVar(value=cfg["margin_right_cm"])
+        # Tarifa (tramos, arranque, mínimo, recargos); solo se edita en config.json
+        self._pricing = cfg["pricing"]
+        self.pricing_info = tk.StringVar(
+            value=f"Tarifa de config.json no válida ({cfg['pricing_error']}); se usa la plana."
+            if cfg["pricing_error"] else f"Tarifa: {self._pricing.describe()}")
+        # Catálogo de rollos de proveedores (config.json: rolls); vacío = sin panel
+        self._rolls = cfg["rolls"]
+        if cfg["rolls_error"]:
+            self.pricing_info.set(f"{self.pricing_info.get()} Catálogo de rollos no válido ({cfg['rolls_error']}).")
+        elif self._rolls:
+            self.pricing_info.set(f"{self.pricing_info.get()} Catálogo de rollos: {len(self._rolls)} perfiles.")
+        self.rolls_lines = [tk.StringVar(), tk.StringVar()]
 
         # Entradas cálculo
         self.image_width_cm = tk.DoubleVar(value=1)
         self.image_height_cm = tk.DoubleVar(value=1)
         self.num_copies = tk.IntVar(value=1)
-        self.size_preset = tk.StringVar(value="Personalizado")
+        self.size_preset = tk.StringVar(value=CUSTOM_PRESET)
+        self._catalog = None        # PresetCatalog, cargado en segundo plano
+        self._shown_presets: dict[str, Preset] = {}
+        self._preset_after_id = None
+        self.customer = tk.StringVar()
+
+        # Pedido multi-diseño (gang sheet)
+        self.order_items: list[NestItem] = []
+        self.order_rotatable = tk.BooleanVar(value=True)
+        self.order_summary = tk.StringVar(value="Pedido: 0 diseños")
+
+        # Recalculo en vivo (con debounce) al editar las entradas
+        self.calc_status = tk.StringVar()
+        self._recalc_after_id = None
+        self._visible_panel = None
+
+        # Últimos resultados, para la vista previa
+        self._last_single = None   # (CalcInput a 0°, [res 0°, res 90°], óptimo)
+        self._last_nest = None
+        self._rolls_key = None     # entradas de la última ordenación del catálogo de rollos
+        self._single_table = None  # PriceTable con la que se muestran los resultados
+        self._nest_table = None
+        self._last_nest_items: list[NestItem] = []
+        self._export_job = None    # Job de la exportación en curso
+        self._instance = None      # instance.InstanceServer (arranques posteriores)
+
+        # Cálculos pesados fuera del hilo de Tk; los resultados vuelven con root.after
+        self.jobs = JobScheduler(root)
+        self._preview = None
+        self._preview_key = None
+        self._results_seq = 0      # cambia con cada resultado nuevo
+        self.preview_mode = tk.StringVar(value="optimo")
 
         # Notebook
         self.notebook = ttk.Notebook(root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
+        # La pestaña de configuración se rellena tras el primer pintado
+        # (build_deferred) o al seleccionarla, lo que ocurra antes.
+        self.cache_info = tk.StringVar()
         self.calc_tab = self._build_calc_tab(self.notebook)
-        self.config_tab = self._build_config_tab(self.notebook)
+        self.preview_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.preview_tab, text="Vista previa")
+        self.config_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.config_tab, text="Configuración")
+        self._config_tab_built = False
+        self.history_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.history_tab, text="Historial")
+        self._history_tab_built = False
+        self._history: HistoryStore | None = None
         self.notebook.select(self.calc_tab)
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+
+        for var in (self.image_width_cm, self.image_height_cm, self.num_copies,
+                    self.roll_width_cm, self.price_per_meter, self.margin_top_cm, self.margin_right_cm,
+                    self.customer):
+            var.trace_add("write", self._schedule_recalc)
+        self._recalc_live()
 
         # Atajos
         self.root.bind("<Return>", self._on_return)
         self.root.bind("<KP_Enter>", self._on_return)
+        # Diagnóstico: volcar métricas / perfilar el siguiente cálculo
+        self.root.bind("<Control-Shift-M>", self._dump_metrics)
+        self.root.bind("<Control-Shift-P>", self._arm_profile)
 
         # Guardar al cerrar
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
     # -------- Tabs -------- #
-    def _build_config_tab(self, notebook: ttk.Notebook) -> ttk.Frame:
-        frame = ttk.Frame(notebook)
-        notebook.add(frame, text="Configuración")
+    def build_deferred(self) -> None:
+        """Construye lo que no hace falta para el primer pintado."""
+        if not self._config_tab_built:
+            self._config_tab_built = True
+            self._build_config_tab(self.config_tab)
+            self._load_presets()
+
+    def _build_config_tab(self, frame: ttk.Frame) -> ttk.Frame:
 
         ttk.Label(frame, text="Ancho máximo del rollo (cm):").grid(row=0, column=0, sticky=tk.W, padx=6, pady=8)
         ttk.Entry(frame, textvariable=self.roll_width_cm, width=12).grid(row=0, column=1, padx=6, pady=8)
@@ -142,6 +179,12 @@ class PresupuestoApp:
 
         ttk.Button(frame, text="Guardar configuración", command=self._save_current_config)\
             .grid(row=5, column=1, sticky=tk.E, padx=6, pady=12)
+
+        ttk.Label(frame, textvariable=self.pricing_info, wraplength=480)\
+            .grid(row=6, column=0, columnspan=2, sticky=tk.W, padx=6, pady=6)
+
+        ttk.Label(frame, textvariable=self.cache_info, foreground="gray")\
+            .grid(row=7, column=0, columnspan=2, sticky=tk.W, padx=6, pady=6)
         return frame
 
     def _build_calc_tab(self, notebook: ttk.Notebook) -> ttk.Frame:
@@ -151,17 +194,24 @@ class PresupuestoApp:
         input_box = ttk.LabelFrame(frame, text="Datos del diseño")
         input_box.pack(side=tk.TOP, fill=tk.X, padx=6, pady=6)
 
-        # --- Nueva fila 0: preset de tamaños ---
+        # --- Nueva fila 0: preset de tamaños (escribir filtra el catálogo) ---
         ttk.Label(input_box, text="Tamaño predefinido:").grid(row=0, column=0, sticky=tk.W, padx=6, pady=6)
         cmb = ttk.Combobox(
             input_box,
             textvariable=self.size_preset,
-            values=list(PRESET_SIZES.keys()),
-            state="readonly",
-            width=35
+            width=35,
+            postcommand=self._on_preset_dropdown,
         )
         cmb.grid(row=0, column=1, padx=6, pady=6)
         cmb.bind("<<ComboboxSelected>>", self._on_preset_changed)
+        cmb.bind("<KeyRelease>", self._on_preset_typed)
+        cmb.bind("<Return>", self._on_preset_return)
+        cmb.bind("<KP_Enter>", self._on_preset_return)
+        self.preset_combo = cmb
+        self._show_presets(builtin_presets(), False)
+
+        ttk.Label(input_box, text="Cliente:").grid(row=0, column=2, sticky=tk.W, padx=6, pady=6)
+        ttk.Entry(input_box, textvariable=self.customer, width=18).grid(row=0, column=3, padx=6, pady=6)
 
         # --- Campos de ancho/alto pasan a fila 1 ---
         ttk.Label(input_box, text="Ancho imagen (cm):").grid(row=1, column=0, sticky=tk.W, padx=6, pady=6)
@@ -177,25 +227,181 @@ class PresupuestoApp:
         ttk.Button(input_box, text="Calcular", command=self.on_calcular)\
             .grid(row=2, column=3, padx=6, pady=6, sticky=tk.E)
 
+        # --- Fila 3: pedido multi-diseño ---
+        order_box = ttk.Frame(input_box)
+        order_box.grid(row=3, column=0, columnspan=4, sticky=tk.W, padx=6, pady=6)
+        ttk.Button(order_box, text="Añadir al pedido", command=self._add_to_order).pack(side=tk.LEFT)
+        self.import_button = ttk.Button(order_box, text="Importar imágenes…", command=self._on_import)
+        self.import_button.pack(side=tk.LEFT, padx=(6, 0))
+        ttk.Checkbutton(order_box, text="Permitir giro", variable=self.order_rotatable).pack(side=tk.LEFT, padx=6)
+        ttk.Label(order_box, textvariable=self.order_summary).pack(side=tk.LEFT, padx=6)
+        ttk.Button(order_box, text="Vaciar", command=self._clear_order).pack(side=tk.LEFT, padx=6)
+        ttk.Button(order_box, text="Calcular pedido", command=self.on_calcular_pedido).pack(side=tk.LEFT)
+
+        ttk.Label(frame, textvariable=self.calc_status, foreground="gray")\
+            .pack(side=tk.BOTTOM, anchor=tk.W, padx=12, pady=(0, 6))
+
+        # Mejor rollo del catálogo para el diseño actual (encima del estado)
+        if self._rolls:
+            rolls_box = ttk.LabelFrame(frame, text="Rollos del catálogo")
+            rolls_box.pack(side=tk.BOTTOM, fill=tk.X, padx=12, pady=(0, 6))
+            for var in self.rolls_lines:
+                ttk.Label(rolls_box, textvariable=var).pack(anchor=tk.W, padx=6, pady=1)
+
         self.result_frame = ttk.Frame(frame)
         self.result_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=6, pady=6)
+        self._build_result_panels(self.result_frame)
         return frame
 
+    def _build_result_panels(self, parent: ttk.Frame) -> None:
+        """Paneles de resultados: se crean una vez y se actualizan vía StringVar."""
+        def column(container, title: str, n_lines: int) -> list[tk.StringVar]:
+            frm = ttk.LabelFrame(container, text=title)
+            frm.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=6, pady=6)
+            lines = [tk.StringVar() for _ in range(n_lines)]
+            for var in lines:
+                ttk.Label(frm, textvariable=var).pack(anchor=tk.W, padx=6, pady=3)
+            return lines
+
+        self.single_panel = ttk.Frame(parent)
+        self.result_lines = [
+            column(self.single_panel, "Rotación 0° (vertical)", 6),
+            column(self.single_panel, "Rotación 90° (horizontal)", 6),
+        ]
+        self.optimum_lines = column(self.single_panel, "Óptimo (0° + 90°)", 7)
+
+        self.order_panel = ttk.Frame(parent)
+        self.order_lines = column(self.order_panel, "Pedido multi-diseño (gang sheet)", 6)
+        self._show_panel(self.single_panel)
+
+    def _show_panel(self, panel: ttk.Frame) -> None:
+        if self._visible_panel is panel:
+            return
+        if self._visible_panel is not None:
+            self._visible_panel.pack_forget()
+        panel.pack(fill=tk.BOTH, expand=True)
+        self._visible_panel = panel
+
+    @staticmethod
+    def _set_lines(lines: list[tk.StringVar], texts: list[str]) -> None:
+        for var, text in zip(lines, texts):
+            if var.get() != text:
+                var.set(text)
+
+    # -------- Tamaños predefinidos -------- #
+    def _show_presets(self, presets: list[Preset], more: bool) -> None:
+        """Carga el desplegable (con cabeceras de grupo, que no hacen nada al elegirlas)."""
+        values, group = [CUSTOM_PRESET], None
+        for p in presets:
+            if p.group != group:
+                group = p.group
+                if group:
+                    values.append(f" --- {group} --- ")
+            values.append(p.name)
+        if more:
+            values.append(f" … hay más: sigue escribiendo ({PRESET_LIST_LIMIT} como máximo) ")
+        self._shown_presets = {p.name: p for p in presets}
+        self.preset_combo.configure(values=values)
+
+    def _load_presets(self) -> None:
+        """Lee el catálogo en segundo plano para que el primer filtrado sea inmediato."""
+        self.jobs.submit("presets", get_catalog, on_done=self._on_catalog_loaded)
+
+    def _on_catalog_loaded(self, catalog) -> None:
+        self._catalog = catalog
+        if catalog.error:
+            self.calc_status.set(f"Catálogo de tamaños: {catalog.error}")
+        elif catalog.skipped:
+            self.calc_status.set(f"Catálogo de tamaños: {catalog.skipped} filas sin nombre o medidas válidas")
+        if self.size_preset.get() in (CUSTOM_PRESET, ""):
+            self._show_presets(*catalog.search("", PRESET_LIST_LIMIT))
+
+    def _on_preset_typed(self, event=None) -> None:
+        if event is not None and event.keysym in ("Return", "KP_Enter", "Up", "Down", "Escape", "Tab"):
+            return
+        if self._preset_after_id is not None:
+            self.root.after_cancel(self._preset_after_id)
+        self._preset_after_id = self.root.after(PRESET_FILTER_MS, self._filter_presets)
+
+    def _filter_presets(self) -> None:
+        self._preset_after_id = None
+        text = self.size_preset.get()
+        query = "" if text == CUSTOM_PRESET or text in self._shown_presets else text
+
+        def work():
+            # Sin catálogo aún, lo carga aquí; las búsquedas viejas se descartan
+            catalog = get_catalog()
+            return catalog, catalog.search(query, PRESET_LIST_LIMIT)
+
+        def done(r):
+            self._catalog, (presets, more) = r
+            self._show_presets(presets, more)
+            if not query:
+                self.calc_status.set("")
+            elif not presets:
+                self.calc_status.set(f"Ningún tamaño coincide con «{query}»")
+            else:
+                self.calc_status.set(f"{len(presets)}{'+' if more else ''} tamaños coinciden: "
+                                     "despliega la lista o pulsa Enter para el primero")
+
+        self.jobs.submit("presets", work, on_done=done)
+
+    def _on_preset_dropdown(self) -> None:
+        # Con un tamaño ya elegido, el desplegable muestra el catálogo completo
+        if self.size_preset.get() in self._shown_presets and self._catalog is not None:
+            self._show_presets(*self._catalog.search("", PRESET_LIST_LIMIT))
+
+    def _on_preset_return(self, event=None):
+        """Enter en el combo: aplica el preset escrito o la primera coincidencia."""
+        text = self.size_preset.get()
+        preset = self._preset_named(text)
+        if preset is None and text.strip() and text != CUSTOM_PRESET:
+            if self._catalog is not None:
+                found, _ = self._catalog.search(text, 1)
+            else:  # catálogo aún cargando: lo que muestra la lista
+                found = list(self._shown_presets.values())[:1]
+            preset = found[0] if found else None
+        if preset is not None:
+            self.size_preset.set(preset.name)
+            self._on_preset_changed()
+            self.calc_status.set("")
+        return "break"   # no dispara el Enter global (Calcular)
+
+    def _preset_named(self, name: str) -> Preset | None:
+        preset = self._shown_presets.get(name)
+        if preset is None and self._catalog is not None:
+            preset = self._catalog.get(name)
+        return preset
+
     def _on_preset_changed(self, event=None):
-        name = self.size_preset.get()
-        pair = PRESET_SIZES.get(name)
-        if pair:
-            w, h = pair
-            self.image_width_cm.set(float(w))
-            self.image_height_cm.set(float(h))
+        preset = self._preset_named(self.size_preset.get())
+        if preset is not None:
+            self.image_width_cm.set(preset.width_cm)
+            self.image_height_cm.set(preset.height_cm)
 
 
+    def _on_tab_changed(self, event=None):
+        if self.notebook.select() == str(self.preview_tab):
+            self._build_preview_tab()
+            self._refresh_preview()
+        elif self.notebook.select() == str(self.history_tab):
+            self._build_history_tab()
+            self._history_load()
+        elif self.notebook.select() == str(self.config_tab):
+            self.build_deferred()
+            st = layout_cache.stats()
+            self.cache_info.set(
+                f"Caché de cálculos: {st.size}/{st.maxsize} entradas, "
+                f"{st.hits} aciertos, {st.misses} fallos ({st.hit_rate:.0%}), "
+                f"{st.evictions} expulsiones"
+            )
+
     # -------- Atajos -------- #
     def _on_return(self, event=None):
         current_idx = self.notebook.index(self.notebook.select())
         if current_idx == self.notebook.index(self.calc_tab):
             self.on_calcular()
-        else:
+        elif current_idx == self.notebook.index(self.config_tab):
             self._save_current_config()
 
     # -------- Persistencia -------- #
@@ -204,12 +410,20 @@ class PresupuestoApp:
         if not ok:
             messagebox.showerror("Error de configuración", err)
             return
+        old_price = load_config()["price_per_meter"]
+        price = float(self.price_per_meter.get())
         save_config(
             float(self.roll_width_cm.get()),
-            float(self.price_per_meter.get()),
+            price,
             float(self.margin_top_cm.get()),
             float(self.margin_right_cm.get())
         )
+        if price != old_price and self._history_exists() and messagebox.askyesno(
+                "Configuración guardada",
+                "Ha cambiado el precio por metro.\n"
+                "¿Recalcular también el coste de los presupuestos del historial?"):
+            self._reprice_history(price)
+            return
         messagebox.showinfo("OK", "Configuración guardada.")
 
     def _on_close(self) -> None:
@@ -221,6 +435,11 @@ class PresupuestoApp:
                 float(self.margin_top_cm.get()),
                 float(self.margin_right_cm.get())
             )
+        self.jobs.shutdown()
+        if self._instance is not None:
+            self._instance.close()
+        if self._history is not None:
+            self._history.close()  # vacía la cola de inserciones pendientes
         self.root.destroy()
 
     def _validate_config_only(self) -> tuple[bool, str]:
@@ -274,15 +493,68 @@ class PresupuestoApp:
             return False, "Valores mínimos no válidos:\n- " + "\n- ".join(bad)
         return True, ""
 
+    def _schedule_recalc(self, *_) -> None:
+        if self._recalc_after_id is not None:
+            self.root.after_cancel(self._recalc_after_id)
+        self._recalc_after_id = self.root.after(RECALC_DEBOUNCE_MS, self._recalc_live)
+
+    def _recalc_live(self) -> None:
+        # Entradas a medio escribir: se ignoran sin mensajes y se mantiene el último resultado
+        self._recalc_after_id = None
+        ok, err = self._validate_inputs()
+        if not ok:
+            self.jobs.cancel("single")
+            self.calc_status.set(err.replace("\n- ", " · ").replace(":", ""))
+            return
+        self.calc_status.set("")
+        inputs = self._single_inputs()
+        table = self._price_table()
+        self._reprice_open(inputs[0].price_per_meter, table)
+        self._update_rolls(inputs[0])
+        if self._last_single is not None and self._last_single[0] == inputs[0] and not self.jobs.busy("single"):
+            return  # solo ha cambiado el precio o el cliente: ya aplicado sobre la geometría mostrada
+        t0 = time.perf_counter()
+
+        def done(r):
+            self._show_single(inputs, *r, table)
+            if metrics.enabled:
+                metrics.record("ui.recalc_live", time.perf_counter() - t0)
+
+        self.jobs.submit("single", self._compute_single, inputs, table, on_done=done)
+
     def on_calcular(self) -> None:
         ok, err = self._validate_inputs()
         if not ok:
             messagebox.showerror("Error de entrada", err)
             return
+        if self._recalc_after_id is not None:
+            # El recálculo pendiente dejaría obsoleto este trabajo (mismas entradas)
+            self.root.after_cancel(self._recalc_after_id)
+            self._recalc_after_id = None
+        self.calc_status.set("")
+        inputs = self._single_inputs()
+        table = self._price_table()
+        self._update_rolls(inputs[0])
+        prof = metrics.profiled()  # se arma aquí; cProfile corre en el hilo del trabajo
+        t0 = time.perf_counter()
 
-        for w in self.result_frame.winfo_children():
-            w.destroy()
+        def work():
+            with prof:
+                return self._compute_single(inputs, table)
 
+        def done(r):
+            results, opt = r
+            self._show_single(inputs, results, opt, table)
+            self._record_quote(inputs[0], results, opt)
+            if metrics.enabled:
+                metrics.record("ui.on_calcular", time.perf_counter() - t0)
+            if prof.path:
+                self.calc_status.set(f"Perfil guardado en {prof.path}")
+
+        self.jobs.submit("single", work, on_done=done)
+
+    def _single_inputs(self) -> list[CalcInput]:
+        """Entradas a 0° y 90° leídas de los campos (en el hilo de Tk)."""
         roll_width = float(self.roll_width_cm.get())
         price = float(self.price_per_meter.get())
         width = float(self.image_width_cm.get())
@@ -290,24 +562,557 @@ class PresupuestoApp:
         margin_top = float(self.margin_top_cm.get())
         margin_right = float(self.margin_right_cm.get())
         copies = int(self.num_copies.get())
-
-        inputs = [
+        return [
             CalcInput(roll_width, price, width, height, margin_top, margin_right, copies, 0),
             CalcInput(roll_width, price, width, height, margin_top, margin_right, copies, 90),
         ]
-        results = [compute_layout(i) for i in inputs]
-
-        frames = []
-        frames.append(ttk.LabelFrame(self.result_frame, text="Rotación 0° (vertical)"))
-        frames[-1].pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=6, pady=6)
-
-        frames.append(ttk.LabelFrame(self.result_frame, text="Rotación 90° (horizontal)"))
-        frames[-1].pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=6, pady=6)
-
-        for res, frm in zip(results, frames):
-            ttk.Label(frm, text=f"Ancho del rollo: {roll_width:.2f} cm").pack(anchor=tk.W, padx=6, pady=3)
-            ttk.Label(frm, text=f"Diseños por fila: {res.designs_per_row}").pack(anchor=tk.W, padx=6, pady=3)
-            ttk.Label(frm, text=f"Filas necesarias: {res.rows_needed}").pack(anchor=tk.W, padx=6, pady=3)
-            ttk.Label(frm, text=f"Aprovechamiento: {res.usage_percent:.2f}%").pack(anchor=tk.W, padx=6, pady=3)
-            ttk.Label(frm, text=f"Longitud: {res.total_height_cm:.2f} cm (≈ {res.total_height_m:.3f} m)").pack(anchor=tk.W, padx=6, pady=3)
-            ttk.Label(frm, text=f"Coste estimado: {res.cost:.2f} €").pack(anchor=tk.W, padx=6, pady=3)
+
+    def _price_table(self) -> PriceTable:
+        """Tarifa para el precio base y el cliente de los campos (entradas ya validadas)."""
+        return self._pricing.table(float(self.price_per_meter.get()), self.customer.get())
+
+    @staticmethod
+    def _compute_single(inputs: list[CalcInput], table: PriceTable):
+        """Se ejecuta en el pool: no toca Tk."""
+        with timer("calc.single"):
+            # Geometría de la caché (sin precio) y la tarifa encima
+            results = [table.price_geometry(layout_cache.geometry(i)) for i in inputs]
+            opt = optimize_mixed_layout(inputs[0])
+            if not table.flat:
+                opt = table.price(opt)
+            return results, opt
+
+    def _show_single(self, inputs: list[CalcInput], results, opt, table: PriceTable) -> None:
+        roll_width = inputs[0].roll_width_cm
+        for res, lines in zip(results, self.result_lines):
+            self._set_lines(lines, [
+                f"Ancho del rollo: {roll_width:.2f} cm",
+                f"Diseños por fila: {res.designs_per_row}",
+                f"Filas necesarias: {res.rows_needed}",
+                f"Aprovechamiento: {res.usage_percent:.2f}%",
+                f"Longitud: {res.total_height_cm:.2f} cm (≈ {res.total_height_m:.3f} m)",
+                f"Coste estimado: {res.cost:.2f} €",
+            ])
+
+        # Tercera columna: mezcla óptima de filas a 0° y 90°
+        self._set_lines(self.optimum_lines, [
+            f"Ancho del rollo: {roll_width:.2f} cm",
+            f"Filas 0°: {opt.rows_0} × {self._fmt_row(opt.designs_per_row_0, opt.fill_per_row_0)}",
+            f"Filas 90°: {opt.rows_90} × {self._fmt_row(opt.designs_per_row_90, opt.fill_per_row_90)}",
+            f"Filas necesarias: {opt.rows_needed}",
+            f"Aprovechamiento: {opt.usage_percent:.2f}%",
+            f"Longitud: {opt.total_height_cm:.2f} cm (≈ {opt.total_height_m:.3f} m)",
+            f"Coste estimado: {opt.cost:.2f} €",
+        ])
+        self._show_panel(self.single_panel)
+        self._last_single = (inputs[0], results, opt)
+        self._single_table = table
+        self._results_seq += 1
+        self._refresh_preview()
+
+    def _reprice_open(self, price: float, table: PriceTable) -> None:
+        """Aplica otra tarifa a los resultados en pantalla sin recalcular su geometría."""
+        with timer("ui.reprice"):
+            if self._last_single is not None and self._single_table != table:
+                data, results, opt = self._last_single
+                results = [table.price(r) for r in results]
+                opt = table.price(opt)
+                self._last_single = (replace(data, price_per_meter=price), results, opt)
+                self._single_table = table
+                for res, lines in zip(results + [opt], self.result_lines + [self.optimum_lines]):
+                    lines[-1].set(f"Coste estimado: {res.cost:.2f} €")
+            # Un pedido en curso ya lleva la tarifa nueva
+            if self._last_nest is not None and self._nest_table != table and not self.jobs.busy("order"):
+                self._last_nest = table.price(self._last_nest)
+                self._nest_table = table
+                self.order_lines[-1].set(f"Coste estimado: {self._last_nest.cost:.2f} €")
+
+    def _update_rolls(self, data: CalcInput) -> None:
+        """Ordena los rollos del catálogo para el diseño en un trabajo aparte (no retrasa el cálculo)."""
+        if not self._rolls:
+            return
+        customer = self.customer.get()
+        key = (data.image_width_cm, data.image_height_cm, data.num_copies,
+               data.margin_top_cm, data.margin_right_cm, customer)
+        if key == self._rolls_key:
+            return
+        self._rolls_key = key
+
+        def work():
+            with timer("rolls.rank"):
+                return best_per_profile(rank_rolls(
+                    self._rolls, data.image_width_cm, data.image_height_cm, data.num_copies,
+                    data.margin_top_cm, data.margin_right_cm, customer))
+
+        def done(best):
+            if not best:
+                self._set_lines(self.rolls_lines, ["Ningún rollo del catálogo admite el diseño.", ""])
+                return
+            win, alts = best[0], best[1:]
+            self._set_lines(self.rolls_lines, [
+                f"Más barato: {win.profile.label} a {self._fmt_orient(win.orientation_deg)} · "
+                f"{win.total_height_m:.3f} m · {win.cost:.2f} €",
+                "Alternativas: " + " · ".join(
+                    f"{o.profile.label} {self._fmt_orient(o.orientation_deg)} {o.cost:.2f} € "
+                    f"(+{o.cost - win.cost:.2f})" for o in alts) if alts else "",
+            ])
+
+        def failed(exc):
+            self._rolls_key = None
+            self._set_lines(self.rolls_lines, [f"No se pudieron comparar los rollos: {exc}", ""])
+
+        self.jobs.submit("rolls", work, on_done=done, on_error=failed)
+
+    @staticmethod
+    def _fmt_orient(orientation_deg: int) -> str:
+        return "mezcla óptima" if orientation_deg == ORIENTATION_MIXED else f"{orientation_deg}°"
+
+    @staticmethod
+    def _fmt_row(base: int, fill: int) -> str:
+        return f"{base} + {fill} girados" if fill else f"{base}"
+
+    # -------- Pedido multi-diseño -------- #
+    def _update_order_summary(self) -> None:
+        copies = sum(it.copies for it in self.order_items)
+        self.order_summary.set(f"Pedido: {len(self.order_items)} diseños / {copies} copias")
+
+    def _add_to_order(self) -> None:
+        ok, err = self._validate_inputs()
+        if not ok:
+            messagebox.showerror("Error de entrada", err)
+            return
+        self.order_items.append(NestItem(
+            width_cm=float(self.image_width_cm.get()),
+            height_cm=float(self.image_height_cm.get()),
+            copies=int(self.num_copies.get()),
+            rotatable=bool(self.order_rotatable.get()),
+            name=self.size_preset.get(),
+        ))
+        self.jobs.cancel("order")  # un cálculo en curso ya no corresponde al pedido
+        self._update_order_summary()
+
+    def _clear_order(self) -> None:
+        self.order_items.clear()
+        self.jobs.cancel("order")
+        self._update_order_summary()
+
+    def _on_import(self) -> None:
+        """Añade al pedido una línea por imagen de la carpeta (medidas de la cabecera)."""
+        from tkinter import filedialog
+        if self.jobs.busy("import"):
+            return
+        try:
+            copies = int(self.num_copies.get())
+        except (tk.TclError, ValueError):
+            copies = 0
+        if copies < 1:
+            messagebox.showerror("Error de entrada", "El número de copias debe ser 1 o más.")
+            return
+        folder = filedialog.askdirectory(parent=self.root, title="Carpeta con los diseños (PNG, JPEG, TIFF)")
+        if not folder:
+            return
+        self._import_sources([folder], copies)
+
+    def open_paths(self, paths: list[str]) -> None:
+        """Ficheros con los que se abre la app (o llegados de otro arranque): imágenes, carpetas o pedidos CSV/JSONL."""
+        try:
+            copies = max(1, int(self.num_copies.get()))
+        except (tk.TclError, ValueError):
+            copies = 1
+        # Sin clave: un segundo envío no anula el primero
+        self._import_sources(paths, copies, key=None)
+
+    def _import_sources(self, sources: list[str], copies: int, key="import") -> None:
+        from .cli import ORDER_SUFFIXES, read_orders
+        from .imageinfo import ScanResult, iter_image_files, scan_images, to_nest_items
+        default_dpi = float(load_config().get("export_dpi") or 300)
+        rotatable = bool(self.order_rotatable.get())
+
+        def work():
+            images, errors, items = [], [], []
+            for src in sources:
+                p = Path(src)
+                if p.is_dir():
+                    images.extend(iter_image_files(p))
+                elif p.suffix.lower() in ORDER_SUFFIXES:
+                    found, bad = read_orders(str(p))
+                    items.extend(found)
+                    errors.extend(ScanResult(f"{p.name}:{ref}", None, msg) for ref, msg in bad)
+                else:
+                    images.append(str(p))
+            results = scan_images(images) if images else []
+            errors.extend(r for r in results if r.error)
+            return errors, items + to_nest_items(results, default_dpi, copies, rotatable)
+
+        def failed(e: BaseException):
+            self._import_finished()
+            messagebox.showerror("Importar", str(e))
+
+        self.import_button.configure(state=tk.DISABLED)
+        self.calc_status.set("Leyendo diseños…")
+        self.jobs.submit(key, work, on_done=self._on_imported, on_error=failed)
+
+    def _import_finished(self) -> None:
+        self.import_button.configure(state=tk.NORMAL)
+        self.calc_status.set("")
+
+    def _on_imported(self, r) -> None:
+        errors, items = r
+        self._import_finished()
+        if errors:
+            shown = "\n".join(f"{Path(e.path).name}: {e.error}" for e in errors[:10])
+            more = f"\n… y {len(errors) - 10} más" if len(errors) > 10 else ""
+            messagebox.showwarning("Importar", f"{len(errors)} diseños no se pudieron leer:\n{shown}{more}")
+        if not items:
+            messagebox.showinfo("Importar", "No se encontró ningún diseño válido.")
+            return
+        self.order_items.extend(items)
+        self._update_order_summary()
+        self.on_calcular_pedido()
+
+    def on_calcular_pedido(self) -> None:
+        if not self.order_items:
+            messagebox.showerror("Pedido vacío", "Añade al menos un diseño al pedido.")
+            return
+        ok, err = self._validate_config_only()
+        if not ok:
+            messagebox.showerror("Error de configuración", err)
+            return
+
+        roll_width = float(self.roll_width_cm.get())
+        price = float(self.price_per_meter.get())
+        table = self._price_table()
+        items = list(self.order_items)
+
+        def done(res):
+            res = table.price(res)
+            self.calc_status.set("")
+            self._set_lines(self.order_lines, [
+                f"Ancho del rollo: {roll_width:.2f} cm",
+                f"Diseños distintos: {len(items)}",
+                f"Copias colocadas: {len(res.placements)}",
+                f"Aprovechamiento: {res.usage_percent:.2f}%",
+                f"Longitud: {res.total_height_cm:.2f} cm (≈ {res.total_height_m:.3f} m)",
+                f"Coste estimado: {res.cost:.2f} €",
+            ])
+            self._show_panel(self.order_panel)
+            self._last_nest = res
+            self._nest_table = table
+            self._last_nest_items = items
+            self._results_seq += 1
+            self.preview_mode.set("pedido")
+            self._refresh_preview()
+
+        def failed(e: BaseException):
+            self.calc_status.set("")
+            if not isinstance(e, ValueError):
+                raise e
+            messagebox.showerror("Error de pedido", str(e))
+
+        # El nesting agota su presupuesto de tiempo: nunca en el hilo de Tk
+        self.calc_status.set("Calculando pedido…")
+        self.jobs.submit(
+            "order", nest_items, items, roll_width, price,
+            float(self.margin_top_cm.get()),
+            float(self.margin_right_cm.get()),
+            on_done=done, on_error=failed,
+        )
+
+    # -------- Instancia única -------- #
+    def attach_instance(self, server) -> None:
+        """Atiende a los arranques posteriores de la app (instance.InstanceServer)."""
+        self._instance = server
+        self._poll_instance()
+
+    def _poll_instance(self) -> None:
+        for paths in self._instance.poll():
+            self._bring_to_front()
+            if paths:
+                self.open_paths(paths)
+        self.root.after(INSTANCE_POLL_MS, self._poll_instance)
+
+    def _bring_to_front(self) -> None:
+        root = self.root
+        root.deiconify()
+        root.lift()
+        # Windows no deja robar el foco a otra app: "siempre encima" un instante sí
+        root.attributes("-topmost", True)
+        root.after(200, lambda: root.attributes("-topmost", False))
+        root.focus_force()
+
+    # -------- Vista previa -------- #
+    def _build_preview_tab(self) -> None:
+        if self._preview is not None:
+            return
+        from .preview import RollPreview  # solo si se abre la pestaña
+        bar = ttk.Frame(self.preview_tab)
+        bar.pack(side=tk.TOP, fill=tk.X, padx=6, pady=6)
+        for text, value in (("0°", "0"), ("90°", "90"), ("Óptimo", "optimo"), ("Pedido", "pedido")):
+            ttk.Radiobutton(bar, text=text, value=value, variable=self.preview_mode,
+                            command=self._refresh_preview).pack(side=tk.LEFT, padx=4)
+        self.export_button = ttk.Button(bar, text="Exportar PNG…", command=self._on_export)
+        self.export_button.pack(side=tk.RIGHT, padx=4)
+        ttk.Label(bar, text="Ctrl + rueda: zoom", foreground="gray").pack(side=tk.RIGHT, padx=4)
+        self._preview = RollPreview(self.preview_tab)
+        self._preview.pack(fill=tk.BOTH, expand=True, padx=6, pady=(0, 6))
+
+    def _refresh_preview(self) -> None:
+        # Solo con la pestaña visible; al seleccionarla se refresca
+        if self._preview is None or self.notebook.select() != str(self.preview_tab):
+            return
+        key = (self.preview_mode.get(), self._results_seq)
+        if key == self._preview_key:
+            return
+        layout = self._current_layout()
+        if layout is not None:
+            self._preview_key = key
+            self._preview.set_layout(layout)
+
+    def _current_layout(self):
+        """Geometría del modo elegido en la vista previa (None si aún no hay resultado)."""
+        from .geometry import layout_from_mixed, layout_from_nest, layout_from_result
+        mode = self.preview_mode.get()
+        if mode == "pedido":
+            return layout_from_nest(self._last_nest) if self._last_nest else None
+        if self._last_single is None:
+            return None
+        data, results, opt = self._last_single
+        if mode == "optimo":
+            return layout_from_mixed(data, opt)
+        res = results[0] if mode == "0" else results[1]
+        return layout_from_result(replace(data, orientation_deg=res.orientation_deg), res)
+
+    # -------- Exportación PNG -------- #
+    def _on_export(self) -> None:
+        from tkinter import filedialog
+        if self._export_job is not None:
+            # El trabajo ve la cancelación en la siguiente franja y borra el .part
+            self.jobs.cancel("export")
+            self._export_finished()
+            self._preview.status.set("Exportación cancelada.")
+            return
+        layout = self._current_layout()
+        if layout is None:
+            messagebox.showerror("Exportar", "Calcula primero un presupuesto o un pedido.")
+            return
+        if self.preview_mode.get() == "pedido":
+            names = [f"{it.name or 'Diseño'} {it.width_cm:g}×{it.height_cm:g} cm" for it in self._last_nest_items]
+        else:
+            data = self._last_single[0]
+            names = [f"Diseño {data.image_width_cm:g}×{data.image_height_cm:g} cm"]
+        types = [("Imágenes", "*.png *.jpg *.jpeg *.tif *.tiff"), ("Todos", "*.*")]
+        designs = []
+        known = [it.path for it in self._last_nest_items] if self.preview_mode.get() == "pedido" else [""]
+        for name, path in zip(names, known):
+            if path:  # importada desde carpeta: ya se sabe qué imagen es
+                designs.append(path)
+                continue
+            path = filedialog.askopenfilename(parent=self.root, title=f"Imagen para: {name}", filetypes=types)
+            if not path:
+                return
+            designs.append(path)
+        out = filedialog.asksaveasfilename(parent=self.root, title="Guardar gang sheet",
+                                           defaultextension=".png", filetypes=[("PNG", "*.png")])
+        if not out:
+            return
+
+        from .export import export_gang_sheet
+        dpi = float(load_config().get("export_dpi") or 300)
+
+        def work(job):
+            return export_gang_sheet(layout, designs, out, dpi,
+                                     progress=job.progress, cancelled=lambda: job.cancelled)
+
+        def progress(done, total):
+            self._preview.status.set(f"Exportando… {done * 100 // total}% ({done}/{total} filas)")
+
+        def failed(e: BaseException):
+            self._export_finished()
+            if not isinstance(e, (OSError, ValueError)):
+                raise e
+            messagebox.showerror("Exportar", str(e))
+
+        self._export_job = self.jobs.submit("export", work, with_job=True, on_done=self._on_exported,
+                                            on_error=failed, on_progress=progress)
+        self.export_button.configure(text="Cancelar exportación")
+
+    def _export_finished(self) -> None:
+        self._export_job = None
+        self.export_button.configure(text="Exportar PNG…")
+
+    def _on_exported(self, r) -> None:
+        self._export_finished()
+        messagebox.showinfo("Exportar", f"Gang sheet guardado en:\n{r.path}\n\n"
+                            f"{r.width_px}×{r.height_px} px a {r.dpi:g} DPI, {r.copies} copias "
+                            f"({r.seconds:.1f} s)")
+
+    # -------- Diagnóstico -------- #
+    def _dump_metrics(self, event=None):
+        if not metrics.enabled:
+            messagebox.showinfo("Métricas", "La instrumentación está desactivada.\n"
+                                "Arranca la app con --metrics (o DTF_METRICS=1).")
+            return
+        try:
+            pj, pt = metrics.dump()
+        except Exception as e:
+            messagebox.showerror("Métricas", f"No se pudieron guardar:\n{e}")
+            return
+        messagebox.showinfo("Métricas", f"Métricas guardadas en:\n{pj}\n{pt}")
+
+    def _arm_profile(self, event=None):
+        metrics.profile_next()
+        self.calc_status.set("El siguiente cálculo se perfilará con cProfile")
+
+    # -------- Historial -------- #
+    def _history_store(self) -> HistoryStore:
+        if self._history is None:
+            self._history = HistoryStore()
+        return self._history
+
+    def _history_exists(self) -> bool:
+        # Sin abrir HistoryStore: crearía el fichero aunque nunca se haya presupuestado
+        return self._history is not None or (get_config_dir() / HISTORY_FILENAME).exists()
+
+    def _reprice_history(self, price: float) -> None:
+        """Nuevo precio en todo el historial: una sola UPDATE en el hilo escritor."""
+        store = self._history_store()
+
+        def done(n: int):
+            messagebox.showinfo("OK", f"Configuración guardada.\n{n} presupuestos del historial actualizados.")
+            if self._history_tab_built:
+                self._history_load()
+
+        def failed(e: BaseException):
+            messagebox.showerror("Historial", f"No se pudo actualizar el historial:\n{e}")
+
+        self.jobs.submit("history-reprice", store.reprice, price, self._pricing, on_done=done, on_error=failed)
+
+    def _record_quote(self, data: CalcInput, results, opt) -> None:
+        r0, r90 = results
+        chosen = min(
+            [(r0.cost, 0, r0.total_height_cm), (r90.cost, 90, r90.total_height_cm),
+             (opt.cost, ORIENTATION_MIXED, opt.total_height_cm)],
+            key=lambda c: c[0],
+        )
+        try:
+            self._history_store().add(QuoteRecord(
+                customer=self.customer.get().strip(),
+                image_width_cm=data.image_width_cm,
+                image_height_cm=data.image_height_cm,
+                num_copies=data.num_copies,
+                roll_width_cm=data.roll_width_cm,
+                price_per_meter=data.price_per_meter,
+                margin_top_cm=data.margin_top_cm,
+                margin_right_cm=data.margin_right_cm,
+                length_0_cm=r0.total_height_cm,
+                cost_0=r0.cost,
+                length_90_cm=r90.total_height_cm,
+                cost_90=r90.cost,
+                chosen_orientation=chosen[1],
+                chosen_length_cm=chosen[2],
+                chosen_cost=chosen[0],
+                details={"0": asdict(r0), "90": asdict(r90), "optimo": asdict(opt)},
+            ))
+        except Exception as e:
+            # El historial nunca debe impedir presupuestar
+            print("[Historial] no se pudo guardar:", e)
+
+    def _build_history_tab(self) -> None:
+        if self._history_tab_built:
+            return
+        self._history_tab_built = True
+        frame = self.history_tab
+        self.history_search = tk.StringVar()
+        self.history_info = tk.StringVar()
+        self._history_after_id = None
+        self._history_page: list = []
+
+        bar = ttk.Frame(frame)
+        bar.pack(side=tk.TOP, fill=tk.X, padx=6, pady=6)
+        ttk.Label(bar, text="Buscar (cliente o 10x15):").pack(side=tk.LEFT)
+        ttk.Entry(bar, textvariable=self.history_search, width=24).pack(side=tk.LEFT, padx=6)
+        for text, cmd in (("«", lambda: self._history_load()),
+                          ("‹", lambda: self._history_load("prev")),
+                          ("›", lambda: self._history_load("next")),
+                          ("»", lambda: self._history_load("last"))):
+            ttk.Button(bar, text=text, width=3, command=cmd).pack(side=tk.LEFT, padx=1)
+        ttk.Label(bar, textvariable=self.history_info).pack(side=tk.LEFT, padx=8)
+
+        cols = ("fecha", "cliente", "medidas", "copias", "orientacion", "longitud", "coste")
+        heads = ("Fecha", "Cliente", "Medidas (cm)", "Copias", "Orientación", "Longitud (m)", "Coste (€)")
+        widths = (130, 160, 100, 60, 90, 90, 80)
+        tree = ttk.Treeview(frame, columns=cols, show="headings", selectmode="browse")
+        for c, h, w in zip(cols, heads, widths):
+            tree.heading(c, text=h)
+            tree.column(c, width=w, anchor=tk.W if c in ("fecha", "cliente") else tk.E, stretch=False)
+        sb = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=sb.set)
+        sb.pack(side=tk.RIGHT, fill=tk.Y, pady=6)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(6, 0), pady=6)
+        self.history_tree = tree
+        # Filas precreadas: cada página reutiliza los mismos items
+        self._history_iids = [tree.insert("", tk.END, values=()) for _ in range(PAGE_SIZE)]
+        for iid in self._history_iids:
+            tree.detach(iid)
+
+        self.history_search.trace_add("write", self._schedule_history_search)
+
+    def _schedule_history_search(self, *_) -> None:
+        if self._history_after_id is not None:
+            self.root.after_cancel(self._history_after_id)
+        self._history_after_id = self.root.after(RECALC_DEBOUNCE_MS, self._history_load)
+
+    def _history_load(self, where: str = "first") -> None:
+        """Pide la página en segundo plano; una petición nueva deja obsoleta la anterior."""
+        self._history_after_id = None
+        store = self._history_store()
+        search = self.history_search.get()
+        page = self._history_page
+        if where == "next" and page:
+            kwargs = {"after": page[-1]}
+        elif where == "prev" and page:
+            kwargs = {"before": page[0]}
+        elif where == "last":
+            kwargs = {"last": True}
+        else:
+            kwargs = {}
+        # Pasar de página no cambia el total; las búsquedas cuentan hasta COUNT_LIMIT
+        recount = where not in ("next", "prev")
+        limit = COUNT_LIMIT if search.strip() else None
+
+        def work():
+            # Hilo del pool: HistoryStore abre una conexión de lectura por hilo
+            rows = store.page(search, **kwargs)
+            return rows, store.count(search, limit) if recount else None
+
+        def failed(e: BaseException):
+            self.history_info.set(f"No se pudo leer el historial: {e}")
+
+        self.jobs.submit("history", work, on_done=lambda r: self._show_history(where, *r), on_error=failed)
+
+    def _show_history(self, where: str, rows: list, total: int | None) -> None:
+        if not rows and where in ("next", "prev"):
+            return  # ya en el extremo
+        self._history_page = rows
+
+        tree = self.history_tree
+        orient = {0: "0°", 90: "90°", ORIENTATION_MIXED: "Óptimo"}
+        for i, iid in enumerate(self._history_iids):
+            if i < len(rows):
+                r = rows[i]
+                tree.item(iid, values=(
+                    time.strftime("%Y-%m-%d %H:%M", time.localtime(r.created_at)),
+                    r.customer,
+                    f"{r.image_width_cm:g}×{r.image_height_cm:g}",
+                    r.num_copies,
+                    orient.get(r.chosen_orientation, r.chosen_orientation),
+                    f"{r.chosen_length_cm / 100.0:.3f}",
+                    f"{r.chosen_cost:.2f}",
+                ))
+                tree.move(iid, "", i)
+            else:
+                tree.detach(iid)
+        tree.yview_moveto(0)
+        if total is not None:
+            shown = f"{COUNT_LIMIT:,}+".replace(",", " ") if total > COUNT_LIMIT else str(total)
+            self.history_info.set(f"{shown} presupuestos")
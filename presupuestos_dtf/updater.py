@@ -1,12 +1,19 @@
 # presupuestos_dtf/updater.py
+import hashlib
+import json
 import os
+import re
 import sys
 import tempfile
+import threading
+import time
 import shutil
 import subprocess
 import zipfile
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
 import requests
+from requests.adapters import HTTPAdapter
 
 # --- Resolver __version__ tanto si se ejecuta como paquete como script ---
 try:
@@ -20,13 +27,32 @@ except Exception:
     except Exception:
         __version__ = "0.0.0"
 
+try:
+    from .config import get_config_dir, load_config
+    from .constants import RELEASE_CACHE_FILENAME
+    from .delta import parse_manifest, plan_delta, write_entry, write_stage_metadata, DELETE_LIST_NAME
+    from .metrics import count, timed, metrics
+except ImportError:
+    from presupuestos_dtf.config import get_config_dir, load_config
+    from presupuestos_dtf.constants import RELEASE_CACHE_FILENAME
+    from presupuestos_dtf.delta import parse_manifest, plan_delta, write_entry, write_stage_metadata, DELETE_LIST_NAME
+    from presupuestos_dtf.metrics import count, timed, metrics
+
 # --- Config ---
 GITHUB_USER = "TermiSenpai"
 GITHUB_REPO = "presupuestoapp"
 ASSET_ZIP_NAME = "DTF_Pricing_Calculator.zip"   # <--- el ZIP que subes a la release
+ASSET_MANIFEST_NAME = "DTF_Pricing_Calculator.manifest.json"  # hashes por fichero (delta)
 EXE_NAME = "DTF_Pricing_Calculator.exe"               # <--- exe dentro de la carpeta onedir
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")               # opcional para evitar rate-limit
 TIMEOUT = 30
+# Permite apuntar a un servidor local de pruebas (tools/fake_release_server.py)
+GITHUB_API = os.getenv("DTF_UPDATE_API", "https://api.github.com").rstrip("/")
+CHUNK = 256 * 1024
+DOWNLOAD_RETRIES = 3
+
+# progress(bytes_hechos, bytes_totales); total 0 si no se conoce
+ProgressCallback = Callable[[int, int], None]
 
 # --- Utilidades ---
 def _ver_tuple(s: str) -> tuple[int, ...]:
@@ -39,22 +65,119 @@ def _gh_headers():
         h["Authorization"] = f"Bearer {GITHUB_TOKEN}"
     return h
 
+class DownloadProgress:
+    """
+    Estado de la descarga para la interfaz. El hilo de descarga lo actualiza
+    (se pasa como callback) y el diálogo Tk lo consulta con root.after, así
+    nunca se llama a Tk desde el hilo de fondo.
+    """
+    def __init__(self) -> None:
+        self.done = 0
+        self.total = 0
+        self.finished = False
+
+    def __call__(self, done: int, total: int) -> None:
+        self.done, self.total = done, total
+
+    def finish(self) -> None:
+        self.finished = True
+
+# Una sola Session (pool de conexiones keep-alive) para API, manifiesto y descargas
+_session_obj: requests.Session | None = None
+_session_lock = threading.Lock()
+
+def _session() -> requests.Session:
+    global _session_obj
+    with _session_lock:
+        if _session_obj is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _session_obj = s
+        return _session_obj
+
+# Assets vistos en la última comprobación: url -> {"size", "digest", ...}
+_assets: dict[str, dict] = {}
+
+# --- Caché de la release (junto a config.json) ---
+def _release_cache_path() -> Path:
+    return get_config_dir() / RELEASE_CACHE_FILENAME
+
+def _read_release_cache() -> dict:
+    try:
+        cache = json.loads(_release_cache_path().read_text(encoding="utf-8"))
+        return cache if isinstance(cache, dict) and isinstance(cache.get("data"), dict) else {}
+    except Exception:
+        return {}
+
+def _write_release_cache(cache: dict) -> None:
+    try:
+        p = _release_cache_path()
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_suffix(".tmp")
+        tmp.write_text(json.dumps(cache), encoding="utf-8")
+        tmp.replace(p)
+    except Exception as e:
+        print(f"[Updater] cache write error: {e}")
+
+def _slim_release(data: dict) -> dict:
+    # Solo lo que usa el updater; la respuesta completa de GitHub es mucho mayor
+    keys = ("name", "browser_download_url", "size", "digest")
+    return {
+        "tag_name": data["tag_name"],
+        "assets": [{k: a.get(k) for k in keys} for a in data.get("assets", [])],
+    }
+
 # --- API ---
-def _latest_release():
-    url = f"https://api.github.com/repos/{GITHUB_USER}/{GITHUB_REPO}/releases/latest"
-    r = requests.get(url, headers=_gh_headers(), timeout=TIMEOUT)
-    r.raise_for_status()
-    return r.json()
+def _latest_release(force: bool = False):
+    """
+    Metadatos de la última release. Si la última comprobación es más reciente
+    que update_check_interval_h se usa la caché sin red; si no, se pregunta con
+    If-None-Match y un 304 (que no gasta cuota de la API) reutiliza la caché.
+    """
+    url = f"{GITHUB_API}/repos/{GITHUB_USER}/{GITHUB_REPO}/releases/latest"
+    cache = _read_release_cache()
+    if cache.get("url") != url:
+        cache = {}
+    now = time.time()
+    interval_s = max(0.0, float(load_config().get("update_check_interval_h", 0))) * 3600
+    if cache and not force and 0 <= now - cache.get("checked_at", 0) < interval_s:
+        count("updater.check_throttled")
+        return cache["data"]
 
-def check_for_update():
+    headers = _gh_headers()
+    if cache.get("etag"):
+        headers["If-None-Match"] = cache["etag"]
+    try:
+        r = _session().get(url, headers=headers, timeout=TIMEOUT)
+        if r.status_code == 304 and cache:
+            count("updater.check_not_modified")
+            cache["checked_at"] = now
+            _write_release_cache(cache)
+            return cache["data"]
+        r.raise_for_status()
+    except Exception:
+        if cache:  # sin red o sin cuota: mejor la última release conocida que nada
+            count("updater.check_failed")
+            return cache["data"]
+        raise
+    count("updater.check_fetched")
+    data = _slim_release(r.json())
+    _write_release_cache({"url": url, "etag": r.headers.get("ETag"), "checked_at": now, "data": data})
+    return data
+
+@timed("updater.check")
+def check_for_update(force: bool = False):
     """Devuelve (hay_update, tag, asset_zip_url)."""
     try:
-        data = _latest_release()
+        data = _latest_release(force)
         tag = data["tag_name"]
         asset_url = None
         for a in data.get("assets", []):
             if a.get("name") == ASSET_ZIP_NAME:
                 asset_url = a.get("browser_download_url")
+                _assets[asset_url] = a
                 break
         is_newer = _ver_tuple(tag) > _ver_tuple(__version__)
         return is_newer, tag, asset_url
@@ -63,15 +186,141 @@ def check_for_update():
         return False, None, None
 
 # --- Descarga y staging del ZIP ---
-def _download_zip(url: str) -> Path:
+def _asset_sha256(url: str) -> str | None:
+    # GitHub publica "digest": "sha256:<hex>" en cada asset
+    digest = (_assets.get(url) or {}).get("digest") or ""
+    return digest.split(":", 1)[1].lower() if digest.startswith("sha256:") else None
+
+def _part_path(url: str) -> Path:
+    # Un .part por URL: un parcial de otra release nunca se reanuda por error
+    tag = hashlib.sha1(url.encode("utf-8")).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / f"{ASSET_ZIP_NAME}.{tag}.part"
+
+@timed("updater.download")
+def _download_zip(url: str, progress: ProgressCallback | None = None,
+                  expected_sha256: str | None = None, expected_size: int | None = None) -> Path:
+    """
+    Descarga por bloques a un .part y la reanuda con Range si se corta.
+    El SHA-256 se calcula mientras se escribe; si no cuadra se descarta.
+    """
     dst = Path(tempfile.gettempdir()) / ASSET_ZIP_NAME
-    with requests.get(url, stream=True, timeout=TIMEOUT) as r:
+    part = _part_path(url)
+    expected_sha256 = expected_sha256 or _asset_sha256(url)
+    expected_size = expected_size or (_assets.get(url) or {}).get("size")
+
+    for attempt in range(1, DOWNLOAD_RETRIES + 1):
+        # Rehashear lo ya descargado (lectura local) para seguir el hash al reanudar
+        h = hashlib.sha256()
+        done = 0
+        if part.exists():
+            with open(part, "rb") as f:
+                for chunk in iter(lambda: f.read(CHUNK), b""):
+                    h.update(chunk)
+                    done += len(chunk)
+        if expected_size and done > expected_size:
+            part.unlink(missing_ok=True)
+            continue
+
+        try:
+            complete = bool(expected_size) and done == expected_size
+            if not complete:
+                headers = {"Range": f"bytes={done}-"} if done else {}
+                with _session().get(url, headers=headers, stream=True, timeout=TIMEOUT) as r:
+                    if r.status_code == 416 and done:
+                        part.unlink(missing_ok=True)  # el parcial no encaja con el remoto
+                        continue
+                    r.raise_for_status()
+                    if done and r.status_code != 206:
+                        h, done = hashlib.sha256(), 0  # el servidor ignoró Range
+                    m = re.match(r"bytes \d+-\d+/(\d+)", r.headers.get("Content-Range", ""))
+                    total = int(m.group(1)) if m else done + int(r.headers.get("Content-Length") or 0)
+                    with open(part, "ab" if done else "wb") as f:
+                        for chunk in r.iter_content(CHUNK):
+                            f.write(chunk)
+                            h.update(chunk)
+                            done += len(chunk)
+                            count("updater.bytes_downloaded", len(chunk))
+                            if progress:
+                                progress(done, total)
+                        f.flush(); os.fsync(f.fileno())
+                    if total and done < total:
+                        raise IOError(f"Descarga incompleta ({done}/{total} bytes)")
+        except requests.HTTPError:
+            raise
+        except (requests.ConnectionError, requests.Timeout, IOError) as e:
+            count("updater.download_retries")
+            print(f"[Updater] download interrupted ({attempt}/{DOWNLOAD_RETRIES}): {e}")
+            if attempt == DOWNLOAD_RETRIES:
+                raise
+            continue
+
+        if expected_size and done != expected_size:
+            part.unlink(missing_ok=True)
+            raise ValueError(f"Tamaño inesperado: {done} bytes (esperado {expected_size}).")
+        if expected_sha256 and h.hexdigest() != expected_sha256.lower():
+            part.unlink(missing_ok=True)
+            raise ValueError("La descarga está corrupta (SHA-256 no coincide).")
+        part.replace(dst)
+        return dst
+    raise IOError("No se pudo completar la descarga.")
+
+# --- Delta: solo los ficheros que cambian ---
+def _manifest_url_for(zip_url: str) -> str:
+    # Mismo release, otro asset: .../releases/download/<tag>/<asset>
+    return zip_url.rsplit("/", 1)[0] + "/" + ASSET_MANIFEST_NAME
+
+def _fetch_manifest(url: str) -> dict | None:
+    try:
+        r = _session().get(url, timeout=TIMEOUT)
+        if r.status_code == 404:
+            return None
         r.raise_for_status()
-        with open(dst, "wb") as f:
-            shutil.copyfileobj(r.raw, f)
-            f.flush(); os.fsync(f.fileno())
-    return dst
+        return parse_manifest(r.content)
+    except Exception as e:
+        print(f"[Updater] manifest not available: {e}")
+        return None
+
+def _counting(chunks: Iterable[bytes], progress: ProgressCallback | None, base: int, total: int) -> Iterator[bytes]:
+    done = base
+    for chunk in chunks:
+        done += len(chunk)
+        count("updater.bytes_downloaded", len(chunk))
+        if progress:
+            progress(done, total)
+        yield chunk
 
+@timed("updater.download_delta")
+def _download_delta(zip_url: str, manifest: dict, install_dir: Path,
+                    progress: ProgressCallback | None = None) -> Path:
+    """Descarga con peticiones Range los ficheros cambiados a un stage nuevo."""
+    changed, deleted = plan_delta(manifest, install_dir)
+    total = sum(e["compressed_size"] for e in changed)
+    print(f"[Updater] delta: {len(changed)} files ({total / 1e6:.1f} MB), {len(deleted)} to delete")
+
+    stage = Path(tempfile.mkdtemp(prefix="dtf_delta_"))
+    try:
+        s = _session()
+        done = 0
+        for e in changed:
+            dst = stage / e["path"]
+            if e["compressed_size"] == 0:
+                write_entry([], e, dst)
+                continue
+            start = e["offset"]
+            end = start + e["compressed_size"] - 1
+            with s.get(zip_url, headers={"Range": f"bytes={start}-{end}"}, stream=True, timeout=TIMEOUT) as r:
+                r.raise_for_status()
+                if r.status_code != 206:
+                    raise RuntimeError("El servidor no admite descargas parciales (Range).")
+                write_entry(_counting(r.iter_content(CHUNK), progress, done, total), e, dst)
+            done += e["compressed_size"]
+        write_stage_metadata(stage, manifest, deleted)
+    except Exception:
+        shutil.rmtree(stage, ignore_errors=True)
+        raise
+    return stage
+
+@timed("updater.extract")
 def _extract_to_stage(zip_path: Path) -> Path:
     stage = Path(tempfile.mkdtemp(prefix="dtf_stage_"))
     with zipfile.ZipFile(zip_path, "r") as z:
@@ -115,34 +364,83 @@ endlocal
 exit /b 0
 """
 
-def _launch_replacer(install_dir: Path, stage_dir: Path):
-    bat = Path(tempfile.gettempdir()) / "dtf_zip_replacer.bat"
-    bat.write_text(_REPLACER_BAT, encoding="utf-8")
+# Delta: copia solo lo que trae el stage (sin /MIR) y borra lo que lista DELETE_LIST_NAME
+_DELTA_REPLACER_BAT = r"""@echo off
+setlocal enableextensions
+set "INSTALL=%~1"
+set "STAGE=%~2"
+set "PID=%~3"
+set "EXE=%~4"
+
+taskkill /PID %PID% /T /F >nul 2>&1
+powershell -NoProfile -Command "try { Wait-Process -Id %PID% -Timeout 45 } catch {}" >nul 2>&1
+timeout /t 2 /nobreak >nul
+
+robocopy "%STAGE%" "%INSTALL%" /E /R:2 /W:1 /XF __DELETE_LIST__ >nul
+if exist "%STAGE%\__DELETE_LIST__" (
+  for /f "usebackq delims=" %%F in ("%STAGE%\__DELETE_LIST__") do del /f /q "%INSTALL%\%%F" >nul 2>&1
+)
+
+start "" "%INSTALL%\%EXE%"
+rmdir /s /q "%STAGE%" >nul 2>&1
+
+endlocal
+exit /b 0
+""".replace("__DELETE_LIST__", DELETE_LIST_NAME)
+
+def _launch_replacer(install_dir: Path, stage_dir: Path, delta: bool = False):
+    bat = Path(tempfile.gettempdir()) / ("dtf_delta_replacer.bat" if delta else "dtf_zip_replacer.bat")
+    bat.write_text(_DELTA_REPLACER_BAT if delta else _REPLACER_BAT, encoding="utf-8")
     pid = os.getpid()
     subprocess.Popen(
         ["cmd.exe", "/c", str(bat), str(install_dir), str(stage_dir), str(pid), EXE_NAME],
         creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
     )
+    metrics.dump_if_enabled()  # os._exit no pasa por atexit
     os._exit(0)  # cerrar la app actual para soltar locks
 
 # --- Punto de entrada para la app ---
-def download_and_replace(download_url: str):
+def _install_dir() -> Path:
+    # Carpeta de instalación (en --onedir es el directorio donde vive el .exe y las DLLs)
+    here = Path(sys.argv[0]).resolve()
+    return here.parent if here.suffix.lower() == ".exe" else Path.cwd()
+
+def prepare_update(download_url: str, install_dir: Path | None = None,
+                   progress: ProgressCallback | None = None) -> tuple[Path, bool]:
     """
-    NUEVO FLUJO (onedir + ZIP):
-    1) Descarga el ZIP del release.
-    2) Extrae a 'stage'.
-    3) Lanza un .bat que mata/espera, hace robocopy /MIR a la carpeta de instalación y relanza el .exe.
+    Deja la nueva versión en un stage. Devuelve (stage, es_delta).
+    Con manifiesto publicado descarga solo los ficheros cambiados; si no hay
+    manifiesto o el delta falla, descarga el ZIP completo.
     """
-    zip_path = _download_zip(download_url)
-    stage = _extract_to_stage(zip_path)
+    install_dir = install_dir or _install_dir()
+    manifest = _fetch_manifest(_manifest_url_for(download_url))
+    if manifest:
+        try:
+            return _download_delta(download_url, manifest, install_dir, progress), True
+        except Exception as e:
+            print(f"[Updater] delta failed, falling back to full ZIP: {e}")
 
-    # Carpeta de instalación (en --onedir es el directorio donde vive el .exe y las DLLs)
-    here = Path(sys.argv[0]).resolve()
-    install_dir = here.parent if here.suffix.lower() == ".exe" else Path.cwd()
+    zip_path = _download_zip(download_url, progress,
+                             expected_sha256=(manifest or {}).get("zip_sha256"),
+                             expected_size=(manifest or {}).get("zip_size"))
+    stage = _extract_to_stage(zip_path)
+    if manifest:
+        write_stage_metadata(stage, manifest)  # la próxima vez no hace falta rehashear
+    return stage, False
 
-    _launch_replacer(install_dir, stage)
+def download_and_replace(download_url: str, progress: ProgressCallback | None = None):
+    """
+    FLUJO (onedir):
+    1) Si la release trae manifiesto, descarga solo los ficheros cambiados (delta);
+       si no, descarga el ZIP completo y lo extrae a 'stage'.
+    2) Lanza un .bat que mata/espera, copia el stage a la carpeta de instalación
+       (robocopy /MIR con ZIP completo) y relanza el .exe.
+    """
+    install_dir = _install_dir()
+    stage, delta = prepare_update(download_url, install_dir, progress)
+    _launch_replacer(install_dir, stage, delta)
 
 # --- Prueba manual ---
 if __name__ == "__main__":
-    ok, tag, url = check_for_update()
+    ok, tag, url = check_for_update(force=True)
     print(f"current={__version__} latest={tag} has_update={ok} url={url}")
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Base de los tests del updater: tools/fake_release_server.py en 127.0.0.1
+(puerto libre) y la configuración en una carpeta temporal.
+"""
+import json
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tools"))
+
+from fake_release_server import make_server  # noqa: E402
+from presupuestos_dtf import updater  # noqa: E402
+from presupuestos_dtf.constants import CONFIG_FILENAME  # noqa: E402
+
+class ReleaseServerCase(unittest.TestCase):
+    TAG = "9.9.9"
+
+    def setUp(self) -> None:
+        tmp = Path(tempfile.mkdtemp(prefix="dtf_test_"))
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        self.tmp = tmp
+        self.config_dir = tmp / "config"
+        self.dist = tmp / "dist"
+        self.config_dir.mkdir()
+        self.dist.mkdir()
+        for target in ("presupuestos_dtf.config.get_config_dir", "presupuestos_dtf.updater.get_config_dir"):
+            patcher = mock.patch(target, return_value=self.config_dir)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.server = make_server(self.dist, self.TAG)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        patcher = mock.patch.object(updater, "GITHUB_API", self.base_url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Sin conexiones keep-alive ni assets de otro test
+        self.addCleanup(updater._session().close)
+        self.addCleanup(updater._assets.clear)
+
+    def write_config(self, **values) -> None:
+        (self.config_dir / CONFIG_FILENAME).write_text(json.dumps(values), encoding="utf-8")
+
+    def asset_url(self, name: str) -> str:
+        return f"{self.base_url}/download/{self.TAG}/{name}"
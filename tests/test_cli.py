@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Filas no válidas en quote/read_orders: error por fila, nunca una excepción
+que corte el resto del fichero (ni un 500 del lote en el servicio HTTP).
+
+    python -m unittest discover tests
+"""
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from presupuestos_dtf.cli import _order_item, quote_row  # noqa: E402
+
+DEFAULTS = {"roll_width_cm": 57.0, "price_per_meter": 11.0, "margin_top_cm": 0.5, "margin_right_cm": 0.5}
+
+class QuoteRowTest(unittest.TestCase):
+    def test_non_finite_values_are_row_errors(self):
+        for row in ({"width": "10", "height": "15", "copies": "20", "roll_width_cm": "inf"},
+                    {"width": "nan", "height": "15", "copies": "20"},
+                    {"width": float("inf"), "height": 15, "copies": 20},
+                    {"width": 10, "height": 15, "copies": float("inf")}):
+            with self.subTest(row=row):
+                out = quote_row(row, DEFAULTS, 7)
+                self.assertEqual(out["id"], 7)
+                self.assertIn("error", out)
+
+    def test_valid_row_is_quoted(self):
+        out = quote_row({"width": "10", "height": "15", "copies": "20"}, DEFAULTS, 0)
+        self.assertNotIn("error", out)
+        self.assertEqual(out["designs_per_row"], 5)
+
+class OrderItemTest(unittest.TestCase):
+    def test_non_finite_values_raise_value_error(self):
+        for row in ({"width": "inf", "height": "15"}, {"width": "10", "height": "nan"},
+                    {"width": 10, "height": 15, "copies": float("inf")}):
+            with self.subTest(row=row), self.assertRaises(ValueError):
+                _order_item(row, 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Actualización delta de punta a punta: dos ZIP de release que se diferencian
+en un fichero, manifiesto con tools/make_manifest.py y descarga con Range
+desde el servidor falso.
+
+    python -m unittest discover tests
+"""
+import hashlib
+import json
+import random
+import shutil
+import subprocess
+import sys
+import unittest
+import zipfile
+from contextlib import redirect_stdout
+from io import StringIO
+
+from release_fixture import ROOT, ReleaseServerCase
+from presupuestos_dtf import updater
+from presupuestos_dtf.delta import LOCAL_MANIFEST_NAME, MANIFEST_FORMAT, parse_manifest, plan_delta
+
+ZIP_ROOT = "DTF_Pricing_Calculator/"
+
+def _release_files(app_version: bytes) -> dict[str, bytes]:
+    rnd = random.Random(3)
+    return {
+        updater.EXE_NAME: rnd.randbytes(300_000),                      # no comprime: datos grandes
+        "_internal/base_library.zip": rnd.randbytes(120_000),
+        "_internal/app.pyd": b"app " + app_version + b"\n" + bytes(50_000),
+        "_internal/presets.csv": "nombre,ancho,alto\nA4,21,29.7\n".encode() * 200,
+    }
+
+def _write_zip(path, files: dict[str, bytes]) -> None:
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        for name, data in files.items():
+            z.writestr(ZIP_ROOT + name, data)
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+class DeltaDownloadTest(ReleaseServerCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.old_files = _release_files(b"1.0")
+        self.new_files = _release_files(b"1.1")
+        # Instalación actual: el ZIP viejo ya extraído (sin la carpeta raíz)
+        self.install = self.tmp / "install"
+        for name, data in self.old_files.items():
+            (self.install / name).parent.mkdir(parents=True, exist_ok=True)
+            (self.install / name).write_bytes(data)
+
+        self.new_zip = self.dist / updater.ASSET_ZIP_NAME
+        _write_zip(self.new_zip, self.new_files)
+        manifest_path = self.dist / updater.ASSET_MANIFEST_NAME
+        subprocess.run([sys.executable, str(ROOT / "tools" / "make_manifest.py"), str(self.new_zip),
+                        "--version", self.TAG, "-o", str(manifest_path)], check=True, capture_output=True)
+        self.manifest = parse_manifest(manifest_path.read_bytes())
+
+    def test_plan_lists_only_the_changed_file(self):
+        changed, deleted = plan_delta(self.manifest, self.install)
+        self.assertEqual([e["path"] for e in changed], ["_internal/app.pyd"])
+        self.assertEqual(deleted, [])
+
+    def test_download_requests_only_the_changed_entry(self):
+        (entry,), _ = plan_delta(self.manifest, self.install)
+        with redirect_stdout(StringIO()):
+            stage = updater._download_delta(self.asset_url(updater.ASSET_ZIP_NAME), self.manifest, self.install)
+        self.addCleanup(shutil.rmtree, stage, ignore_errors=True)
+
+        end = entry["offset"] + entry["compressed_size"] - 1
+        self.assertEqual(self.server.downloads, [(updater.ASSET_ZIP_NAME, f"bytes={entry['offset']}-{end}")])
+        self.assertLess(entry["compressed_size"], self.new_zip.stat().st_size // 10)
+
+        staged = {p.relative_to(stage).as_posix(): p.read_bytes() for p in stage.rglob("*") if p.is_file()}
+        self.assertEqual(json.loads(staged.pop(LOCAL_MANIFEST_NAME)), self.manifest)
+        self.assertEqual({k: _sha256(v) for k, v in staged.items()},
+                         {"_internal/app.pyd": _sha256(self.new_files["_internal/app.pyd"])})
+
+        # Instalación + stage = el ZIP nuevo, fichero a fichero
+        shutil.copytree(stage, self.install, dirs_exist_ok=True)
+        with zipfile.ZipFile(self.new_zip) as z:
+            for info in z.infolist():
+                name = info.filename[len(ZIP_ROOT):]
+                self.assertEqual(_sha256((self.install / name).read_bytes()), _sha256(z.read(info)), name)
+
+class ParseManifestTest(unittest.TestCase):
+    def test_rejects_paths_outside_the_install_dir(self):
+        for path in ("../evil.dll", "_internal/../../evil.dll", "..\\evil.dll", "_internal\\..\\..\\evil.dll",
+                     "/etc/passwd", "\\Windows\\evil.dll", "C:evil.dll"):
+            data = json.dumps({"format": MANIFEST_FORMAT, "files": [{"path": path}]})
+            with self.subTest(path=path), self.assertRaises(ValueError):
+                parse_manifest(data)
+
+    def test_accepts_nested_paths(self):
+        data = json.dumps({"format": MANIFEST_FORMAT, "files": [{"path": "_internal/lib/x..y.dll"}]})
+        self.assertEqual(parse_manifest(data)["files"][0]["path"], "_internal/lib/x..y.dll")
+
+if __name__ == "__main__":
+    unittest.main()
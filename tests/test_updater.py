@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Updater contra el servidor falso: intervalo entre comprobaciones,
+revalidación con ETag, caída a la release en caché y descarga del ZIP
+(reanudación con Range, SHA-256 que no cuadra, .part que no encaja).
+
+    python -m unittest discover tests
+"""
+import hashlib
+import json
+import random
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+from release_fixture import ReleaseServerCase
+from presupuestos_dtf import updater
+from presupuestos_dtf.constants import RELEASE_CACHE_FILENAME
+
+class CheckForUpdateTest(ReleaseServerCase):
+    def setUp(self) -> None:
+        super().setUp()
+        (self.dist / updater.ASSET_ZIP_NAME).write_bytes(b"PK")
+        self.write_config(update_check_interval_h=6)
+        self.cache_path = self.config_dir / RELEASE_CACHE_FILENAME
+
+    def test_second_check_within_interval_makes_no_request(self):
+        first = updater.check_for_update()
+        self.assertEqual(first, (True, self.TAG, self.asset_url(updater.ASSET_ZIP_NAME)))
+        self.assertEqual(self.server.api_requests, 1)
+
+        self.assertEqual(updater.check_for_update(), first)
+        self.assertEqual(self.server.api_requests, 1)
+
+    def test_forced_recheck_sends_etag_and_uses_cache_on_304(self):
+        updater.check_for_update()
+        cache = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        self.assertTrue(cache["etag"])
+        # Un 304 no trae cuerpo: si sale esta etiqueta, salió de release_cache.json
+        cache["data"]["tag_name"] = "9.9.8"
+        self.cache_path.write_text(json.dumps(cache), encoding="utf-8")
+
+        _, tag, _ = updater.check_for_update(force=True)
+        self.assertEqual(tag, "9.9.8")
+        self.assertEqual(self.server.api_requests, 2)
+        self.assertEqual(self.server.api_not_modified, 1)  # If-None-Match coincidió
+
+    def test_server_error_falls_back_to_cached_release(self):
+        updater.check_for_update()
+        self.server.fail_status = 503
+
+        self.assertEqual(updater.check_for_update(force=True)[1], self.TAG)
+        self.assertEqual(self.server.api_requests, 2)
+
+    def test_server_error_without_cache_reports_no_update(self):
+        self.server.fail_status = 503
+        with redirect_stdout(StringIO()):
+            self.assertEqual(updater.check_for_update(), (False, None, None))
+
+class DownloadZipTest(ReleaseServerCase):
+    def setUp(self) -> None:
+        super().setUp()
+        # .part y ZIP descargado en la carpeta del test, no en el /tmp compartido
+        patcher = mock.patch.object(tempfile, "tempdir", str(self.tmp))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.data = random.Random(5).randbytes(1_000_000)
+        self.sha256 = hashlib.sha256(self.data).hexdigest()
+        (self.dist / updater.ASSET_ZIP_NAME).write_bytes(self.data)
+        self.url = self.asset_url(updater.ASSET_ZIP_NAME)
+        self.part = updater._part_path(self.url)
+
+    def download(self, **kwargs):
+        with redirect_stdout(StringIO()):
+            return updater._download_zip(self.url, **kwargs)
+
+    def test_interrupted_download_resumes_with_range(self):
+        self.server.cut_next_download = 300_000
+        path = self.download(expected_sha256=self.sha256, expected_size=len(self.data))
+
+        self.assertEqual(path.read_bytes(), self.data)
+        self.assertFalse(self.part.exists())
+        (_, first), (_, second) = self.server.downloads
+        self.assertIsNone(first)
+        resumed_at = int(second[len("bytes="):-1])  # "bytes=N-"
+        self.assertTrue(0 < resumed_at <= 300_000, second)
+
+    def test_digest_mismatch_deletes_part(self):
+        with self.assertRaises(ValueError):
+            self.download(expected_sha256="0" * 64, expected_size=len(self.data))
+        self.assertFalse(self.part.exists())
+        self.assertFalse((self.tmp / updater.ASSET_ZIP_NAME).exists())
+
+    def test_part_larger_than_remote_restarts_after_416(self):
+        # Parcial de otro fichero más grande: el servidor responde 416 al Range
+        self.part.write_bytes(b"x" * (len(self.data) + 10))
+        path = self.download(expected_sha256=self.sha256)
+
+        self.assertEqual(path.read_bytes(), self.data)
+        self.assertEqual(self.server.downloads, [(updater.ASSET_ZIP_NAME, f"bytes={len(self.data) + 10}-"),
+                                                 (updater.ASSET_ZIP_NAME, None)])
+
+if __name__ == "__main__":
+    unittest.main()
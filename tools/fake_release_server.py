@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Servidor local que imita GitHub Releases para probar el updater de punta a punta.
+
+Sirve los ficheros de --dir como assets de una release --tag:
+    GET /repos/<usuario>/<repo>/releases/latest   -> JSON con tag_name y assets (ETag / 304)
+    GET /download/<tag>/<asset>                   -> fichero (admite Range)
+
+Desde código (tests), make_server(..., port=0) cuenta las peticiones a la
+API, anota los Range de las descargas, puede responder con un error y puede
+cortar la siguiente descarga a medias.
+
+Uso:
+    python tools/fake_release_server.py --dir dist --tag 9.9.9 --port 8800
+    DTF_UPDATE_API=http://127.0.0.1:8800 python main.py
+"""
+import argparse
+import hashlib
+import json
+import re
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+class ReleaseHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def __init__(self, *args, root: Path, tag: str, **kwargs) -> None:
+        self.root = root
+        self.tag = tag
+        super().__init__(*args, **kwargs)
+
+    def log_message(self, fmt, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes, ctype: str = "application/json", headers: dict | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def release_json(self) -> bytes:
+        host = self.headers.get("Host", "127.0.0.1")
+        assets = [
+            {"name": p.name, "size": p.stat().st_size,
+             "browser_download_url": f"http://{host}/download/{self.tag}/{p.name}"}
+            for p in sorted(self.root.iterdir()) if p.is_file()
+        ]
+        return json.dumps({"tag_name": self.tag, "assets": assets}).encode()
+
+    def do_HEAD(self) -> None:
+        self.do_GET()
+
+    def do_GET(self) -> None:
+        path = self.path.split("?", 1)[0]
+        if re.fullmatch(r"/repos/[^/]+/[^/]+/releases/latest", path):
+            self.server.api_requests += 1
+            if self.server.fail_status:
+                return self._send(self.server.fail_status, b'{"message": "Server Error"}')
+            body = self.release_json()
+            etag = '"%s"' % hashlib.sha1(body).hexdigest()
+            if self.headers.get("If-None-Match") == etag:
+                self.server.api_not_modified += 1
+                return self._send(304, b"", headers={"ETag": etag})
+            return self._send(200, body, headers={"ETag": etag})
+
+        m = re.fullmatch(r"/download/([^/]+)/([^/]+)", path)
+        f = self.root / m.group(2) if m else None
+        if not m or m.group(1) != self.tag or not f.is_file():
+            return self._send(404, b'{"message": "Not Found"}')
+
+        data = f.read_bytes()
+        self.server.downloads.append((m.group(2), self.headers.get("Range")))
+        rng = _RANGE.match(self.headers.get("Range", ""))
+        if not rng:
+            cut, self.server.cut_next_download = self.server.cut_next_download, 0
+            if cut:
+                # Anuncia el fichero entero, manda `cut` bytes y cierra: conexión caída
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data[:cut])
+                self.close_connection = True
+                return
+            return self._send(200, data, "application/octet-stream", {"Accept-Ranges": "bytes"})
+        start, end = rng.groups()
+        if start == "":
+            start, end = max(0, len(data) - int(end)), len(data) - 1
+        else:
+            start, end = int(start), min(int(end) if end else len(data) - 1, len(data) - 1)
+        if start > end or start >= len(data):
+            return self._send(416, b"", "application/octet-stream", {"Content-Range": f"bytes */{len(data)}"})
+        self._send(206, data[start:end + 1], "application/octet-stream",
+                   {"Content-Range": f"bytes {start}-{end}/{len(data)}", "Accept-Ranges": "bytes"})
+
+def make_server(root: Path, tag: str, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    srv = ThreadingHTTPServer((host, port), partial(ReleaseHandler, root=Path(root), tag=tag))
+    srv.api_requests = 0       # peticiones a releases/latest
+    srv.api_not_modified = 0   # de ellas, respondidas con 304
+    srv.fail_status = 0        # != 0: releases/latest responde con ese estado
+    srv.downloads = []         # (asset, cabecera Range o None) de cada descarga
+    srv.cut_next_download = 0  # != 0: la próxima descarga completa se corta tras esos bytes
+    return srv
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--dir", required=True)
+    ap.add_argument("--tag", required=True)
+    ap.add_argument("--port", type=int, default=8800)
+    args = ap.parse_args()
+    srv = make_server(Path(args.dir), args.tag, port=args.port)
+    print(f"Release {args.tag} en http://127.0.0.1:{srv.server_address[1]}")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+Genera el manifiesto delta (SHA-256 y posición de cada fichero) de un ZIP de release.
+
+Uso:
+    python tools/make_manifest.py dist/DTF_Pricing_Calculator.zip --version 1.3.0 \
+        -o dist/DTF_Pricing_Calculator.manifest.json
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from presupuestos_dtf.delta import build_manifest  # noqa: E402
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("zip")
+    ap.add_argument("--version", required=True)
+    ap.add_argument("-o", "--output", required=True)
+    args = ap.parse_args()
+
+    manifest = build_manifest(Path(args.zip), args.version)
+    Path(args.output).write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+    print(f"{len(manifest['files'])} ficheros -> {args.output}")
+
+if __name__ == "__main__":
+    main()